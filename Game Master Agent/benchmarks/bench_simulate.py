@@ -0,0 +1,100 @@
+"""Throughput of the headless simulation: per-session Python loop vs. NumPy chunks.
+
+The reference plays the same rules one session at a time with the game's own
+dice (`GameState.roll` style `random.Random` draws, `EventTable.pick`). Both
+should give the same outcome distributions within sampling noise; the
+vectorized engine is then timed on 1..N worker processes.
+
+Run from the app folder:  python benchmarks/bench_simulate.py [--sessions 200000] [--reference 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events import EventTable, parse_dice  # noqa: E402
+from simulate import Balance, simulate  # noqa: E402
+
+
+def dice(rng: random.Random, notation: str) -> int:
+    count, sides, bonus = parse_dice(notation)
+    return sum(rng.randint(1, sides) for _ in range(count)) + bonus
+
+
+def reference_session(table: EventTable, balance: Balance, events: int, rng: random.Random, counts: dict) -> None:
+    hp, potions = balance.player_hp, balance.potions
+    for _ in range(events):
+        event = table.pick(rng)
+        if event.damage:
+            hp -= dice(rng, event.damage)
+            if hp <= 0:
+                counts["died_to_traps"] += 1
+                return
+        if event.item == balance.potion_item:
+            potions += 1
+        if not event.enemy:
+            continue
+        enemy_hp, outcome = event.enemy_hp, "stalled"
+        for _ in range(balance.max_rounds):
+            if hp <= balance.heal_below and potions > 0:
+                hp, potions = min(balance.player_hp, hp + balance.potion_heal), potions - 1
+            elif hp <= balance.flee_below:
+                if rng.randint(1, 20) >= balance.flee_dc:
+                    outcome = "fled"
+                    break
+            elif rng.randint(1, 20) + balance.attack_bonus >= event.enemy_armor:
+                enemy_hp -= dice(rng, balance.player_damage)
+                if enemy_hp <= 0:
+                    outcome = "won"
+                    break
+            if rng.randint(1, 20) + balance.enemy_attack_bonus >= balance.player_armor:
+                hp -= dice(rng, event.enemy_damage)
+                if hp <= 0:
+                    outcome = "died"
+                    break
+        counts[outcome] += 1
+        if outcome == "died":
+            return
+    counts["survived"] += 1
+
+
+def shares(counts: dict, sessions: int) -> str:
+    combats = counts["won"] + counts["fled"] + counts["died"] + counts["stalled"]
+    return (f"survived {100 * counts['survived'] / sessions:5.1f}%  "
+            f"combats won {100 * counts['won'] / combats:5.1f}%  fled {100 * counts['fled'] / combats:5.1f}%  "
+            f"died {100 * counts['died'] / combats:5.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200_000)
+    parser.add_argument("--reference", type=int, default=20_000, help="Sessions for the Python loop")
+    parser.add_argument("--events", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    table, balance = EventTable.load(), Balance()
+    counts = dict.fromkeys(["survived", "died_to_traps", "won", "fled", "died", "stalled"], 0)
+    started = time.perf_counter()
+    for i in range(args.reference):
+        reference_session(table, balance, args.events, random.Random(i), counts)
+    reference_rate = args.reference / (time.perf_counter() - started)
+    print(f"python loop  {args.reference:>9,} sessions  {reference_rate:>10,.0f} sessions/s  "
+          f"{shares(counts, args.reference)}")
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        result = simulate(table, balance, args.sessions, args.events, seed=1, workers=workers)
+        rate = args.sessions / (time.perf_counter() - started)
+        counts = {"survived": result.survived, "won": int(result.won.sum()), "fled": int(result.fled.sum()),
+                  "died": int(result.died.sum()), "stalled": int(result.stalled.sum())}
+        print(f"numpy x{workers:<4} {args.sessions:>9,} sessions  {rate:>10,.0f} sessions/s  "
+              f"{shares(counts, args.sessions)}  ({rate / reference_rate:.0f}x)")
+    print(f"({os.cpu_count()} CPU(s) available)")
+
+
+if __name__ == "__main__":
+    main()
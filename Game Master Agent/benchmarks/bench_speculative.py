@@ -0,0 +1,124 @@
+"""Turn latency with and without speculative handoffs, offline.
+
+Every turn goes through the Main Controller Agent, which hands off to the
+Narrator, Monster or Item Agent (or, now and then, answers itself). The
+controller's choices follow a seeded Markov chain (fights run for a few
+turns, loot follows fights, and so on), replayed identically in both modes.
+Each agent runs on its own stub model with a scripted latency, so the
+speculative mode can be checked for hit rate, wasted calls and latency
+saved without an API key; the final answers of both modes must match.
+
+Run from the app folder:  python benchmarks/bench_speculative.py [--turns 60]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from statistics import mean, median
+from typing import Dict, List, Optional, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.dirname(APP_DIR))
+
+from agents import Agent, Runner  # noqa: E402
+
+from common.speculative import HandoffPredictor, SpeculativeRunner  # noqa: E402
+from common.stub_model import StubModel  # noqa: E402
+from game_state import GameState  # noqa: E402
+import main  # noqa: E402
+
+CONTROLLER = main.main_Agent.name
+NARRATOR, MONSTER, ITEM = main.narratorAgent.name, main.monsterAgent.name, main.itemAgent.name
+
+# Who the controller picks next, given who answered last
+TRANSITIONS: Dict[str, List[Tuple[str, float]]] = {
+    NARRATOR: [(NARRATOR, 0.6), (MONSTER, 0.25), (ITEM, 0.1), (CONTROLLER, 0.05)],
+    MONSTER: [(MONSTER, 0.7), (ITEM, 0.2), (NARRATOR, 0.1)],
+    ITEM: [(NARRATOR, 0.7), (ITEM, 0.2), (MONSTER, 0.1)],
+    CONTROLLER: [(NARRATOR, 1.0)],
+}
+
+
+def plan(turns: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    current, out = NARRATOR, []
+    for _ in range(turns):
+        names, weights = zip(*TRANSITIONS[current])
+        current = rng.choices(names, weights)[0]
+        out.append(current)
+    return out
+
+
+def build(targets: List[str], latency: Dict[str, float]) -> Tuple[Agent, Dict[str, Agent], List[StubModel]]:
+    """Stub-model copies of the game's agents; the controller replays `targets`."""
+    subs = {}
+    models = []
+    for agent in (main.narratorAgent, main.monsterAgent, main.itemAgent):
+        model = StubModel(latency=latency[agent.name], reply=f"({agent.name}) What dost thou do next?")
+        subs[agent.name] = agent.clone(model=model)
+        models.append(model)
+    script = [[{"handoff": t}] if t != CONTROLLER else [{"text": f"({CONTROLLER}) Choose wisely."}]
+              for t in targets]
+    controller_model = StubModel(latency=latency[CONTROLLER], script=script)
+    models.append(controller_model)
+    controller = main.main_Agent.clone(model=controller_model, handoffs=list(subs.values()))
+    return controller, subs, models
+
+
+async def play(targets: List[str], latency: Dict[str, float], speculate: bool,
+               threshold: float) -> Tuple[List[float], List[str], Optional[SpeculativeRunner], int]:
+    controller, subs, models = build(targets, latency)
+    runner = SpeculativeRunner(controller, subs, HandoffPredictor(list(subs), threshold=threshold)) \
+        if speculate else None
+    state = GameState(seed=1)
+    seconds, answers = [], []
+    for turn in range(len(targets)):
+        text = f"Turn {turn}: I press on."
+        started = time.perf_counter()
+        if runner:
+            result = await runner.run(text, context=state, history=state.handoffs)
+        else:
+            result = await Runner.run(controller, text, context=state)
+        seconds.append(time.perf_counter() - started)
+        answers.append(result.final_output)
+        state.record_handoff(result.last_agent.name)
+    return seconds, answers, runner, sum(m.calls for m in models)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--controller-ms", type=float, default=150)
+    parser.add_argument("--narrator-ms", type=float, default=250)
+    parser.add_argument("--monster-ms", type=float, default=200)
+    parser.add_argument("--item-ms", type=float, default=150)
+    args = parser.parse_args()
+    latency = {CONTROLLER: args.controller_ms / 1000, NARRATOR: args.narrator_ms / 1000,
+               MONSTER: args.monster_ms / 1000, ITEM: args.item_ms / 1000}
+    targets = plan(args.turns, args.seed)
+
+    base, base_answers, _, base_calls = asyncio.run(play(targets, latency, False, args.threshold))
+    spec, spec_answers, runner, spec_calls = asyncio.run(play(targets, latency, True, args.threshold))
+
+    print(f"{args.turns} turns, controller {args.controller_ms:.0f}ms, narrator {args.narrator_ms:.0f}ms, "
+          f"monster {args.monster_ms:.0f}ms, item {args.item_ms:.0f}ms")
+    for label, seconds, calls in (("sequential", base, base_calls), ("speculative", spec, spec_calls)):
+        print(f"  {label:<12} mean {mean(seconds) * 1000:6.0f}ms  p50 {median(seconds) * 1000:6.0f}ms  "
+              f"total {sum(seconds):5.1f}s  model calls {calls}")
+    stats = runner.stats
+    print(f"  hit rate {stats.hit_rate:.0%} of {stats.predicted} speculated turns "
+          f"({stats.unpredicted} not speculated), wasted calls {stats.wasted_calls}, "
+          f"saved {stats.saved_seconds:.1f}s (measured {sum(base) - sum(spec):.1f}s)")
+    for name, a in sorted(stats.agents.items()):
+        print(f"    {name:<15} hits {a.hits:>3}  misses {a.misses:>3}  conflicts {a.conflicts}  "
+              f"wasted {a.wasted_calls:>3}  saved {a.saved_seconds:5.2f}s")
+    print(f"  answers match: {'yes' if base_answers == spec_answers else 'NO'}")
+
+
+if __name__ == "__main__":
+    main_cli()
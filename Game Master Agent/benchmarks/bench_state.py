@@ -0,0 +1,104 @@
+"""Prompt tokens per turn over a scripted 200-turn session, offline.
+
+Compares the original loop (full `to_input_list()` transcript resent every
+turn) with the GameState loop (bounded history + state snapshot in the
+instructions). Runs against the local stub model, so no API key is needed.
+
+Run from the app folder:  python benchmarks/bench_state.py [--turns 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.dirname(APP_DIR))
+
+from agents import RunConfig, Runner  # noqa: E402
+
+from common.history import HistoryManager  # noqa: E402
+from common.stub_model import StubModel  # noqa: E402
+from game_state import GameState  # noqa: E402
+import main  # noqa: E402
+
+PLAYER_ACTIONS = [
+    "Look around", "Go north into the forest", "Attack the goblin", "Attack again", "Pick up the dagger",
+    "Drink the potion", "Talk to the old hermit", "Open the door", "Explore the ruins", "Flee from the troll",
+]
+
+NARRATION = ("The wind howls through the ancient pines as you press onward. Torchlight flickers across "
+             "moss-covered stones, and somewhere ahead a wolf calls to its pack. The path splits in two: "
+             "one trail winds toward a ruined watchtower, the other descends into a misty hollow. "
+             "What dost thou wish to do next, brave adventurer?")
+
+
+def apply_script(state: GameState, turn: int) -> None:
+    """Stand-in for the tool calls a real session would make."""
+    action = turn % 10
+    if action == 2:
+        state.start_combat("Goblin", 12)
+    elif action == 3:
+        state.hit_enemy(7)
+        state.damage(3, "Goblin")
+    elif action == 4:
+        state.add_item("Dagger")
+    elif action == 5:
+        state.add_item("Potion of Healing")
+        state.use_item("Potion of Healing")
+    elif action == 1:
+        state.move(f"Forest Clearing {turn // 10}")
+
+
+async def transcript_session(turns: int):
+    model = StubModel(latency=0, reply=NARRATION)
+    config = RunConfig(model=model)
+    history = []
+    for turn in range(turns):
+        history.append({"role": "user", "content": PLAYER_ACTIONS[turn % len(PLAYER_ACTIONS)]})
+        result = await Runner.run(main.main_Agent, history, run_config=config)
+        history = result.to_input_list()
+    return model.prompt_chars
+
+
+async def state_session(turns: int, budget: int):
+    model = StubModel(latency=0, reply=NARRATION)
+    config = RunConfig(model=model)
+    history = HistoryManager(token_budget=budget)
+    state = GameState()
+    for turn in range(turns):
+        items = history.start_turn(PLAYER_ACTIONS[turn % len(PLAYER_ACTIONS)])
+        result = await Runner.run(main.main_Agent, items, context=state, run_config=config)
+        history.finish_turn(result.to_input_list())
+        apply_script(state, turn)
+        if state.status == "dead":
+            state = GameState()
+    return model.prompt_chars
+
+
+def summarize(name: str, chars) -> float:
+    tokens = [c / 4 for c in chars]
+    marks = [1, 10, 50, 100, 200, len(tokens)]
+    points = "  ".join(f"t{m}={tokens[m - 1]:7.0f}" for m in sorted(set(marks)) if m <= len(tokens))
+    mean = sum(tokens) / len(tokens)
+    print(f"  {name:<11} mean={mean:7.0f} tok/turn  total={sum(tokens):9.0f}  {points}")
+    return mean
+
+
+async def run(turns: int, budget: int) -> None:
+    print(f"== {turns}-turn scripted session (~tokens = chars / 4)")
+    before = summarize("transcript", await transcript_session(turns))
+    after = summarize("game state", await state_session(turns, budget))
+    print(f"  reduction: {1 - after / before:.0%} fewer prompt tokens per turn on average")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=1500, help="History token budget for the GameState loop")
+    args = parser.parse_args()
+    asyncio.run(run(args.turns, args.budget))
+
+
+if __name__ == "__main__":
+    main_cli()
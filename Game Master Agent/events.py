@@ -0,0 +1,94 @@
+"""Weighted story event table, loaded once per process.
+
+Each entry in `events.json` has a text, a kind and a weight, plus optional
+effects the simulation engine (simulate.py) plays out and `generate_event`
+passes on to the agents as a hint: trap `damage` in dice notation, an `item`
+found, or an `enemy` with `enemy_hp`, `enemy_damage` and `enemy_armor`.
+
+    table = EventTable.load()
+    table.pick(state.rng()).describe()
+"""
+import json
+import os
+import random
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+DEFAULT_EVENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "events.json")
+
+_DICE = re.compile(r"^\s*(\d*)d(\d+)\s*(?:([+-])\s*(\d+))?\s*$")
+
+
+def parse_dice(notation: str) -> Tuple[int, int, int]:
+    """"2d6+1" -> (count, sides, bonus) = (2, 6, 1)."""
+    match = _DICE.match(notation)
+    if not match:
+        raise ValueError(f"Bad dice notation {notation!r}; expected e.g. 1d6 or 2d8+1")
+    count, sides, sign, bonus = match.groups()
+    count, sides = int(count or 1), int(sides)
+    if count < 1 or sides < 1:
+        raise ValueError(f"Bad dice notation {notation!r}; count and sides must be at least 1")
+    return count, sides, (-1 if sign == "-" else 1) * int(bonus or 0)
+
+
+@dataclass(frozen=True)
+class Event:
+    text: str
+    kind: str
+    weight: float
+    damage: Optional[str] = None
+    item: Optional[str] = None
+    enemy: Optional[str] = None
+    enemy_hp: int = 0
+    enemy_damage: Optional[str] = None
+    enemy_armor: int = 10
+
+    def describe(self) -> str:
+        """The event text plus its mechanics, so the agents use the same numbers as the simulation."""
+        if self.enemy:
+            return f"{self.text} ({self.enemy}: {self.enemy_hp} HP, armor {self.enemy_armor}, hits for {self.enemy_damage})"
+        if self.damage:
+            return f"{self.text} ({self.kind}: {self.damage} damage)"
+        if self.item:
+            return f"{self.text} (contains: {self.item})"
+        return self.text
+
+
+class EventTable:
+    """Events with cumulative weights; one pick is one `random()` draw and a bisect."""
+
+    def __init__(self, events: List[Event]) -> None:
+        if not events:
+            raise ValueError("The event table is empty")
+        for event in events:
+            if event.weight <= 0:
+                raise ValueError(f"Event {event.text!r} needs a positive weight")
+            for dice in (event.damage, event.enemy_damage):
+                if dice:
+                    parse_dice(dice)
+            if event.enemy and (event.enemy_hp <= 0 or not event.enemy_damage):
+                raise ValueError(f"Enemy event {event.text!r} needs enemy_hp and enemy_damage")
+        self.events = list(events)
+        self.cum_weights = list(accumulate(e.weight for e in self.events))
+        self.total = self.cum_weights[-1]
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_EVENTS_PATH) -> "EventTable":
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        try:
+            return cls([Event(**row) for row in rows])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid event table {path}: {e}") from e
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def pick(self, rng: random.Random) -> Event:
+        return self.events[bisect_right(self.cum_weights, rng.random() * self.total)]
+
+    def probabilities(self) -> List[float]:
+        return [e.weight / self.total for e in self.events]
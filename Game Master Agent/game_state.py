@@ -0,0 +1,221 @@
+import copy
+import os
+import random
+from collections import deque
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Known item effects (HP restored when used)
+ITEM_EFFECTS: Dict[str, int] = {
+    "Potion of Healing": 10,
+    "Greater Potion of Healing": 25,
+    "Bread": 2,
+}
+
+
+def new_seed() -> int:
+    """GAME_SEED if set (reproducible sessions), else a random seed."""
+    seed = os.getenv("GAME_SEED")
+    return int(seed) if seed else random.getrandbits(32)
+
+
+@dataclass(slots=True)
+class CombatState:
+    enemy: str
+    enemy_hp: int
+    enemy_max_hp: int
+    round: int = 1
+
+
+@dataclass(slots=True)
+class GameState:
+    """Player and world state for one game session.
+
+    Passed to `Runner.run` as the run context, so tools read and change it
+    through `RunContextWrapper[GameState]` and every agent sees a compact
+    snapshot in its instructions instead of rereading the whole transcript.
+    The snapshot string is cached and only rebuilt after a change.
+
+    Dice and events draw from the session's own seed: draw n of a seed is
+    always the same, so a session replays identically, also after a resume.
+
+    `handoffs` lists which agent answered the last turns; the speculative
+    mode predicts the next sub-agent from it and runs that agent on a
+    `fork()` of the state, which is `adopt()`ed only if the guess was right.
+    """
+
+    hp: int = 20
+    max_hp: int = 20
+    location: str = "the Village of Eldermere"
+    gold: int = 10
+    inventory: Dict[str, int] = field(default_factory=lambda: {"Rusty Sword": 1, "Potion of Healing": 1})
+    combat: Optional[CombatState] = None
+    status: str = "alive"  # "alive" or "dead"
+    turn: int = 0
+    recent_events: Deque[str] = field(default_factory=lambda: deque(maxlen=5))
+    handoffs: Deque[str] = field(default_factory=lambda: deque(maxlen=20))
+    seed: int = field(default_factory=new_seed)
+    draws: int = 0
+    version: int = 0
+    _snapshot: Optional[str] = None
+    _snapshot_version: int = -1
+    _forked_at: Optional[Tuple[int, int]] = None
+
+    def _changed(self, event: Optional[str] = None) -> None:
+        self.version += 1
+        if event:
+            self.recent_events.append(event)
+
+    # ---------- randomness ----------
+
+    def rng(self) -> random.Random:
+        """A generator for the session's next draw, seeded from (seed, draw number)."""
+        rng = random.Random(self.seed * 2**32 + self.draws)
+        self.draws += 1
+        return rng
+
+    def roll(self, sides: int = 20) -> int:
+        return self.rng().randint(1, sides)
+
+    # ---------- player ----------
+
+    def damage(self, amount: int, source: str = "") -> str:
+        self.hp = max(0, self.hp - max(0, amount))
+        if self.hp == 0:
+            self.status = "dead"
+            self.combat = None
+        self._changed(f"Took {amount} damage{f' from {source}' if source else ''}")
+        return f"Player takes {amount} damage. HP {self.hp}/{self.max_hp}." + (" The player has died." if self.hp == 0 else "")
+
+    def heal(self, amount: int) -> str:
+        if self.status == "dead":
+            return "The player is dead and cannot be healed."
+        before = self.hp
+        self.hp = min(self.max_hp, self.hp + max(0, amount))
+        self._changed(f"Healed {self.hp - before} HP")
+        return f"Player heals {self.hp - before} HP. HP {self.hp}/{self.max_hp}."
+
+    def move(self, location: str) -> str:
+        self.location = location
+        self._changed(f"Moved to {location}")
+        return f"Player is now at {location}."
+
+    # ---------- inventory ----------
+
+    def add_item(self, item: str, quantity: int = 1) -> str:
+        self.inventory[item] = self.inventory.get(item, 0) + max(1, quantity)
+        self._changed(f"Gained {item} x{max(1, quantity)}")
+        return f"Added {item} x{max(1, quantity)}."
+
+    def remove_item(self, item: str, quantity: int = 1) -> str:
+        have = self.inventory.get(item, 0)
+        if have == 0:
+            return f"The player has no {item}."
+        left = have - max(1, quantity)
+        if left > 0:
+            self.inventory[item] = left
+        else:
+            del self.inventory[item]
+        self._changed(f"Lost {item}")
+        return f"Removed {item}. {max(0, left)} left."
+
+    def use_item(self, item: str) -> str:
+        if self.inventory.get(item, 0) == 0:
+            return f"The player has no {item}."
+        effect = ITEM_EFFECTS.get(item)
+        if effect and self.status == "dead":
+            return f"The player is dead and cannot use {item}."
+        self.remove_item(item)
+        if effect:
+            return f"Used {item}. " + self.heal(effect)
+        return f"Used {item}."
+
+    # ---------- combat ----------
+
+    def start_combat(self, enemy: str, enemy_hp: int) -> str:
+        self.combat = CombatState(enemy=enemy, enemy_hp=enemy_hp, enemy_max_hp=enemy_hp)
+        self._changed(f"Combat started with {enemy}")
+        return f"Combat begins: {enemy} ({enemy_hp} HP)."
+
+    def hit_enemy(self, amount: int) -> str:
+        if self.combat is None:
+            return "There is no active combat."
+        c = self.combat
+        c.enemy_hp = max(0, c.enemy_hp - max(0, amount))
+        c.round += 1
+        self._changed()
+        if c.enemy_hp == 0:
+            return f"{c.enemy} takes {amount} damage and is defeated. " + self.end_combat("won")
+        return f"{c.enemy} takes {amount} damage. Enemy HP {c.enemy_hp}/{c.enemy_max_hp}."
+
+    def end_combat(self, outcome: str) -> str:
+        if self.combat is None:
+            return "There is no active combat."
+        enemy = self.combat.enemy
+        self.combat = None
+        self._changed(f"Combat with {enemy} ended: {outcome}")
+        return f"Combat with {enemy} ended ({outcome})."
+
+    # ---------- speculation ----------
+
+    def record_handoff(self, agent: str) -> None:
+        """Remember which agent answered this turn."""
+        self.handoffs.append(agent)
+
+    def fork(self) -> "GameState":
+        """A private copy for a speculative run; its changes stay there until adopted."""
+        forked = copy.deepcopy(self)
+        forked._forked_at = (self.version, self.draws)
+        return forked
+
+    def adopt(self, forked: "GameState") -> bool:
+        """Take over a fork's changes, unless this state changed (or drew dice) since the fork."""
+        if forked._forked_at != (self.version, self.draws):
+            return False
+        for f in fields(self):
+            setattr(self, f.name, getattr(forked, f.name))
+        self._forked_at = None
+        return True
+
+    # ---------- persistence ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON-able form, for saving the game in a session store."""
+        return {
+            "hp": self.hp, "max_hp": self.max_hp, "location": self.location, "gold": self.gold,
+            "inventory": dict(self.inventory), "combat": asdict(self.combat) if self.combat else None,
+            "status": self.status, "turn": self.turn, "recent_events": list(self.recent_events),
+            "seed": self.seed, "draws": self.draws, "handoffs": list(self.handoffs),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameState":
+        state = cls(hp=data["hp"], max_hp=data["max_hp"], location=data["location"], gold=data["gold"],
+                    inventory=dict(data["inventory"]), status=data["status"], turn=data["turn"])
+        # Sessions saved before seeding keep their state and get a fresh seed
+        if "seed" in data:
+            state.seed, state.draws = data["seed"], data["draws"]
+        state.combat = CombatState(**data["combat"]) if data.get("combat") else None
+        state.recent_events.extend(data.get("recent_events", []))
+        state.handoffs.extend(data.get("handoffs", []))
+        return state
+
+    # ---------- snapshot ----------
+
+    def snapshot(self) -> str:
+        """Compact, cached text description of the current state."""
+        if self._snapshot is not None and self._snapshot_version == self.version:
+            return self._snapshot
+        items = ", ".join(f"{name} x{n}" if n > 1 else name for name, n in self.inventory.items()) or "nothing"
+        lines = [
+            f"HP {self.hp}/{self.max_hp} ({self.status}) | Gold {self.gold} | Location: {self.location}",
+            f"Inventory: {items}",
+        ]
+        if self.combat is not None:
+            c = self.combat
+            lines.append(f"In combat with {c.enemy} (HP {c.enemy_hp}/{c.enemy_max_hp}, round {c.round})")
+        if self.recent_events:
+            lines.append("Recent: " + "; ".join(self.recent_events))
+        self._snapshot = "\n".join(lines)
+        self._snapshot_version = self.version
+        return self._snapshot
@@ -1,30 +1,130 @@
 import os
+import sys
 from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, RunContextWrapper, set_tracing_disabled
-import random
+from agents import Agent, Runner, function_tool, RunContextWrapper
+import time
 import asyncio
+from events import DEFAULT_EVENTS_PATH, EventTable
+from game_state import GameState
+
+# Shared helpers live in the repo-level `common` package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.history import HistoryManager
+from common.provider import api_key_configured, lazy_model
+from common.router import PreRouter, classifier_from_env
+from common.sessions import store_from_env
+from common.speculative import HandoffPredictor, SpeculativeRunner
+from common.streaming import StreamStats, stream_turn
+from common.tracing import setup_tracing, timed_span, turn_trace
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Get Gemini API key from environment variables
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-if not gemini_api_key:
-    print("Error: GEMINI_API_KEY not found in .env file.")
+# The Gemini client is built lazily on the first model call and shared by
+# every agent through one pooled connection pool (see common/provider.py)
+model = lazy_model("gemini-2.0-flash")
 
-# Initialize OpenAI provider with Gemini API settings
-provider = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai",
-)
+# Story events with weights, loaded once; EVENT_TABLE points at another JSON table
+EVENTS = EventTable.load(os.getenv("EVENT_TABLE") or DEFAULT_EVENTS_PATH)
+
+@function_tool
+def roll_dice(ctx: RunContextWrapper[GameState], sides: int = 20) -> int:
+    """
+    Rolls a dice with the specified number of sides (default is 20).
+    Returns the rolled number.
+    """
+    return ctx.context.roll(sides)
+
+@function_tool
+def generate_event(ctx: RunContextWrapper[GameState]) -> str:
+    """
+    Generates a random story event for the adventure.
+    Can include ambushes, puzzles, strange encounters, or magical discoveries.
+    Enemy stats, trap damage or found items are given in parentheses.
+    """
+    return EVENTS.pick(ctx.context.rng()).describe()
+
+
+# Game state tools: agents read and change HP, inventory and combat through these
+@function_tool
+def get_game_state(ctx: RunContextWrapper[GameState]) -> str:
+    """
+    Returns the player's current HP, location, inventory and combat status.
+    """
+    return ctx.context.snapshot()
+
+@function_tool
+def change_hp(ctx: RunContextWrapper[GameState], amount: int, source: str = "") -> str:
+    """
+    Changes the player's HP. Use a negative amount for damage and a positive amount for healing.
+    """
+    if amount < 0:
+        return ctx.context.damage(-amount, source)
+    return ctx.context.heal(amount)
+
+@function_tool
+def move_to(ctx: RunContextWrapper[GameState], location: str) -> str:
+    """
+    Moves the player to a new location.
+    """
+    return ctx.context.move(location)
+
+@function_tool
+def add_item(ctx: RunContextWrapper[GameState], item: str, quantity: int = 1) -> str:
+    """
+    Adds an item to the player's inventory.
+    """
+    return ctx.context.add_item(item, quantity)
+
+@function_tool
+def remove_item(ctx: RunContextWrapper[GameState], item: str, quantity: int = 1) -> str:
+    """
+    Removes (discards) an item from the player's inventory.
+    """
+    return ctx.context.remove_item(item, quantity)
+
+@function_tool
+def use_item(ctx: RunContextWrapper[GameState], item: str) -> str:
+    """
+    Uses an item from the inventory and applies its effect (e.g., healing).
+    """
+    return ctx.context.use_item(item)
+
+@function_tool
+def start_combat(ctx: RunContextWrapper[GameState], enemy: str, enemy_hp: int) -> str:
+    """
+    Starts combat with an enemy that has the given HP.
+    """
+    return ctx.context.start_combat(enemy, enemy_hp)
+
+@function_tool
+def damage_enemy(ctx: RunContextWrapper[GameState], amount: int) -> str:
+    """
+    Deals damage to the enemy in the current combat. Ends combat when the enemy reaches 0 HP.
+    """
+    return ctx.context.hit_enemy(amount)
+
+@function_tool
+def end_combat(ctx: RunContextWrapper[GameState], outcome: str) -> str:
+    """
+    Ends the current combat with an outcome: "won", "fled" or "died".
+    """
+    return ctx.context.end_combat(outcome)
+
+
+def with_game_state(instructions: str):
+    """Append the current game state snapshot to an agent's instructions."""
+    def build(ctx: RunContextWrapper[GameState], agent: Agent) -> str:
+        if not isinstance(ctx.context, GameState):
+            return instructions
+        return f"{instructions}\nCurrent game state (update it only through the state tools):\n{ctx.context.snapshot()}\n"
+    return build
 
-# Configure the language model
-model = OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=provider)
 
 
 narratorAgent=Agent(
     name="Narrator Agent",
-  instructions='''You are the Narrator Agent for a fantasy text-based adventure game.
+  instructions=with_game_state('''You are the Narrator Agent for a fantasy text-based adventure game.
 
 Your job is to:
 - Continue the main story based on the player's choices.
@@ -33,17 +133,19 @@ Your job is to:
 - Roll dice via the `roll_dice` tool to determine luck-based outcomes (e.g., escaping danger, solving a puzzle).
 - Hand off control to Monster Agent when an enemy is encountered.
 - Hand off control to Item Agent after events involving loot, discoveries, or inventory changes.
+- Use `move_to` when the player travels somewhere new and `change_hp` for traps or hazards.
 
 Always end your response with a prompt asking the player what they want to do next.
 Stay in character as a fantasy narrator (medieval tone is preferred).
-''',
-    model=model
+'''),
+    model=model,
+    tools=[generate_event, roll_dice, move_to, change_hp, get_game_state],
 )
 
 
 monsterAgent=Agent(
     name="Monster Agent",
-    instructions='''You are the Monster Agent in a fantasy adventure game.
+    instructions=with_game_state('''You are the Monster Agent in a fantasy adventure game.
 
 Your responsibilities are:
 - Control all combat scenarios when a monster or enemy appears.
@@ -55,13 +157,16 @@ Your responsibilities are:
   ● The player flees (hand back to Narrator Agent).
   ● The player dies (end the game).
 - Keep battles fair but thrilling, and maintain a sense of danger and urgency.
-''',
-    model=model
+- Record combat with `start_combat`, `damage_enemy`, `change_hp` (damage to the player) and `end_combat`.
+- When the event named the enemy's HP and damage dice, use those numbers (e.g. `start_combat` with that HP).
+'''),
+    model=model,
+    tools=[roll_dice, start_combat, damage_enemy, change_hp, end_combat, get_game_state],
 )
 
 itemAgent=Agent(
     name="Item Agent",
-    instructions='''You are the Item Agent in a fantasy adventure game.
+    instructions=with_game_state('''You are the Item Agent in a fantasy adventure game.
 
 Your tasks include:
 - Manage the player’s inventory (track items, weapons, potions, etc.).
@@ -75,13 +180,15 @@ Your tasks include:
 - After item interactions, return control to the Narrator Agent.
 
 Keep track of magical, rare, or cursed items with special attention.
-''',
- model=model
+Change the inventory only with `add_item`, `remove_item` and `use_item`.
+'''),
+ model=model,
+ tools=[add_item, remove_item, use_item, get_game_state],
 )
 
 main_Agent=Agent(
     name="Main Controller Agent",
-    instructions='''You are the Game Master Agent for a fantasy text-based adventure game.
+    instructions=with_game_state('''You are the Game Master Agent for a fantasy text-based adventure game.
 
 Your role is to manage the overall game flow and delegate tasks to sub-agents:
 - Use **Narrator Agent** to progress the main story and respond to player's general choices.
@@ -97,51 +204,110 @@ You must:
 - Never repeat or override the sub-agents’ detailed responses — let them do their job.
 
 Start the game by initiating the **Narrator Agent** and prompting the player’s first choice.
-''',
-model=model
-
+'''),
+model=model,
+tools=[roll_dice, generate_event, get_game_state],
+handoffs=[narratorAgent, monsterAgent, itemAgent],
 )
 
-@function_tool
-def roll_dice(sides: int = 20) -> int:
-    """
-    Rolls a dice with the specified number of sides (default is 20).
-    Returns the rolled number.
-    """
-    return random.randint(1, sides)
+# Keyword rules for the local pre-router; clear-cut actions skip the Game Master call.
+# One phrase is enough; generic keywords need a second match
+ROUTING_RULES = {
+    "Monster Agent": [r"\b(attack|fight|strike|slash|stab|shoot|defend|block|parry|flee|run away)\b",
+                      r"\bcast .* (at|on)\b", r"\bcombat\b"],
+    "Item Agent": [r"\binventory\b", r"\bpick (it |them )?up\b", r"\b(use|drink|equip|discard|drop) (the |my |a )?\w+",
+                   r"\bloot\b", r"\bpotions?\b", r"\b(what|which) items\b", r"\bdo i (have|carry)\b"],
+    "Narrator Agent": [r"\b(go|walk|head|travel) (north|south|east|west|to|into|inside|back)\b",
+                       r"\blook around\b", r"\bexplore\b", r"\bopen the (door|gate)\b", r"\btalk to\b",
+                       r"\benter\b", r"\bsearch the\b"],
+}
+ROUTING_KEYWORDS = {
+    "Item Agent": [r"\bitems?\b"],
+}
 
-@function_tool
-def generate_event() -> str:
-    """
-    Generates a random story event for the adventure.
-    Can include ambushes, puzzles, strange encounters, or magical discoveries.
-    """
-    events = [
-        "A hidden trap is triggered beneath your feet.",
-        "You find a glowing chest half-buried in the ground.",
-        "A mysterious traveler offers you a deal.",
-        "An ancient riddle is carved into the stone wall.",
-        "A sudden storm engulfs the forest path.",
-        "You hear whispers coming from the shadows nearby."
-    ]
-    return random.choice(events)
+router=PreRouter(
+    agents={agent.name: agent for agent in (narratorAgent, monsterAgent, itemAgent)},
+    rules=ROUTING_RULES,
+    keywords=ROUTING_KEYWORDS,
+    classifier=classifier_from_env(),
+)
 
+# SPECULATIVE_HANDOFFS=1 starts the likely sub-agent (from recent handoffs) while
+# the Main Controller is still deciding; a wrong guess is cancelled
+speculator=SpeculativeRunner(
+    main_Agent,
+    router.agents,
+    HandoffPredictor(list(router.agents),threshold=float(os.getenv("SPECULATION_THRESHOLD","0.6"))),
+) if os.getenv("SPECULATIVE_HANDOFFS") else None
 
-set_tracing_disabled(disabled=True)
+# Local span recording, enabled by TRACE_SPANS (a JSONL path or "memory");
+# otherwise SDK tracing stays disabled
+recorder=setup_tracing()
 
 async def main():
-    conversation_history=[]
+    if not api_key_configured():
+        print("Error: GEMINI_API_KEY not found in .env file.")
+    # Keep a bounded window of recent turns plus a rolling summary
+    # The GameState snapshot carries HP, inventory and combat, so a short window is enough
+    budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+    # SESSION_STORE keeps the adventure across restarts; SESSION_ID picks which one to resume
+    store=store_from_env()
+    session_id=f"game:{os.getenv('SESSION_ID', 'default')}"
+    saved=store.load_state(session_id,"game_state") if store else None
+    if saved and saved["status"]=="dead":
+        # That adventure is over; start a new one
+        store.delete(session_id)
+        saved=None
+    history=HistoryManager.resume(store,session_id,token_budget=budget) if store else HistoryManager(token_budget=budget)
+    state=GameState.from_dict(saved) if saved else GameState()
+    # STREAM_OUTPUT=1 prints tokens as they arrive instead of waiting for the full answer
+    streaming=bool(os.getenv("STREAM_OUTPUT"))
+    stream_stats=StreamStats()
     while True:
         user_input=input("You: ")
-        conversation_history.append({"role":"user","content":user_input})
-        
-        result= await Runner.run(main_Agent,conversation_history)
+        # One trace per turn: history handling, model calls, tools and handoffs
+        with turn_trace("game"):
+            with timed_span("history.start_turn") as span:
+                conversation_history=history.start_turn(user_input)
+                span["bytes"]=history.stats[-1].bytes_sent
+            
+            # Start at the sub-agent directly when the player's intent is clear
+            start_agent,decision=router.pick(user_input,main_Agent)
+            started=time.perf_counter()
+            if streaming:
+                result,_= await stream_turn(start_agent,conversation_history,context=state,stats=stream_stats)
+            else:
+                if speculator and start_agent is main_Agent:
+                    result= await speculator.run(conversation_history,context=state,history=state.handoffs)
+                else:
+                    result= await Runner.run(start_agent,conversation_history,context=state)
                 # Print the agent's response
-        print(f"Assistant: {result.final_output}")
+                print(f"Assistant: {result.final_output}")
+            router.timed(decision,started)
+            state.record_handoff(result.last_agent.name)
+            
+            # Store only the new items of this turn
+            with timed_span("history.finish_turn"):
+                history.finish_turn(result.to_input_list())
+        if os.getenv("SHOW_HISTORY_STATS"):
+            print(history.report())
+        if streaming and os.getenv("SHOW_STREAM_STATS"):
+            print(stream_stats.report())
+        if os.getenv("SHOW_ROUTER_STATS"):
+            print(router.stats.report())
+        if speculator and os.getenv("SHOW_SPECULATION_STATS"):
+            print(speculator.stats.report())
+        if os.getenv("SHOW_TRACE_SUMMARY") and recorder is not None:
+            print(recorder.summary())
         
-        # Update conversation history with the agent's response
-        conversation_history = result.to_input_list()
+        state.turn+=1
+        if store:
+            store.save_state(session_id,"game_state",state.to_dict())
+        if state.status=="dead":
+            print("Game over.")
+            break
 
 # Run the async main function
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
 
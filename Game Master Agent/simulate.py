@@ -0,0 +1,260 @@
+"""Headless balance simulation: many adventures at once, without the LLM.
+
+Plays the event table (events.json) under a fixed set of combat rules for
+every session together: dice are NumPy arrays with one roll per live session
+per step. Sessions are split into fixed-size chunks, each with its own seed
+derived from --seed, and the chunks run across processes. Results depend only
+on the seed and chunk size, not on the number of workers.
+
+Each step draws one event per live session: traps deal their damage, found
+healing potions go to the player, and enemies start a fight. Every round of
+a fight, for each session still in it:
+
+1. at or below `heal_below` HP with a potion left: drink it
+2. else at or below `flee_below` HP: escape on d20 >= `flee_dc`
+3. else attack: d20 + `attack_bonus` >= the enemy's armor hits for `player_damage`
+4. an enemy still there hits back on d20 + `enemy_attack_bonus` >= `player_armor`
+
+Run from the app folder:
+    python simulate.py [--sessions 100000] [--events 10] [--workers 4] [--set flee_below=3 --baseline]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields, replace
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from events import DEFAULT_EVENTS_PATH, EventTable, parse_dice
+from game_state import ITEM_EFFECTS, GameState
+
+_PLAYER = GameState()
+
+
+@dataclass(frozen=True)
+class Balance:
+    """Combat rules and the player's stats; defaults follow a new GameState."""
+
+    player_hp: int = _PLAYER.max_hp
+    potions: int = _PLAYER.inventory.get("Potion of Healing", 0)
+    potion_item: str = "Potion of Healing"
+    potion_heal: int = ITEM_EFFECTS["Potion of Healing"]
+    attack_bonus: int = 2
+    player_damage: str = "1d8"  # Rusty Sword
+    player_armor: int = 12
+    enemy_attack_bonus: int = 2
+    heal_below: int = 8
+    flee_below: int = 4
+    flee_dc: int = 12
+    max_rounds: int = 50
+
+
+def roll(rng: np.random.Generator, count, sides, bonus, n: int) -> np.ndarray:
+    """`n` sums of `count` dice with `sides` faces plus `bonus`; each a scalar or a length-`n` array."""
+    count, sides, bonus = (np.broadcast_to(np.asarray(a, dtype=np.int64), (n,)) for a in (count, sides, bonus))
+    most = int(count.max()) if n else 0
+    faces = rng.integers(1, sides[:, None] + 1, size=(n, most))
+    return (faces * (np.arange(most) < count[:, None])).sum(axis=1) + bonus
+
+
+class _TableArrays:
+    """The event table as per-event NumPy columns, indexed by picked event."""
+
+    def __init__(self, table: EventTable, balance: Balance) -> None:
+        events = table.events
+        self.prob = np.array(table.probabilities())
+
+        def dice(attr: str) -> np.ndarray:
+            return np.array([parse_dice(getattr(e, attr)) if getattr(e, attr) else (0, 1, 0) for e in events],
+                            dtype=np.int64).T
+
+        self.trap = np.array([bool(e.damage) for e in events])
+        self.trap_count, self.trap_sides, self.trap_bonus = dice("damage")
+        self.potion = np.array([int(e.item == balance.potion_item) for e in events])
+        self.enemy = np.array([bool(e.enemy) for e in events])
+        self.enemy_hp = np.array([e.enemy_hp for e in events], dtype=np.int64)
+        self.enemy_armor = np.array([e.enemy_armor for e in events], dtype=np.int64)
+        self.hit_count, self.hit_sides, self.hit_bonus = dice("enemy_damage")
+
+
+@dataclass
+class SimResult:
+    """Outcome counts; the per-event arrays are indexed like the event table."""
+
+    sessions: int = 0
+    survived: int = 0
+    died_to_traps: int = 0
+    rounds: int = 0
+    potions_used: int = 0
+    picked: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    won: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    fled: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    died: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    stalled: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def empty(cls, n_events: int) -> "SimResult":
+        return cls(**{f.name: np.zeros(n_events, dtype=np.int64) for f in fields(cls) if f.name in _PER_EVENT})
+
+    def merge(self, other: "SimResult") -> "SimResult":
+        return SimResult(**{f.name: getattr(self, f.name) + getattr(other, f.name) for f in fields(self)})
+
+    @property
+    def combats(self) -> int:
+        return int(self.won.sum() + self.fled.sum() + self.died.sum() + self.stalled.sum())
+
+    def report(self, table: EventTable, seconds: float, events: int, workers: int) -> str:
+        pct = lambda part, whole: f"{100 * part / max(1, whole):5.1f}%"  # noqa: E731
+        died_in_combat = int(self.died.sum())
+        lines = [
+            f"{self.sessions:,} sessions x {events} events in {seconds:.2f}s on {workers} worker(s): "
+            f"{self.sessions / seconds:,.0f} sessions/s, {self.combats / seconds:,.0f} combats/s",
+            f"Sessions  survived {pct(self.survived, self.sessions)}  died in combat "
+            f"{pct(died_in_combat, self.sessions)}  died to traps {pct(self.died_to_traps, self.sessions)}  "
+            f"potions used {self.potions_used / max(1, self.sessions):.2f}/session",
+            f"Combats   {self.combats:,}  won {pct(self.won.sum(), self.combats)}  fled "
+            f"{pct(self.fled.sum(), self.combats)}  died {pct(died_in_combat, self.combats)}  stalled "
+            f"{pct(self.stalled.sum(), self.combats)}  {self.rounds / max(1, self.combats):.1f} rounds each",
+        ]
+        for i, event in enumerate(table.events):
+            fights = int(self.won[i] + self.fled[i] + self.died[i] + self.stalled[i])
+            if event.enemy:
+                lines.append(f"  {event.enemy:<12} {fights:>9,} fights  won {pct(self.won[i], fights)}  "
+                             f"fled {pct(self.fled[i], fights)}  died {pct(self.died[i], fights)}")
+        return "\n".join(lines)
+
+
+_PER_EVENT = {"picked", "won", "fled", "died", "stalled"}
+
+
+def _combat(rng: np.random.Generator, balance: Balance, arrays: _TableArrays, ix: np.ndarray, e: np.ndarray,
+            hp: np.ndarray, potions: np.ndarray, alive: np.ndarray, result: SimResult) -> None:
+    """Fight every session in `ix` against its enemy `e` until each one is won, fled or died."""
+    n_events = len(arrays.prob)
+    enemy_hp = arrays.enemy_hp[e]
+    dmg_count, dmg_sides, dmg_bonus = parse_dice(balance.player_damage)
+    for _ in range(balance.max_rounds):
+        if ix.size == 0:
+            return
+        n = ix.size
+        result.rounds += n
+        player_hp = hp[ix]
+        drink = (player_hp <= balance.heal_below) & (potions[ix] > 0)
+        hp[ix[drink]] = np.minimum(balance.player_hp, player_hp[drink] + balance.potion_heal)
+        potions[ix[drink]] -= 1
+        result.potions_used += int(drink.sum())
+        flee = ~drink & (player_hp <= balance.flee_below)
+        escaped = flee & (rng.integers(1, 21, n) >= balance.flee_dc)
+        hit = ~drink & ~flee & (rng.integers(1, 21, n) + balance.attack_bonus >= arrays.enemy_armor[e])
+        enemy_hp = enemy_hp - np.where(hit, roll(rng, dmg_count, dmg_sides, dmg_bonus, n), 0)
+        won = enemy_hp <= 0
+        stays = ~won & ~escaped
+        struck = stays & (rng.integers(1, 21, n) + balance.enemy_attack_bonus >= balance.player_armor)
+        hp[ix] -= np.where(struck, roll(rng, arrays.hit_count[e], arrays.hit_sides[e], arrays.hit_bonus[e], n), 0)
+        died = stays & (hp[ix] <= 0)
+        alive[ix[died]] = False
+        result.won += np.bincount(e[won], minlength=n_events)
+        result.fled += np.bincount(e[escaped], minlength=n_events)
+        result.died += np.bincount(e[died], minlength=n_events)
+        keep = stays & ~died
+        ix, e, enemy_hp = ix[keep], e[keep], enemy_hp[keep]
+    result.stalled += np.bincount(e, minlength=n_events)
+
+
+def simulate_chunk(table: EventTable, balance: Balance, sessions: int, events: int,
+                   seed: np.random.SeedSequence) -> SimResult:
+    """Play `sessions` adventures of `events` events each, vectorized over the sessions."""
+    rng = np.random.default_rng(seed)
+    arrays = _TableArrays(table, balance)
+    result = SimResult.empty(len(table))
+    result.sessions = sessions
+    hp = np.full(sessions, balance.player_hp, dtype=np.int64)
+    potions = np.full(sessions, balance.potions, dtype=np.int64)
+    alive = np.ones(sessions, dtype=bool)
+    for _ in range(events):
+        live = np.flatnonzero(alive)
+        if live.size == 0:
+            break
+        picked = rng.choice(len(table), size=live.size, p=arrays.prob)
+        result.picked += np.bincount(picked, minlength=len(table))
+
+        trapped = arrays.trap[picked]
+        ix, e = live[trapped], picked[trapped]
+        hp[ix] -= roll(rng, arrays.trap_count[e], arrays.trap_sides[e], arrays.trap_bonus[e], ix.size)
+        dead = ix[hp[ix] <= 0]
+        alive[dead] = False
+        result.died_to_traps += dead.size
+
+        potions[live] += arrays.potion[picked]
+
+        fighting = arrays.enemy[picked]
+        _combat(rng, balance, arrays, live[fighting], picked[fighting], hp, potions, alive, result)
+    result.survived = int(alive.sum())
+    return result
+
+
+def _run_chunk(job: tuple) -> SimResult:
+    return simulate_chunk(*job)
+
+
+def simulate(table: EventTable, balance: Balance, sessions: int, events: int = 10, seed: int = 0,
+             workers: int = 1, chunk_size: int = 20_000) -> SimResult:
+    """Play `sessions` adventures in chunks of `chunk_size`, over `workers` processes."""
+    sizes = [chunk_size] * (sessions // chunk_size) + ([sessions % chunk_size] if sessions % chunk_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(table, balance, n, events, s) for n, s in zip(sizes, seeds)]
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_run_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_run_chunk, jobs))
+    total = SimResult.empty(len(table))
+    for result in results:
+        total = total.merge(result)
+    return total
+
+
+def apply_overrides(balance: Balance, overrides: Sequence[str]) -> Balance:
+    """Apply "name=value" overrides, e.g. ["flee_below=3", "player_damage=1d10"]."""
+    types = {f.name: type(getattr(balance, f.name)) for f in fields(balance)}
+    changes = {}
+    for item in overrides:
+        name, sep, value = item.partition("=")
+        if not sep or name not in types:
+            raise SystemExit(f"Unknown balance setting {item!r}; expected name=value with name in {sorted(types)}")
+        changes[name] = types[name](value)
+    changed = replace(balance, **changes)
+    parse_dice(changed.player_damage)
+    return changed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless Game Master balance simulation.")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=10, help="Events per session")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--table", default=os.getenv("EVENT_TABLE") or DEFAULT_EVENTS_PATH)
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="NAME=VALUE",
+                        help="Change a Balance setting (repeatable)")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Also run the default balance with the same seed, for comparison")
+    args = parser.parse_args(argv)
+
+    table = EventTable.load(args.table)
+    balance = apply_overrides(Balance(), args.overrides)
+    runs = [("baseline", Balance())] if args.baseline and args.overrides else []
+    runs.append(("changed" if runs else "balance", balance))
+    for name, rules in runs:
+        if len(runs) > 1 or args.overrides:
+            print(f"== {name}: " + ", ".join(args.overrides if rules is balance else ["defaults"]))
+        started = time.perf_counter()
+        result = simulate(table, rules, args.sessions, args.events, args.seed, args.workers, args.chunk_size)
+        print(result.report(table, time.perf_counter() - started, args.events, args.workers))
+
+
+if __name__ == "__main__":
+    main()
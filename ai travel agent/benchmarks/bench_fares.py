@@ -0,0 +1,102 @@
+"""Flexible-date fare search: one vectorized search vs. the per-date lookup in a loop.
+
+Finding the cheapest day in a range used to take one `get_flights` call per
+date, each a model round trip, then a comparison in the model's head. This
+times the lookups alone (no model):
+
+- loop: the original per-date logic (strptime + weekend uplift) for every date,
+  then a sort of all the results
+- on_date: the same loop through `FareSearch.on_date`
+- cheapest: one `FareSearch.cheapest` call over the whole range
+
+and prints the model round trips each approach would cost on top.
+
+Run from the app folder:  python benchmarks/bench_fares.py [--days 7 30 90 365] [--fares 3 50 500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fares import FareSearch  # noqa: E402
+
+AIRLINES = ["Delta", "United", "ANA", "Air France", "British Airways", "Budget Air"]
+START = "2025-07-01"
+
+
+def make_fares(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [{
+        "airline": rng.choice(AIRLINES),
+        "departure": f"{rng.randrange(24):02d}:00",
+        "arrival": f"{rng.randrange(24):02d}:30",
+        "price": rng.randrange(80, 2500),
+    } for _ in range(n)]
+
+
+def dates_from(start: str, days: int):
+    first = datetime.strptime(start, "%Y-%m-%d")
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+
+def baseline_on_date(flights, date):
+    # The body `get_flights` had before fares.py
+    date_obj = datetime.strptime(date, "%Y-%m-%d")
+    if date_obj.weekday() >= 5:  # Weekend
+        flights = [{**f, "price": int(f["price"] * 1.2)} for f in flights]
+    return flights
+
+
+def loop_cheapest(lookup, dates, n):
+    options = [{"date": d, **f} for d in dates for f in lookup(d)]
+    return sorted(options, key=lambda o: o["price"])[:n]
+
+
+def best_of(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return median(samples) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90, 365])
+    parser.add_argument("--fares", type=int, nargs="+", default=[3, 50, 500], help="Fares per route")
+    parser.add_argument("--results", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--model-latency", type=float, default=0.8, help="Seconds per model round trip")
+    args = parser.parse_args()
+
+    print(f"{'fares':>6} {'days':>5} {'loop ms':>9} {'on_date ms':>11} {'cheapest ms':>12} {'speedup':>8}  "
+          f"{'round trips':>11} {'est. wall (loop -> cheapest)':>30}")
+    for n_fares in args.fares:
+        flights = make_fares(n_fares)
+        search = FareSearch(flights)
+        for days in args.days:
+            dates = dates_from(START, days)
+            end = dates[-1]
+            expected = loop_cheapest(lambda d: baseline_on_date(flights, d), dates, args.results)
+            got = search.cheapest(START, end, args.results)
+            assert [o["price"] for o in got] == [o["price"] for o in expected], (n_fares, days)
+
+            loop_ms = best_of(lambda: loop_cheapest(lambda d: baseline_on_date(flights, d), dates, args.results),
+                              args.repeat)
+            on_date_ms = best_of(lambda: loop_cheapest(search.on_date, dates, args.results), args.repeat)
+            cheapest_ms = best_of(lambda: search.cheapest(START, end, args.results), args.repeat)
+            # Each per-date call is a model round trip plus the final answer; the search is one plus the answer
+            loop_wall = (days + 1) * args.model_latency + loop_ms / 1e3
+            search_wall = 2 * args.model_latency + cheapest_ms / 1e3
+            print(f"{n_fares:>6} {days:>5} {loop_ms:>9.3f} {on_date_ms:>11.3f} {cheapest_ms:>12.3f} "
+                  f"{loop_ms / cheapest_ms:>7.1f}x  {days + 1:>5} -> 2  {loop_wall:>13.1f}s -> {search_wall:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
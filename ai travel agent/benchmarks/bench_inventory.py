@@ -0,0 +1,95 @@
+"""Query latency of the columnar inventory vs. the old dict/list-scan lookup.
+
+Run from the app folder:  python benchmarks/bench_inventory.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory import ColumnarInventory  # noqa: E402
+
+AIRLINES = ["Delta", "United", "ANA", "Air France", "British Airways", "Budget Air"]
+LOCATIONS = ["City Center", "Downtown", "Suburb", "Airport", "Old Town"]
+
+
+def make_rows(n: int, n_routes: int, n_cities: int, seed: int = 7):
+    rng = random.Random(seed)
+    routes = [f"R{i:04d}-X{i:04d}" for i in range(n_routes)]
+    cities = [f"City{i:04d}" for i in range(n_cities)]
+    flights = {}
+    for _ in range(n // 2):
+        flights.setdefault(rng.choice(routes), []).append({
+            "airline": rng.choice(AIRLINES),
+            "departure": f"{rng.randrange(24):02d}:00",
+            "arrival": f"{rng.randrange(24):02d}:30",
+            "price": rng.randrange(80, 2500),
+        })
+    hotels = {}
+    for i in range(n - n // 2):
+        hotels.setdefault(rng.choice(cities), []).append({
+            "name": f"Hotel {i}",
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+            "price": rng.randrange(40, 900),
+            "location": rng.choice(LOCATIONS),
+        })
+    flights["default"] = [{"airline": "Generic Airlines", "departure": "07:00", "arrival": "10:00", "price": 300}]
+    hotels["default"] = [{"name": "Grand Hotel", "rating": 4.5, "price": 200, "location": "City Center"}]
+    return flights, hotels, routes, cities
+
+
+def baseline_hotels(hotels, city, budget):
+    rows = hotels.get(city, hotels["default"])
+    out = [h for h in rows if h["price"] <= budget]
+    return out or [min(rows, key=lambda x: x["price"])]
+
+
+def time_queries(fn, queries):
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(*q)
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return median(samples) * 1e6, samples[int(len(samples) * 0.99) - 1] * 1e6
+
+
+def run(n: int, n_queries: int) -> None:
+    # Keep roughly 500 rows per route / city so per-key work grows with n
+    buckets = max(10, n // 1000)
+    flights, hotels, routes, cities = make_rows(n, buckets, buckets)
+
+    t0 = time.perf_counter()
+    inv = ColumnarInventory.from_mock(flights, hotels)
+    build_s = time.perf_counter() - t0
+
+    rng = random.Random(1)
+    route_q = [tuple(rng.choice(routes).split("-")) for _ in range(n_queries)]
+    # Tight budgets are the common case: only a handful of rows should match
+    hotel_q = [(rng.choice(cities), rng.randrange(40, 60)) for _ in range(n_queries)]
+
+    f_p50, f_p99 = time_queries(inv.find_flights, route_q)
+    h_p50, h_p99 = time_queries(inv.find_hotels, hotel_q)
+    b_p50, b_p99 = time_queries(lambda c, b: baseline_hotels(hotels, c, b), hotel_q)
+
+    print(f"rows={n:>9,}  build={build_s:6.2f}s")
+    print(f"  find_flights          p50={f_p50:8.1f}us  p99={f_p99:8.1f}us")
+    print(f"  find_hotels (bisect)  p50={h_p50:8.1f}us  p99={h_p99:8.1f}us")
+    print(f"  hotels (list scan)    p50={b_p50:8.1f}us  p99={b_p99:8.1f}us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    for n in args.sizes:
+        run(n, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Wall-clock time of the trip planner, sequential vs. parallel stages.
+
+Offline: the Explore Agent runs on the local stub model and the flight and
+hotel lookups get an artificial delay standing in for a remote inventory
+service (the in-process mock answers in microseconds).
+
+Run from the app folder:
+    python benchmarks/bench_planner.py [--plans 20] [--model-latency 0.8] [--lookup-latency 0.3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from statistics import mean, median
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.dirname(APP_DIR))
+
+from agents import RunConfig  # noqa: E402
+
+from common.stub_model import StubModel  # noqa: E402
+from planner import TripPlanner, TripRequest  # noqa: E402
+import main  # noqa: E402
+
+TRIPS = [
+    TripRequest("NYC", "London", "2025-06-10", "2025-06-15", 200),
+    TripRequest("NYC", "Paris", "2025-06-14", "2025-06-20", 350),
+    TripRequest("SFO", "Tokyo", "2025-07-01", "2025-07-09", 150),
+]
+
+
+def make_planner(model_latency: float, lookup_latency: float) -> TripPlanner:
+    async def flights(origin, destination, date):
+        await asyncio.sleep(lookup_latency)
+        return main.inventory.find_flights(origin, destination)
+
+    async def hotels(city, check_in, check_out, budget):
+        await asyncio.sleep(lookup_latency)
+        return main.inventory.find_hotels(city, budget)
+
+    stub = StubModel(latency=model_latency, reply="Visit the old town, the market hall and a riverside food tour.")
+    return TripPlanner(flights, hotels, main.explore_agent, run_config=RunConfig(model=stub))
+
+
+async def run_mode(planner: TripPlanner, plans: int, sequential: bool):
+    totals, stages = [], {}
+    for i in range(plans):
+        plan = await planner.plan(TRIPS[i % len(TRIPS)], sequential=sequential)
+        totals.append(plan.total)
+        for t in plan.timings:
+            stages.setdefault(t.name, []).append(t.seconds)
+    per_stage = "  ".join(f"{name}={mean(v) * 1000:.0f}ms" for name, v in stages.items())
+    label = "sequential" if sequential else "parallel"
+    print(f"  {label:<11} median={median(totals) * 1000:6.0f}ms  mean={mean(totals) * 1000:6.0f}ms  [{per_stage}]")
+    return median(totals)
+
+
+async def run(plans: int, model_latency: float, lookup_latency: float) -> None:
+    planner = make_planner(model_latency, lookup_latency)
+    print(f"== {plans} plans, explore model {model_latency * 1000:.0f}ms, lookups {lookup_latency * 1000:.0f}ms each")
+    before = await run_mode(planner, plans, sequential=True)
+    after = await run_mode(planner, plans, sequential=False)
+    print(f"  wall-clock reduction: {1 - after / before:.0%}")
+    print(f"  last plan: {planner.last_plan.timing_report()}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plans", type=int, default=20)
+    parser.add_argument("--model-latency", type=float, default=0.8, help="Stub model latency in seconds")
+    parser.add_argument("--lookup-latency", type=float, default=0.3, help="Simulated inventory latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.plans, args.model_latency, args.lookup_latency))
+
+
+if __name__ == "__main__":
+    main_cli()
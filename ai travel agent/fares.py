@@ -0,0 +1,138 @@
+"""Fare pricing over whole date ranges with NumPy.
+
+A route's base fares form one vector; a date range forms another. Pricing
+rules map the dates to a multiplier per date (and optionally per fare), and
+the priced fares are the date x fare matrix `base * multiplier`, computed in
+one vectorized step instead of a Python loop over dates and fares. Flexible
+searches ("cheapest day next month") then pick the cheapest cells of that
+matrix with `argpartition`.
+
+    search = FareSearch(inventory.find_flights("NYC", "LON"))
+    search.cheapest("2025-07-01", "2025-07-31", n=5)
+
+`get_flights` prices a single date through the same rules, so both tools
+always agree; with only one date it takes a scalar multiplier (cached per
+date) instead of building a matrix.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# The longest range one flexible search may cover
+MAX_RANGE_DAYS = 366
+
+# A rule maps (dates, weekdays) to a multiplier: shape (days,) or (days, fares)
+PricingRule = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def weekend_uplift(dates: np.ndarray, weekdays: np.ndarray) -> np.ndarray:
+    """Saturday and Sunday departures cost 20% more."""
+    return np.where(weekdays >= 5, 1.2, 1.0)
+
+
+PRICING_RULES: List[PricingRule] = [weekend_uplift]
+
+
+def parse_date(value: str) -> np.datetime64:
+    """A YYYY-MM-DD date as a day, parsed exactly as `get_flights` always has."""
+    return np.datetime64(datetime.strptime(value, "%Y-%m-%d").date(), "D")
+
+
+def range_days(start: str, end: str) -> int:
+    """Days from `start` to `end` inclusive, checked against `MAX_RANGE_DAYS`."""
+    first, last = parse_date(start), parse_date(end)
+    if last < first:
+        raise ValueError(f"End date {end} is before start date {start}")
+    days = int((last - first).astype(int)) + 1
+    if days > MAX_RANGE_DAYS:
+        raise ValueError(f"Date range covers {days} days; the limit is {MAX_RANGE_DAYS}")
+    return days
+
+
+def date_range(start: str, end: str) -> np.ndarray:
+    """Every day from `start` to `end` inclusive, as datetime64[D]."""
+    days = range_days(start, end)
+    first = parse_date(start)
+    return np.arange(first, first + days, dtype="datetime64[D]")
+
+
+def weekdays_of(dates: np.ndarray) -> np.ndarray:
+    """Monday=0 ... Sunday=6, like `datetime.weekday()` (1970-01-01 was a Thursday)."""
+    return (dates.astype(np.int64) + 3) % 7
+
+
+def price_matrix(base: np.ndarray, dates: np.ndarray, rules: Sequence[PricingRule] = PRICING_RULES) -> np.ndarray:
+    """Priced fares, shape (len(dates), len(base)), truncated to whole dollars like `int()`."""
+    weekdays = weekdays_of(dates)
+    multiplier = np.ones((len(dates), 1))
+    for rule in rules:
+        factor = np.asarray(rule(dates, weekdays), dtype=np.float64)
+        multiplier = multiplier * (factor[:, None] if factor.ndim == 1 else factor)
+    return (base[None, :] * multiplier).astype(np.int64)
+
+
+class FareSearch:
+    """Prices one route's fares across dates.
+
+    Args:
+        flights: The route's flights (dicts with airline, departure, arrival, price).
+        rules: Pricing rules applied in order.
+    """
+
+    def __init__(self, flights: Sequence[Dict], rules: Sequence[PricingRule] = PRICING_RULES) -> None:
+        self.flights = list(flights)
+        self.rules = rules
+        self.base = np.fromiter((f["price"] for f in self.flights), dtype=np.float64, count=len(self.flights))
+        # A date's multiplier depends only on the date, and the same dates come up again and again
+        self._date_factor = lru_cache(maxsize=1024)(self._factor)
+
+    def on_date(self, date: str) -> List[Dict]:
+        """The route's flights priced for one departure date."""
+        factor = self._date_factor(date)
+        if factor is None:
+            # Per-fare multipliers need the matrix
+            prices = price_matrix(self.base, np.array([parse_date(date)]), self.rules)[0]
+            return [{**f, "price": int(p)} for f, p in zip(self.flights, prices.tolist())]
+        if factor == 1.0:
+            return list(self.flights)
+        # One date: a scalar multiplier and a plain loop beat building a 1 x fares matrix
+        return [{**f, "price": int(f["price"] * factor)} for f in self.flights]
+
+    def _factor(self, date: str) -> Optional[float]:
+        """The rules' combined multiplier for one date, or None if a rule prices per fare."""
+        day = np.array([parse_date(date)])
+        weekdays = weekdays_of(day)
+        factor = 1.0
+        for rule in self.rules:
+            value = np.asarray(rule(day, weekdays), dtype=np.float64)
+            if value.ndim > 1:
+                return None
+            factor *= float(value[0])
+        return factor
+
+    def cells(self, start: str, end: str) -> int:
+        """Size of the date x fare matrix a `cheapest` search over this range prices."""
+        return range_days(start, end) * len(self.flights)
+
+    def cheapest(self, start: str, end: str, n: int = 5) -> List[Dict]:
+        """The `n` cheapest (date, flight) options between `start` and `end`, cheapest first.
+
+        Ties go to the earlier date, then to the flight listed first.
+        """
+        dates = date_range(start, end)
+        if not self.flights or n <= 0:
+            return []
+        flat = price_matrix(self.base, dates, self.rules).ravel()
+        n = min(n, flat.size)
+        # Unique keys: price, then flat index (date-major), so ties go to the earlier date
+        # and argpartition's pick at the cut-off is deterministic
+        keys = flat * flat.size + np.arange(flat.size)
+        picked = np.argpartition(keys, n - 1)[:n] if n < flat.size else np.arange(flat.size)
+        picked = picked[np.argsort(keys[picked])]
+        options = []
+        for cell in picked.tolist():
+            day, fare = divmod(cell, len(self.flights))
+            options.append({"date": str(dates[day]), **self.flights[fare], "price": int(flat[cell])})
+        return options
@@ -0,0 +1,148 @@
+from array import array
+from bisect import bisect_right
+from sys import intern
+from typing import Dict, Iterable, List, Mapping, Optional, Protocol
+import csv
+
+DEFAULT_KEY = "default"
+
+
+class InventoryBackend(Protocol):
+    """Interface the travel tools use to look up flights and hotels."""
+
+    def find_flights(self, origin: str, destination: str) -> List[dict]:
+        ...
+
+    def find_hotels(self, city: str, budget: int) -> List[dict]:
+        ...
+
+
+def route_key(origin: str, destination: str) -> str:
+    return f"{origin.upper()}-{destination.upper()}"
+
+
+class ColumnarInventory:
+    """Array-backed flight and hotel store, built once at startup.
+
+    Every field is stored as its own column. Flights are indexed per route and
+    hotels per city; each city's hotel rows are kept sorted by price so a
+    budget filter is a single bisect instead of a scan over the whole city.
+    """
+
+    def __init__(self) -> None:
+        # Flight columns
+        self._f_airline: List[str] = []
+        self._f_departure: List[str] = []
+        self._f_arrival: List[str] = []
+        self._f_price = array("i")
+        self._route_index: Dict[str, array] = {}
+
+        # Hotel columns
+        self._h_name: List[str] = []
+        self._h_rating = array("d")
+        self._h_price = array("i")
+        self._h_location: List[str] = []
+        self._city_rows: Dict[str, array] = {}
+        # city -> (sorted prices, row ids in the same order), filled by build()
+        self._city_index: Dict[str, tuple] = {}
+
+    # ---------- building ----------
+
+    def add_flight(self, route: str, airline: str, departure: str, arrival: str, price: int) -> None:
+        row = len(self._f_price)
+        self._f_airline.append(intern(airline))
+        self._f_departure.append(intern(departure))
+        self._f_arrival.append(intern(arrival))
+        self._f_price.append(int(price))
+        self._route_index.setdefault(route.upper() if route != DEFAULT_KEY else route, array("l")).append(row)
+
+    def add_hotel(self, city: str, name: str, rating: float, price: int, location: str) -> None:
+        row = len(self._h_price)
+        self._h_name.append(name)
+        self._h_rating.append(float(rating))
+        self._h_price.append(int(price))
+        self._h_location.append(intern(location))
+        self._city_rows.setdefault(city.title() if city != DEFAULT_KEY else city, array("l")).append(row)
+
+    def build(self) -> "ColumnarInventory":
+        """Sort every city's hotel rows by price. Call once after loading."""
+        for city, rows in self._city_rows.items():
+            ordered = sorted(rows, key=self._h_price.__getitem__)
+            prices = array("i", (self._h_price[r] for r in ordered))
+            self._city_index[city] = (prices, array("l", ordered))
+        return self
+
+    @classmethod
+    def from_mock(cls, flights: Mapping[str, Iterable[dict]], hotels: Mapping[str, Iterable[dict]]) -> "ColumnarInventory":
+        """Build the store from the MOCK_FLIGHTS / MOCK_HOTELS style dicts."""
+        inv = cls()
+        for route, rows in flights.items():
+            for f in rows:
+                inv.add_flight(route, f["airline"], f["departure"], f["arrival"], f["price"])
+        for city, rows in hotels.items():
+            for h in rows:
+                inv.add_hotel(city, h["name"], h["rating"], h["price"], h["location"])
+        return inv.build()
+
+    @classmethod
+    def from_csv(cls, flights_path: str, hotels_path: str) -> "ColumnarInventory":
+        """Build the store from two CSV files.
+
+        flights: route,airline,departure,arrival,price
+        hotels:  city,name,rating,price,location
+        """
+        inv = cls()
+        with open(flights_path, newline="", encoding="utf-8") as fh:
+            for r in csv.DictReader(fh):
+                inv.add_flight(r["route"], r["airline"], r["departure"], r["arrival"], int(r["price"]))
+        with open(hotels_path, newline="", encoding="utf-8") as fh:
+            for r in csv.DictReader(fh):
+                inv.add_hotel(r["city"], r["name"], float(r["rating"]), int(r["price"]), r["location"])
+        return inv.build()
+
+    # ---------- queries ----------
+
+    def __len__(self) -> int:
+        return len(self._f_price) + len(self._h_price)
+
+    def _flight(self, row: int) -> dict:
+        return {
+            "airline": self._f_airline[row],
+            "departure": self._f_departure[row],
+            "arrival": self._f_arrival[row],
+            "price": self._f_price[row],
+        }
+
+    def _hotel(self, row: int) -> dict:
+        return {
+            "name": self._h_name[row],
+            "rating": self._h_rating[row],
+            "price": self._h_price[row],
+            "location": self._h_location[row],
+        }
+
+    def find_flights(self, origin: str, destination: str) -> List[dict]:
+        rows = self._route_index.get(route_key(origin, destination))
+        if rows is None:
+            rows = self._route_index.get(DEFAULT_KEY, ())
+        return [self._flight(r) for r in rows]
+
+    def find_hotels(self, city: str, budget: int) -> List[dict]:
+        """Hotels in `city` priced at or under `budget`, in source order.
+
+        Falls back to the single cheapest hotel when nothing fits the budget,
+        matching the original `suggest_hotels` behaviour.
+        """
+        entry: Optional[tuple] = self._city_index.get(city.title())
+        if entry is None:
+            entry = self._city_index.get(DEFAULT_KEY)
+        if entry is None:
+            return []
+        prices, rows = entry
+        if not rows:
+            return []
+        cut = bisect_right(prices, budget)
+        if cut == 0:
+            return [self._hotel(rows[0])]
+        # The bisect finds the matches; row ids put them back in listing order
+        return [self._hotel(r) for r in sorted(rows[:cut])]
@@ -1,29 +1,35 @@
 import os
+import sys
+import time
 import asyncio
+from functools import lru_cache
 from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, RunContextWrapper, set_tracing_disabled
+from agents import Agent, Runner, function_tool, RunContextWrapper
 from dataclasses import dataclass
 from typing import List, Dict, Optional
-from datetime import datetime
 from pydantic import BaseModel
 from typing_extensions import TypedDict
+from fares import FareSearch
+from inventory import ColumnarInventory, InventoryBackend
+from planner import TripPlanner, TripRequest
+
+# Shared helpers live in the repo-level `common` package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import ResponseCache, TTLCache, cached_tool
+from common.history import HistoryManager
+from common.offload import get_offloader, offload
+from common.provider import api_key_configured, lazy_model
+from common.router import PreRouter, classifier_from_env
+from common.sessions import store_from_env
+from common.streaming import StreamStats, stream_turn
+from common.tracing import setup_tracing, timed_span, turn_trace
 
 # Load environment variables
 load_dotenv()
 
-# Get Gemini API key
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-if not gemini_api_key:
-    raise ValueError("Error: GEMINI_API_KEY not found in .env file.")
-
-# Initialize OpenAI provider with Gemini API settings
-provider = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai",
-)
-
-# Configure the language model
-model = OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=provider)
+# The Gemini client is built lazily on the first model call and shared by
+# every agent through one pooled connection pool (see common/provider.py)
+model = lazy_model("gemini-2.0-flash")
 
 # Define typed dictionaries for mock data
 class FlightInfo(TypedDict):
@@ -32,6 +38,13 @@ class FlightInfo(TypedDict):
     arrival: str
     price: int
 
+class FlightOption(TypedDict):
+    date: str
+    airline: str
+    departure: str
+    arrival: str
+    price: int
+
 class HotelInfo(TypedDict):
     name: str
     rating: float
@@ -79,6 +92,25 @@ MOCK_HOTELS: Dict[str, List[HotelInfo]] = {
     ]
 }
 
+# Build the inventory store once at startup. Point FLIGHTS_CSV / HOTELS_CSV at
+# real inventory files to replace the mock data.
+def load_inventory() -> InventoryBackend:
+    flights_csv = os.getenv("FLIGHTS_CSV")
+    hotels_csv = os.getenv("HOTELS_CSV")
+    if flights_csv and hotels_csv:
+        return ColumnarInventory.from_csv(flights_csv, hotels_csv)
+    return ColumnarInventory.from_mock(MOCK_FLIGHTS, MOCK_HOTELS)
+
+inventory: InventoryBackend = load_inventory()
+
+# Tool results are deterministic for a given input (and date); keep them for
+# a few minutes so repeated searches skip the lookup
+tool_cache = TTLCache(maxsize=4096, ttl=300)
+
+# Optional on-disk cache of whole answers, enabled by RESPONSE_CACHE_PATH
+response_cache_path = os.getenv("RESPONSE_CACHE_PATH")
+response_cache = ResponseCache(response_cache_path) if response_cache_path else None
+
 # Define context for the agent
 @dataclass
 class TravelContext:
@@ -97,6 +129,16 @@ class GetFlightsInput(BaseModel):
 class GetFlightsOutput(BaseModel):
     flights: List[FlightInfo]
 
+class CheapestFlightsInput(BaseModel):
+    origin: str
+    destination: str
+    start_date: str
+    end_date: str
+    max_results: int
+
+class CheapestFlightsOutput(BaseModel):
+    options: List[FlightOption]
+
 class SuggestHotelsInput(BaseModel):
     city: str
     check_in: str
@@ -110,6 +152,49 @@ class SuggestHotelsOutput(BaseModel):
 async def tool_error_handler(ctx: RunContextWrapper[TravelContext], error: Exception) -> str:
     return f"Tool failed: {str(error)}"
 
+# Flexible searches pricing at least this many date x fare cells (about 1ms) run in a thread
+OFFLOAD_MIN_CELLS = 100_000
+
+# A route's fares as NumPy arrays, priced for any date range by the rules in fares.py
+@lru_cache(maxsize=1024)
+def route_fares(origin: str, destination: str) -> FareSearch:
+    return FareSearch(inventory.find_flights(origin, destination))
+
+# Lookups shared by the tools and the planner, both cached in `tool_cache`
+@cached_tool(tool_cache)
+async def fetch_flights(input: GetFlightsInput) -> GetFlightsOutput:
+    try:
+        # Price variation based on date (e.g. weekend uplift)
+        flights = route_fares(input.origin, input.destination).on_date(input.date)
+        return GetFlightsOutput(flights=flights)
+    except Exception as e:
+        raise ValueError(f"Failed to fetch flights: {str(e)}")
+
+@cached_tool(tool_cache)
+async def fetch_cheapest_flights(input: CheapestFlightsInput) -> CheapestFlightsOutput:
+    try:
+        # Every date x fare is priced at once; only the cheapest cells are returned.
+        # NumPy releases the GIL, so a thread keeps large searches off the event loop;
+        # small ones take less time than the hop to the thread
+        n = max(1, min(input.max_results, 20))
+        search = route_fares(input.origin, input.destination)
+        if search.cells(input.start_date, input.end_date) >= OFFLOAD_MIN_CELLS:
+            options = await offload(search.cheapest, input.start_date, input.end_date, n, pool="thread")
+        else:
+            options = search.cheapest(input.start_date, input.end_date, n)
+        return CheapestFlightsOutput(options=options)
+    except Exception as e:
+        raise ValueError(f"Failed to search flexible dates: {str(e)}")
+
+@cached_tool(tool_cache)
+async def fetch_hotels(input: SuggestHotelsInput) -> SuggestHotelsOutput:
+    try:
+        # In listing order; falls back to the cheapest hotel if none fit the budget
+        hotels = inventory.find_hotels(input.city, input.budget)
+        return SuggestHotelsOutput(hotels=hotels)
+    except Exception as e:
+        raise ValueError(f"Failed to suggest hotels: {str(e)}")
+
 # Function tools
 @function_tool(failure_error_function=tool_error_handler)
 async def get_flights(input: GetFlightsInput) -> GetFlightsOutput:
@@ -118,18 +203,19 @@ async def get_flights(input: GetFlightsInput) -> GetFlightsOutput:
     Args:
         input: Pydantic model with origin, destination, and date
     """
-    try:
-        route = f"{input.origin.upper()}-{input.destination.upper()}"
-        flights = MOCK_FLIGHTS.get(route, MOCK_FLIGHTS["default"])
-        
-        # Add price variation based on date
-        date_obj = datetime.strptime(input.date, "%Y-%m-%d")
-        if date_obj.weekday() >= 5:  # Weekend
-            flights = [{**f, "price": int(f["price"] * 1.2)} for f in flights]
-        
-        return GetFlightsOutput(flights=flights)
-    except Exception as e:
-        raise ValueError(f"Failed to fetch flights: {str(e)}")
+    return await fetch_flights(input)
+
+@function_tool(failure_error_function=tool_error_handler)
+async def find_cheapest_flights(input: CheapestFlightsInput) -> CheapestFlightsOutput:
+    """Find the cheapest flights across a range of departure dates, for flexible travellers.
+    
+    Use this instead of calling get_flights once per date.
+    
+    Args:
+        input: Pydantic model with origin, destination, start_date and end_date (YYYY-MM-DD,
+            at most a year apart), and max_results (1-20)
+    """
+    return await fetch_cheapest_flights(input)
 
 @function_tool(failure_error_function=tool_error_handler)
 async def suggest_hotels(input: SuggestHotelsInput) -> SuggestHotelsOutput:
@@ -138,16 +224,7 @@ async def suggest_hotels(input: SuggestHotelsInput) -> SuggestHotelsOutput:
     Args:
         input: Pydantic model with city, check-in, check-out, and budget
     """
-    try:
-        hotels = MOCK_HOTELS.get(input.city.title(), MOCK_HOTELS["default"])
-        filtered_hotels = [h for h in hotels if h["price"] <= input.budget]
-        
-        if not filtered_hotels:
-            filtered_hotels = [min(hotels, key=lambda x: x["price"])]
-        
-        return SuggestHotelsOutput(hotels=filtered_hotels)
-    except Exception as e:
-        raise ValueError(f"Failed to suggest hotels: {str(e)}")
+    return await fetch_hotels(input)
 
 # Define specialized agents
 destination_agent = Agent[TravelContext](
@@ -171,12 +248,14 @@ You are a travel booking assistant handling logistics.
 
 - Use `get_flights()` to fetch flight options from the user's current_location to the destination.
 - Use `suggest_hotels()` to provide 2–3 hotel options in the destination city.
+- Call `get_flights()` and `suggest_hotels()` together in the same step; they are independent and run concurrently.
+- If the user's dates are flexible (e.g. "cheapest day next month"), call `find_cheapest_flights()` once for the whole date range instead of `get_flights()` per date.
 - Confirm travel dates and budget with the user before proceeding (use context if available).
 - Structure output clearly: flights first, then hotels.
 - Do not suggest destinations or attractions. Focus on logistics.
 """,
     model=model,
-    tools=[get_flights, suggest_hotels],
+    tools=[get_flights, find_cheapest_flights, suggest_hotels],
 )
 
 explore_agent = Agent[TravelContext](
@@ -192,6 +271,32 @@ You are a travel explorer assistant recommending attractions and experiences.
     model=model,
 )
 
+# Planner mode: with the destination fixed, flights, hotels and the Explore
+# Agent's recommendations are fetched concurrently and merged (planner.py)
+async def planner_flights(origin: str, destination: str, date: str) -> List[FlightInfo]:
+    return (await fetch_flights(GetFlightsInput(origin=origin, destination=destination, date=date))).flights
+
+async def planner_hotels(city: str, check_in: str, check_out: str, budget: int) -> List[HotelInfo]:
+    return (await fetch_hotels(SuggestHotelsInput(city=city, check_in=check_in, check_out=check_out, budget=budget))).hotels
+
+planner = TripPlanner(planner_flights, planner_hotels, explore_agent)
+
+@function_tool(failure_error_function=tool_error_handler)
+async def plan_trip(ctx: RunContextWrapper[TravelContext], origin: str, destination: str,
+                    depart_date: str, return_date: str, budget: int) -> str:
+    """Get flights, hotels and things to do for a trip in one step, once all details are known.
+    
+    Args:
+        origin: City the user departs from
+        destination: Destination city
+        depart_date: Departure date (YYYY-MM-DD)
+        return_date: Return date (YYYY-MM-DD)
+        budget: Hotel budget per night in USD
+    """
+    request = TripRequest(origin, destination, depart_date, return_date, budget)
+    plan = await planner.plan(request, context=ctx.context)
+    return plan.render()
+
 # Main orchestrator agent
 main_agent = Agent[TravelContext](
     name="AI Travel Designer Agent",
@@ -204,6 +309,8 @@ You are an AI Travel Designer coordinating the travel planning process.
 4. Maintain context (user_id, current_location, destination, travel_dates, budget) throughout.
 5. Confirm details with the user before proceeding to the next step.
 6. Summarize the complete travel plan at the end.
+7. If origin, destination, travel dates and budget are all known, call `plan_trip()` to get flights, hotels and attractions at once instead of handing off to Booking and Explore one after another.
+8. If the user's travel dates are flexible, call `find_cheapest_flights()` once for the whole date range to find the cheapest days.
 
 Guidelines:
 - Keep responses clear, concise, and organized.
@@ -212,30 +319,97 @@ Guidelines:
 """,
     model=model,
     handoffs=[destination_agent, booking_agent, explore_agent],
-    tools=[get_flights, suggest_hotels],
+    tools=[get_flights, find_cheapest_flights, suggest_hotels, plan_trip],
+)
+
+# Keyword rules for the local pre-router; clear-cut requests skip the orchestrator call.
+# One phrase is enough; generic keywords need a second match
+ROUTING_RULES = {
+    "Destination Agent": [r"\bwhere should i (go|travel)\b", r"\b(suggest|recommend) (a |some )?(place|trip|destination)s?\b",
+                          r"\b(vacation|holiday|trip) ideas?\b", r"\b(honeymoon|getaway)\b"],
+    "Booking Agent": [r"\bflights?\b", r"\bhotels?\b", r"\bfares?\b", r"\bbook (a |an |the |my )?(flight|hotel|room|trip)s?\b",
+                      r"\baccommodations?\b", r"\bplace to stay\b"],
+    "Explore Agent": [r"\bthings to do\b", r"\battractions?\b", r"\brestaurants?\b", r"\blocal food\b",
+                      r"\bsightseeing\b", r"\bactivities\b", r"\bwhat to see\b", r"\bmust[- ]see\b"],
+}
+ROUTING_KEYWORDS = {
+    "Destination Agent": [r"\bdestinations?\b", r"\bsomewhere\b"],
+    "Booking Agent": [r"\bbook(ing)?\b", r"\btickets?\b"],
+}
+
+router = PreRouter(
+    agents={agent.name: agent for agent in (destination_agent, booking_agent, explore_agent)},
+    rules=ROUTING_RULES,
+    keywords=ROUTING_KEYWORDS,
+    classifier=classifier_from_env(),
 )
 
-# Disable tracing for simplicity
-set_tracing_disabled(disabled=True)
+# Local span recording, enabled by TRACE_SPANS (a JSONL path or "memory");
+# otherwise SDK tracing stays disabled
+recorder = setup_tracing()
 
 
 async def main():
-    # Initialize conversation history
-    conversation_history = []
+    if not api_key_configured():
+        raise ValueError("Error: GEMINI_API_KEY not found in .env file.")
+    # Keep a bounded window of recent turns plus a rolling summary
+    budget = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+    # SESSION_STORE keeps the conversation across restarts; SESSION_ID picks which one to resume
+    store = store_from_env()
+    session_id = f"travel:{os.getenv('SESSION_ID', 'default')}"
+    history = HistoryManager.resume(store, session_id, token_budget=budget) if store else HistoryManager(token_budget=budget)
+    # STREAM_OUTPUT=1 prints tokens as they arrive instead of waiting for the full answer
+    streaming = bool(os.getenv("STREAM_OUTPUT"))
+    stream_stats = StreamStats()
     while True:
         # Get user input
         user_input = input("You: ")
-        # Append user input to conversation history
-        conversation_history.append({"role": "user", "content": user_input})
-        
-        # Run the agent with the updated conversation history
-        result = await Runner.run(main_agent, conversation_history)
-        
-        # Print the agent's response
-        print(f"Assistant: {result.final_output}")
+        # One trace per turn: history handling, model calls, tools and handoffs
+        with turn_trace("travel"):
+            with timed_span("history.start_turn") as span:
+                conversation_history = history.start_turn(user_input)
+                span["bytes"] = history.stats[-1].bytes_sent
+            
+            # Reuse a cached answer for an identical conversation
+            cached = response_cache.get(main_agent, conversation_history) if response_cache else None
+            if cached is not None:
+                print(f"Assistant: {cached}")
+                history.finish_turn(conversation_history + [{"role": "assistant", "content": cached}])
+                continue
+            
+            # Start at the specialist directly when the intent is clear
+            start_agent, decision = router.pick(user_input, main_agent)
+            started = time.perf_counter()
+            
+            # Run the agent with the bounded conversation history
+            if streaming:
+                result, _ = await stream_turn(start_agent, conversation_history, stats=stream_stats)
+            else:
+                result = await Runner.run(start_agent, conversation_history)
+                # Print the agent's response
+                print(f"Assistant: {result.final_output}")
+            router.timed(decision, started)
+            if response_cache and result.final_output:
+                response_cache.put(main_agent, conversation_history, result.final_output)
+            
+            # Store only the new items of this turn
+            with timed_span("history.finish_turn"):
+                history.finish_turn(result.to_input_list())
         
-        # Update conversation history with the agent's response
-        conversation_history = result.to_input_list()
+        if os.getenv("SHOW_HISTORY_STATS"):
+            print(history.report())
+        if streaming and os.getenv("SHOW_STREAM_STATS"):
+            print(stream_stats.report())
+        if os.getenv("SHOW_ROUTER_STATS"):
+            print(router.stats.report())
+        if os.getenv("SHOW_OFFLOAD_STATS"):
+            print(get_offloader().stats.report())
+        if os.getenv("SHOW_PLANNER_STATS") and planner.last_plan is not None:
+            print(planner.last_plan.timing_report())
+            planner.last_plan = None
+        if os.getenv("SHOW_TRACE_SUMMARY") and recorder is not None:
+            print(recorder.summary())
 
 # Run the async main function
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""Planner mode: fetch flights, hotels and attractions concurrently.
+
+Once the origin, destination, dates and budget are known, the flight search,
+the hotel search and the Explore Agent's recommendations don't depend on each
+other. `TripPlanner` runs them together with `asyncio.gather` and merges the
+results into one answer, so a turn waits for the slowest stage instead of the
+sum of all three. Every stage is timed; `sequential=True` runs the same
+stages one after another for comparison.
+"""
+import asyncio
+import contextvars
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agents import Agent, RunConfig, Runner
+
+FlightSearch = Callable[[str, str, str], Awaitable[List[Dict[str, Any]]]]
+HotelSearch = Callable[[str, str, str, int], Awaitable[List[Dict[str, Any]]]]
+
+# Per-task override of the Explore Agent's run config, so concurrent sessions
+# (e.g. benchmark sessions on their own stub models) don't share one planner setting
+explore_run_config: contextvars.ContextVar[Optional[RunConfig]] = contextvars.ContextVar(
+    "explore_run_config", default=None)
+
+
+@dataclass
+class TripRequest:
+    origin: str
+    destination: str
+    depart_date: str
+    return_date: str
+    budget: int
+
+
+@dataclass
+class StageTiming:
+    name: str
+    start: float  # seconds since the plan started
+    end: float
+    ok: bool = True
+
+    @property
+    def seconds(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class TripPlan:
+    request: TripRequest
+    mode: str  # "parallel" or "sequential"
+    flights: List[Dict[str, Any]] = field(default_factory=list)
+    hotels: List[Dict[str, Any]] = field(default_factory=list)
+    attractions: str = ""
+    errors: Dict[str, str] = field(default_factory=dict)
+    timings: List[StageTiming] = field(default_factory=list)
+    total: float = 0.0
+
+    def render(self) -> str:
+        """The merged answer: flights first, then hotels, then things to do."""
+        r = self.request
+        lines = [f"Trip plan: {r.origin} to {r.destination}, {r.depart_date} to {r.return_date} "
+                 f"(hotel budget ${r.budget}/night)", "", "Flights:"]
+        if "flights" in self.errors:
+            lines.append(f"- unavailable ({self.errors['flights']})")
+        for f in self.flights:
+            lines.append(f"- {f['airline']}: departs {f['departure']}, arrives {f['arrival']}, ${f['price']}")
+        lines += ["", "Hotels:"]
+        if "hotels" in self.errors:
+            lines.append(f"- unavailable ({self.errors['hotels']})")
+        for h in self.hotels:
+            lines.append(f"- {h['name']} ({h['rating']} stars, {h['location']}): ${h['price']}/night")
+        lines += ["", "Things to do:"]
+        if "explore" in self.errors:
+            lines.append(f"- unavailable ({self.errors['explore']})")
+        elif self.attractions:
+            lines.append(self.attractions)
+        return "\n".join(lines)
+
+    def timing_report(self) -> str:
+        stages = "  ".join(f"{t.name}={t.seconds * 1000:.0f}ms{'' if t.ok else '(failed)'}"
+                           for t in sorted(self.timings, key=lambda t: t.start))
+        serial = sum(t.seconds for t in self.timings)
+        return (f"planner ({self.mode}): total {self.total * 1000:.0f}ms, "
+                f"sum of stages {serial * 1000:.0f}ms  [{stages}]")
+
+
+class TripPlanner:
+    """Runs the independent stages of a trip plan concurrently.
+
+    Args:
+        search_flights: `async (origin, destination, date) -> flights`.
+        search_hotels: `async (city, check_in, check_out, budget) -> hotels`.
+        explore_agent: Agent asked for attractions at the destination.
+        run_config: Optional run config for the Explore Agent run (e.g. a stub model).
+        max_hotels: Hotels kept in the merged answer.
+    """
+
+    def __init__(self, search_flights: FlightSearch, search_hotels: HotelSearch, explore_agent: Agent,
+                 run_config: Optional[RunConfig] = None, max_hotels: int = 3) -> None:
+        self.search_flights = search_flights
+        self.search_hotels = search_hotels
+        self.explore_agent = explore_agent
+        self.run_config = run_config
+        self.max_hotels = max_hotels
+        self.last_plan: Optional[TripPlan] = None
+
+    async def _explore(self, request: TripRequest, context: Any) -> str:
+        prompt = (f"I'm visiting {request.destination} from {request.depart_date} to {request.return_date}. "
+                  "What should I see, do and eat there?")
+        run_config = explore_run_config.get() or self.run_config
+        result = await Runner.run(self.explore_agent, prompt, context=context, run_config=run_config)
+        return str(result.final_output)
+
+    async def plan(self, request: TripRequest, *, context: Any = None, sequential: bool = False) -> TripPlan:
+        plan = TripPlan(request, mode="sequential" if sequential else "parallel")
+        started = time.perf_counter()
+        r = request
+        stages = {
+            "flights": lambda: self.search_flights(r.origin, r.destination, r.depart_date),
+            "hotels": lambda: self.search_hotels(r.destination, r.depart_date, r.return_date, r.budget),
+            "explore": lambda: self._explore(r, context),
+        }
+
+        async def timed(name: str, make: Callable[[], Awaitable[Any]]) -> Any:
+            stage_start = time.perf_counter() - started
+            try:
+                return await make()
+            except Exception as e:
+                # One failed stage shouldn't sink the others
+                plan.errors[name] = str(e)
+                return None
+            finally:
+                plan.timings.append(StageTiming(name, stage_start, time.perf_counter() - started,
+                                                ok=name not in plan.errors))
+
+        if sequential:
+            results = [await timed(name, make) for name, make in stages.items()]
+        else:
+            results = await asyncio.gather(*(timed(name, make) for name, make in stages.items()))
+        flights, hotels, attractions = results
+        plan.flights = list(flights or [])
+        plan.hotels = list(hotels or [])[:self.max_hotels]
+        plan.attractions = attractions or ""
+        plan.total = time.perf_counter() - started
+        self.last_plan = plan
+        return plan
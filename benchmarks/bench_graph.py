@@ -0,0 +1,158 @@
+"""Startup time and memory of an agent graph: hand-built vs. compiled artifact.
+
+Generates a graph of N agents (two tools each, every tool with a Pydantic
+input model like `GetFlightsInput`, handoffs in a ring) in a temp folder,
+then measures each way of building it in a fresh interpreter:
+
+- hand-built: `@function_tool` + `Agent(...)` at import, as the apps did
+- graph, cold: `load_graph()` with no artifact (parse, introspect, write)
+- graph, warm: `load_graph()` from the cached artifact
+
+Time and memory exclude `import agents`, which all three pay alike.
+
+    python benchmarks/bench_graph.py [--agents 3 50] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL_TEMPLATE = '''
+class Leg{i}(TypedDict):
+    carrier: str
+    departure: str
+    arrival: str
+    price: int
+
+class Input{i}(BaseModel):
+    origin: str
+    destination: str
+    date: str
+    passengers: int
+    budget: Optional[float] = None
+    tags: List[str] = []
+
+class Output{i}(BaseModel):
+    legs: List[Leg{i}]
+    note: str
+
+def tool_{i}(input: Input{i}) -> Output{i}:
+    """Look up option set {i} for a trip.
+
+    Args:
+        input: Origin, destination, date (YYYY-MM-DD), passengers, optional budget and tags
+    """
+    return Output{i}(legs=[], note="none")
+'''
+
+MEASURE = '''
+import json, os, resource, sys, time, tracemalloc
+sys.path.insert(0, {repo!r}); sys.path.insert(0, {folder!r})
+import agents, pydantic  # paid by every variant
+mode = sys.argv[1]
+traced = len(sys.argv) > 2
+if traced:
+    tracemalloc.start()
+rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+if mode == "hand":
+    import handbuilt
+    n = len(handbuilt.AGENTS)
+else:
+    from common.graph import load_graph
+    graph = load_graph(os.path.join({folder!r}, "graph.toml"), model="stub")
+    n = len(graph.agents)
+elapsed = time.perf_counter() - t0
+out = {{"seconds": elapsed, "agents": n, "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0}}
+if traced:
+    out["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+print(json.dumps(out))
+'''
+
+
+def generate(folder: str, n_agents: int) -> None:
+    tools = [
+        "from typing import List, Optional\n",
+        "from pydantic import BaseModel\n",
+        "from typing_extensions import TypedDict\n",
+    ]
+    tools += [TOOL_TEMPLATE.format(i=i) for i in range(2 * n_agents)]
+    with open(os.path.join(folder, "gen_tools.py"), "w", encoding="utf-8") as fh:
+        fh.write("".join(tools))
+
+    instructions = ("You are {name}, a specialist. Answer the user's question about your area, call your tools "
+                    "when you need data, and hand off when another specialist fits better. " * 4)
+    toml = [f'entry = "Agent0"\n']
+    hand = ["from agents import Agent, function_tool\n", "import gen_tools\n"]
+    for i in range(2 * n_agents):
+        toml.append(f'\n[tools.tool_{i}]\nfunction = "gen_tools:tool_{i}"\n')
+        hand.append(f"tool_{i} = function_tool(gen_tools.tool_{i})\n")
+    for a in range(n_agents):
+        targets = [f"Agent{(a + k) % n_agents}" for k in (1, 2, 3) if (a + k) % n_agents != a]
+        targets = list(dict.fromkeys(targets))
+        text = instructions.format(name=f"Agent{a}")
+        toml.append(f'\n[agents.Agent{a}]\ntools = ["tool_{2 * a}", "tool_{2 * a + 1}"]\n'
+                    f"handoffs = {json.dumps(targets)}\ninstructions = '''\n{text}\n'''\n")
+        hand.append(f'Agent{a} = Agent(name="Agent{a}", instructions={text + chr(10)!r}, model="stub", '
+                    f"tools=[tool_{2 * a}, tool_{2 * a + 1}])\n")
+    hand.append("AGENTS = [" + ", ".join(f"Agent{a}" for a in range(n_agents)) + "]\n")
+    for a in range(n_agents):
+        targets = list(dict.fromkeys(f"Agent{(a + k) % n_agents}" for k in (1, 2, 3) if (a + k) % n_agents != a))
+        hand.append(f"Agent{a}.handoffs = [{', '.join(targets)}]\n")
+    with open(os.path.join(folder, "graph.toml"), "w", encoding="utf-8") as fh:
+        fh.write("".join(toml))
+    with open(os.path.join(folder, "handbuilt.py"), "w", encoding="utf-8") as fh:
+        fh.write("".join(hand))
+
+
+def run(folder: str, mode: str, traced: bool) -> Dict[str, float]:
+    script = MEASURE.format(repo=REPO_ROOT, folder=folder)
+    args = [sys.executable, "-c", script, mode] + (["traced"] if traced else [])
+    out = subprocess.run(args, capture_output=True, text=True, cwd=folder, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(folder: str, mode: str, runs: int) -> Dict[str, float]:
+    artifact = os.path.join(folder, "__pycache__", "graph.graph.json")
+    seconds: List[float] = []
+    rss: List[float] = []
+    for _ in range(runs):
+        if mode == "cold" and os.path.exists(artifact):
+            os.remove(artifact)
+        result = run(folder, "hand" if mode == "hand" else "graph", traced=False)
+        seconds.append(result["seconds"])
+        rss.append(result["rss_kb"])
+    if mode == "cold" and os.path.exists(artifact):
+        os.remove(artifact)
+    traced = run(folder, "hand" if mode == "hand" else "graph", traced=True)
+    return {"ms": median(seconds) * 1000, "rss_mb": median(rss) / 1024, "traced_mb": traced["traced_bytes"] / 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, nargs="+", default=[3, 50])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'agents':>6} {'tools':>5}  {'variant':<12} {'build ms':>9} {'RSS +MB':>8} {'allocated MB':>13}")
+    for n in args.agents:
+        with tempfile.TemporaryDirectory() as folder:
+            generate(folder, n)
+            results = {}
+            for mode, label in (("hand", "hand-built"), ("cold", "graph, cold"), ("warm", "graph, warm")):
+                if mode == "warm":
+                    run(folder, "graph", traced=False)  # write the artifact
+                results[mode] = measure(folder, mode, args.runs)
+                r = results[mode]
+                print(f"{n:>6} {2 * n:>5}  {label:<12} {r['ms']:>9.1f} {r['rss_mb']:>8.1f} {r['traced_mb']:>13.2f}")
+            print(f"{'':>13} warm vs hand-built: {results['hand']['ms'] / results['warm']['ms']:.1f}x faster, "
+                  f"{results['hand']['traced_mb'] - results['warm']['traced_mb']:.2f}MB less allocated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Offline benchmark: drive each app through recorded multi-turn sessions.
+
+Every model call is served by `StubModel`, replaying the recorded responses
+in benchmarks/data/sessions/<app>.json (assistant text, tool calls and
+handoffs) after a configurable latency, so the real agents, tools, handoffs
+and history handling run without network access. Each app runs in a fresh
+interpreter and reports:
+
+- turns/s across all concurrent sessions
+- per-turn latency p50 / p95 / p99
+- peak RSS of the process
+- prompt bytes per turn (instructions + input, summed over the turn's model calls)
+
+    python benchmarks/bench_offline.py --sessions 20 --repeat 5 --latency 0.05
+    python benchmarks/bench_offline.py --json after.json --compare before.json
+    python benchmarks/bench_offline.py --record travel   # re-record a script against Gemini
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from statistics import mean, quantiles
+from typing import Any, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from agents import RunConfig, Runner  # noqa: E402
+
+from common.apps import APPS, load_app, load_module, new_context, use_run_config  # noqa: E402
+from common.history import HistoryManager  # noqa: E402
+from common.stub_model import RecordingModel, StubModel  # noqa: E402
+
+SESSIONS_DIR = os.path.join(REPO_ROOT, "benchmarks", "data", "sessions")
+
+# History settings the app loops use by default
+HISTORY_OPTIONS = {
+    "career": {"token_budget": 500, "summary_tokens": 0},
+    "travel": {"token_budget": 6000},
+    "game": {"token_budget": 1500},
+}
+
+
+def load_script(app: str) -> Dict[str, Any]:
+    with open(os.path.join(SESSIONS_DIR, f"{app}.json"), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+class AppSession:
+    """One user session, carrying history the way the app's own loop does."""
+
+    def __init__(self, app: str, model) -> None:
+        self.app = app
+        self.agent = load_app(app)
+        self.config = RunConfig(model=model)
+        self.context = new_context(app)
+        self.history = HistoryManager(**HISTORY_OPTIONS[app])
+
+    async def turn(self, user: str) -> str:
+        # The travel planner runs the Explore Agent itself; keep it on this session's model
+        use_run_config(self.app, self.config)
+        items = self.history.start_turn(user)
+        result = await Runner.run(self.agent, items, context=self.context, run_config=self.config)
+        if self.app == "career":
+            # The career loop keeps only the final answer as context
+            self.history.finish_turn(items + [{"role": "assistant", "content": str(result.final_output)}])
+        else:
+            self.history.finish_turn(result.to_input_list())
+        return str(result.final_output)
+
+
+async def run_session(app: str, script: Dict[str, Any], repeat: int, latency: float,
+                      latencies: List[float], prompt_bytes: List[int]) -> int:
+    model = StubModel(latency=latency)
+    session = AppSession(app, model)
+    errors = 0
+    for _ in range(repeat):
+        for turn in script["turns"]:
+            model.script.clear()
+            model.queue(turn["responses"])
+            calls_before = len(model.prompt_chars)
+            started = time.perf_counter()
+            try:
+                await session.turn(turn["user"])
+            except Exception as e:
+                errors += 1
+                print(f"  {app}: turn failed: {e}", file=sys.stderr)
+                continue
+            latencies.append(time.perf_counter() - started)
+            prompt_bytes.append(sum(model.prompt_chars[calls_before:]))
+            if model.script:
+                errors += 1
+                print(f"  {app}: {len(model.script)} recorded responses left unused", file=sys.stderr)
+    return errors
+
+
+async def bench_app(app: str, sessions: int, repeat: int, latency: float) -> Dict[str, Any]:
+    script = load_script(app)
+    load_app(app)  # import before timing
+    latencies: List[float] = []
+    prompt_bytes: List[int] = []
+    started = time.perf_counter()
+    errors = await asyncio.gather(*(run_session(app, script, repeat, latency, latencies, prompt_bytes)
+                                    for _ in range(sessions)))
+    wall = time.perf_counter() - started
+    cuts = quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "app": app,
+        "turns": len(latencies),
+        "errors": sum(errors),
+        "turns_per_s": len(latencies) / wall,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "prompt_bytes_per_turn": mean(prompt_bytes),
+        "prompt_bytes_last_turn": max(prompt_bytes[-len(script["turns"]):]),
+    }
+
+
+def run_child(app: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark one app in a fresh interpreter so peak RSS is its own."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", app, "--sessions", str(args.sessions),
+           "--repeat", str(args.repeat), "--latency", str(args.latency)]
+    env = {**os.environ, "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "bench")}
+    out = subprocess.run(cmd, capture_output=True, text=True, env=env, stdin=subprocess.DEVNULL)
+    if out.returncode != 0:
+        raise RuntimeError(f"{app} benchmark failed:\n{out.stderr}")
+    if out.stderr.strip():
+        print(out.stderr.rstrip(), file=sys.stderr)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def print_row(r: Dict[str, Any], before: Dict[str, Any] = None) -> None:
+    print(f"  {r['app']:<7} {r['turns_per_s']:8.1f} turns/s  p50={r['p50_ms']:7.1f}ms  p95={r['p95_ms']:7.1f}ms  "
+          f"p99={r['p99_ms']:7.1f}ms  rss={r['peak_rss_mb']:6.1f}MB  "
+          f"prompt={r['prompt_bytes_per_turn']:8.0f}B/turn  errors={r['errors']}")
+    if before:
+        def delta(key):
+            return (r[key] - before[key]) / before[key] if before[key] else 0.0
+        print(f"  {'':<7} vs baseline: turns/s {delta('turns_per_s'):+.0%}  p99 {delta('p99_ms'):+.0%}  "
+              f"rss {delta('peak_rss_mb'):+.0%}  prompt bytes {delta('prompt_bytes_per_turn'):+.0%}")
+
+
+async def record(app: str, out_path: str) -> None:
+    """Replay a script's user turns against the real model and save its responses."""
+    script = load_script(app)
+    module = load_module(app)
+    model = RecordingModel(module.model)
+    session = AppSession(app, model)
+    turns = []
+    for turn in script["turns"]:
+        seen = len(model.responses)
+        await session.turn(turn["user"])
+        turns.append({"user": turn["user"], "responses": model.responses[seen:]})
+    with open(out_path, "w", encoding="utf-8") as fh:
+        json.dump({"app": app, "turns": turns}, fh, indent=2, ensure_ascii=False)
+    print(f"Recorded {len(turns)} turns -> {out_path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline multi-turn benchmark of the agent apps")
+    parser.add_argument("--apps", nargs="+", default=list(APPS), choices=list(APPS))
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent sessions per app")
+    parser.add_argument("--repeat", type=int, default=5, help="Times each session replays its script")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub model latency per call (seconds)")
+    parser.add_argument("--json", metavar="PATH", help="Write results to a JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="Show changes against an earlier --json file")
+    parser.add_argument("--record", metavar="APP", choices=list(APPS),
+                        help="Record APP's script against the real model (needs GEMINI_API_KEY)")
+    parser.add_argument("--out", metavar="PATH", help="Where --record writes (default: overwrite the script)")
+    parser.add_argument("--child", metavar="APP", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(bench_app(args.child, args.sessions, args.repeat, args.latency))
+        print(json.dumps(result))
+        return
+    if args.record:
+        asyncio.run(record(args.record, args.out or os.path.join(SESSIONS_DIR, f"{args.record}.json")))
+        return
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = {r["app"]: r for r in json.load(fh)["results"]}
+    print(f"== {args.sessions} sessions x {args.repeat} replays per app, stub latency {args.latency * 1000:.0f}ms")
+    results = []
+    for app in args.apps:
+        result = run_child(app, args)
+        results.append(result)
+        print_row(result, baseline.get(app))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"python": sys.version.split()[0], "sessions": args.sessions, "repeat": args.repeat,
+                       "latency": args.latency, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Event-loop latency under mixed load, with and without offloading CPU work.
+
+A few "heavy" sessions alternate a stand-in model call (asyncio.sleep) with a
+CPU-bound stage; many "light" sessions only make model calls. A probe task
+measures how late the loop wakes it up. Each stage runs inline on the loop,
+in the thread pool and in the process pool (`common/offload.py`):
+
+- validate: Pydantic validation of a large `GetFlightsOutput` JSON payload
+  (travel app), re-serialized to JSON (passed through shared memory)
+- classify: the router's pure-Python TF-IDF classifier over a batch of queries
+- fares: a NumPy flexible-date search over a year of a large route
+
+Then one large array is sent to a worker through shared memory vs. pickling.
+
+    python benchmarks/bench_offload.py [--seconds 4] [--stages validate classify fares]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from common.apps import load_module  # noqa: E402
+from common.offload import Offloader  # noqa: E402
+from common.router import TfidfClassifier  # noqa: E402
+
+travel = load_module("travel")
+from fares import FareSearch  # noqa: E402  (on sys.path once the travel app is loaded)
+
+AIRLINES = ["Delta", "United", "ANA", "Air France", "British Airways", "Budget Air"]
+rng = random.Random(7)
+FLIGHTS = [{"airline": rng.choice(AIRLINES), "departure": f"{rng.randrange(24):02d}:00",
+            "arrival": f"{rng.randrange(24):02d}:30", "price": rng.randrange(80, 2500)} for _ in range(40_000)]
+PAYLOAD = json.dumps({"flights": FLIGHTS}).encode("utf-8")
+SEARCH = FareSearch(FLIGHTS[:3000])
+
+WORDS = {"career": "job salary resume interview engineer skills career path role".split(),
+         "travel": "flight hotel trip booking visa beach city museum itinerary".split(),
+         "game": "goblin sword potion dungeon attack dragon quest spell loot".split()}
+TEXTS = [" ".join(rng.choice(WORDS[label]) for _ in range(8)) for label in WORDS for _ in range(200)]
+LABELS = [label for label in WORDS for _ in range(200)]
+CLASSIFIER = TfidfClassifier().fit(TEXTS, LABELS, epochs=5)
+QUERIES = TEXTS * 3
+
+
+def validate(payload: bytes) -> str:
+    return travel.GetFlightsOutput.model_validate_json(payload).model_dump_json()
+
+
+def classify(n: int) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for text in QUERIES[:n]:
+        label, _ = CLASSIFIER.predict(text)
+        counts[label] = counts.get(label, 0) + 1
+    return counts
+
+
+def fares(n: int) -> int:
+    return len(SEARCH.cheapest("2025-01-01", "2025-12-31", n))
+
+
+def checksum(array: np.ndarray) -> float:
+    return float(array[::4096].sum())
+
+
+STAGES = {"validate": (validate, (PAYLOAD,)), "classify": (classify, (1800,)), "fares": (fares, (20,))}
+
+
+def pct(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] * 1000 if samples else 0.0
+
+
+async def mixed_load(offloader: Offloader, stage: str, pool: str, seconds: float, heavy: int, light: int,
+                     io: float) -> str:
+    fn, args = STAGES[stage]
+    deadline = time.perf_counter() + seconds
+    lags: List[float] = []
+    turns: List[float] = []
+    done = [0]
+
+    async def probe() -> None:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - t0 - 0.005)
+
+    async def heavy_session() -> None:
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(io)
+            await offloader.run(fn, *args, pool=pool)
+            done[0] += 1
+
+    async def light_session() -> None:
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            await asyncio.sleep(io)
+            turns.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(probe(), *(heavy_session() for _ in range(heavy)), *(light_session() for _ in range(light)))
+    wall = time.perf_counter() - started
+    return (f"  {pool:<8} loop lag p50={pct(lags, 0.5):7.1f}ms p99={pct(lags, 0.99):7.1f}ms "
+            f"max={max(lags) * 1000:7.1f}ms  light turn p99={pct(turns, 0.99):7.1f}ms "
+            f"(ideal {io * 1000:.0f})  {done[0] / wall:6.1f} stages/s")
+
+
+async def transfer(size_mb: int, calls: int) -> None:
+    array = np.random.default_rng(0).random(size_mb * (1 << 20) // 8)
+    for name, threshold in (("pickle", 1 << 62), ("shared memory", 1 << 20)):
+        offloader = Offloader(processes=1, shm_threshold=threshold)
+        await offloader.run(checksum, array[:10])  # start the worker
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            await offloader.run(checksum, array)
+        print(f"  {name:<14} {size_mb}MB array to a worker: {(time.perf_counter() - t0) / calls * 1000:7.1f}ms/call")
+        offloader.close()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    for stage in args.stages:
+        fn, fn_args = STAGES[stage]
+        t0 = time.perf_counter()
+        fn(*fn_args)
+        print(f"== {stage}: {(time.perf_counter() - t0) * 1000:.1f}ms per call inline; "
+              f"{args.heavy} heavy + {args.light} light sessions, {args.io * 1000:.0f}ms model calls")
+        for pool in ("inline", "thread", "process"):
+            offloader = Offloader(processes=args.processes, threads=args.heavy)
+            if pool == "process":
+                await offloader.run(fn, *fn_args, pool=pool)  # start the workers outside the timing
+            print(await mixed_load(offloader, stage, pool, args.seconds, args.heavy, args.light, args.io))
+            offloader.close()
+    print("== transfer")
+    await transfer(args.transfer_mb, calls=5)
+    print(f"({os.cpu_count()} CPU(s) available)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stages", nargs="+", choices=sorted(STAGES), default=["validate", "classify", "fares"])
+    parser.add_argument("--seconds", type=float, default=4.0, help="Duration of each run")
+    parser.add_argument("--heavy", type=int, default=2, help="Sessions running the CPU-bound stage")
+    parser.add_argument("--light", type=int, default=32, help="Sessions only making model calls")
+    parser.add_argument("--io", type=float, default=0.05, help="Stand-in model call latency (seconds)")
+    parser.add_argument("--processes", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--transfer-mb", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
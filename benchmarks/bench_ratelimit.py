@@ -0,0 +1,127 @@
+"""Client-side rate limiting against a stub endpoint that answers 429s.
+
+Starts `common.stub_server` in-process (a real per-second limit plus random
+429s and latency) and drives it through the real chat-completions model
+over HTTP, with and without `RateLimitedModel`:
+
+1. burst: many turns at once; how many are lost to 429s, and the throughput
+2. priority: a batch backlog, then interactive turns; latency of each class
+3. coalescing: identical prompts in flight together; upstream calls made
+
+    python benchmarks/bench_ratelimit.py [--server-rps 10] [--error-rate 0.05] [--turns 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from statistics import median
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import Agent, Model, OpenAIChatCompletionsModel, RunConfig, Runner, set_tracing_disabled  # noqa: E402
+from openai import AsyncOpenAI  # noqa: E402
+
+from common.ratelimit import BATCH, INTERACTIVE, RateLimitedModel, RequestScheduler, request_priority  # noqa: E402
+from common.stub_server import StubServer  # noqa: E402
+
+AGENT = Agent(name="Bench Agent", instructions="Answer briefly.")
+
+
+async def turn(model: Model, prompt: str, priority: int = INTERACTIVE) -> Tuple[bool, float]:
+    request_priority.set(priority)
+    started = time.perf_counter()
+    try:
+        await Runner.run(AGENT, prompt, run_config=RunConfig(model=model, tracing_disabled=True))
+        return True, time.perf_counter() - started
+    except Exception:
+        return False, time.perf_counter() - started
+
+
+CLIENTS: List[AsyncOpenAI] = []
+
+
+def upstream(base_url: str) -> Model:
+    # No client retries: the 429s reach the caller (or the rate limiter)
+    client = AsyncOpenAI(api_key="stub", base_url=base_url, max_retries=0)
+    CLIENTS.append(client)
+    return OpenAIChatCompletionsModel(model="stub", openai_client=client)
+
+
+async def burst(stub: StubServer, base_url: str, turns: int, scheduler: Optional[RequestScheduler]) -> None:
+    stub.counts.update({k: 0 for k in stub.counts})
+    model = upstream(base_url)
+    if scheduler is not None:
+        model = RateLimitedModel(model, scheduler)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(turn(model, f"question {i}") for i in range(turns)))
+    wall = time.perf_counter() - started
+    ok = sum(1 for good, _ in results if good)
+    name = "rate limited" if scheduler is not None else "unlimited"
+    print(f"  {name:<13} {ok}/{turns} turns ok ({turns - ok} lost)  {ok / wall:6.1f} turns/s  "
+          f"server saw {stub.counts['requests']} requests, {stub.counts['rate_limited']} over its limit, "
+          f"{stub.counts['injected']} injected 429s")
+    if scheduler is not None:
+        print(f"  {'':<13} {scheduler.report()}")
+
+
+async def priority(base_url: str, server_rps: float, batch: int, interactive: int) -> None:
+    scheduler = RequestScheduler(rps=server_rps)
+    model = RateLimitedModel(upstream(base_url), scheduler)
+    tasks = [asyncio.ensure_future(turn(model, f"batch {i}", BATCH)) for i in range(batch)]
+    await asyncio.sleep(0.5)
+    # Interactive turns arrive after the batch backlog is queued
+    fronts = [asyncio.ensure_future(turn(model, f"user {i}", INTERACTIVE)) for i in range(interactive)]
+    batch_lat = [lat for _, lat in await asyncio.gather(*tasks)]
+    user_lat = [lat for _, lat in await asyncio.gather(*fronts)]
+    print(f"  {batch} batch turns queued first, then {interactive} interactive turns:")
+    print(f"  interactive p50={median(user_lat) * 1000:7.0f}ms  max={max(user_lat) * 1000:7.0f}ms")
+    print(f"  batch       p50={median(batch_lat) * 1000:7.0f}ms  max={max(batch_lat) * 1000:7.0f}ms")
+
+
+async def coalescing(stub: StubServer, base_url: str, copies: int) -> None:
+    stub.counts.update({k: 0 for k in stub.counts})
+    scheduler = RequestScheduler(rps=1000)
+    model = RateLimitedModel(upstream(base_url), scheduler)
+    results: List[Tuple[bool, float]] = await asyncio.gather(
+        *(turn(model, "What jobs can I get in AI?") for _ in range(copies)))
+    ok = sum(1 for good, _ in results if good)
+    print(f"  {copies} identical prompts in flight: {ok} answered, {stub.counts['requests']} upstream request(s), "
+          f"{scheduler.stats.coalesced} coalesced")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    set_tracing_disabled(True)
+    stub = StubServer(latency=args.latency, rps=args.server_rps, error_rate=args.error_rate,
+                      retry_after=args.retry_after)
+    server = await stub.start()
+    base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+    async with server:
+        print(f"== burst of {args.turns} turns; server allows {args.server_rps:g} rps, "
+              f"{args.error_rate:.0%} random 429s, {args.latency * 1000:.0f}ms latency")
+        await burst(stub, base_url, args.turns, None)
+        # Start well above the server's limit so AIMD has to find it
+        await burst(stub, base_url, args.turns, RequestScheduler(rps=args.server_rps * 4))
+        print("== priority")
+        stub.error_rate = 0.0
+        await priority(base_url, args.server_rps, batch=args.turns // 2, interactive=5)
+        print("== coalescing")
+        await coalescing(stub, base_url, copies=50)
+        for client in CLIENTS:
+            await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--server-rps", type=float, default=20.0, help="Stub server's real rate limit")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Share of random 429s")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
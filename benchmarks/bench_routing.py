@@ -0,0 +1,89 @@
+"""Offline accuracy of the local pre-router on labeled query sets.
+
+For each app, queries in benchmarks/data/routing_<app>.jsonl are labeled
+with the specialist they should reach, or with the entry agent's name when
+the router ought to fall back to the LLM triage. Reports, for rules alone
+and for rules + the TF-IDF classifier (k-fold cross-validated):
+
+- coverage: share of queries sent down the fast path (triage call skipped)
+- precision: share of fast-path decisions that picked the right specialist
+- accuracy: share of all queries routed correctly (fallback counts as
+  correct only for queries labeled with the entry agent)
+
+    python benchmarks/bench_routing.py
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.apps import APPS, load_app, load_module  # noqa: E402
+from common.router import PreRouter, TfidfClassifier, load_labeled  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def score(router: PreRouter, texts: List[str], labels: List[str], entry: str) -> Tuple[int, int, int, float]:
+    fast = correct_fast = correct = 0
+    started = time.perf_counter()
+    for text, label in zip(texts, labels):
+        decision = router.decide(text)
+        if decision.target is not None:
+            fast += 1
+            if decision.target == label:
+                correct_fast += 1
+                correct += 1
+        elif label == entry:
+            correct += 1
+    per_query_us = (time.perf_counter() - started) / max(1, len(texts)) * 1e6
+    return fast, correct_fast, correct, per_query_us
+
+
+def print_row(name: str, n: int, fast: int, correct_fast: int, correct: int, us: Optional[float]) -> None:
+    precision = correct_fast / fast if fast else 0.0
+    timing = f"  {us:6.1f}us/query" if us is not None else ""
+    print(f"  {name:<22} coverage={fast / n:5.0%}  precision={precision:5.0%}  accuracy={correct / n:5.0%}{timing}")
+
+
+def run_app(app: str, folds: int) -> None:
+    module = load_module(app)
+    entry = load_app(app).name
+    router: PreRouter = module.router
+    texts, labels = load_labeled(os.path.join(DATA_DIR, f"routing_{app}.jsonl"))
+    print(f"== {app} ({len(texts)} queries, fallback label {entry!r})")
+
+    rules_only = PreRouter(router.agents, {}, threshold=router.threshold)
+    rules_only.rules = router.rules
+    print_row("rules", len(texts), *score(rules_only, texts, labels, entry))
+
+    # k-fold cross-validation so the classifier is never scored on its training queries
+    totals = [0, 0, 0]
+    elapsed = 0.0
+    order = list(range(len(texts)))
+    for k in range(folds):
+        test = [i for i in order if i % folds == k]
+        train = [i for i in order if i % folds != k]
+        clf = TfidfClassifier().fit([texts[i] for i in train], [labels[i] for i in train])
+        combined = PreRouter(router.agents, {}, classifier=clf, threshold=router.threshold,
+                             classifier_threshold=router.classifier_threshold)
+        combined.rules = router.rules
+        fast, correct_fast, correct, us = score(combined, [texts[i] for i in test], [labels[i] for i in test], entry)
+        totals = [totals[0] + fast, totals[1] + correct_fast, totals[2] + correct]
+        elapsed += us * len(test)
+    print_row(f"rules+tfidf ({folds}-fold)", len(texts), *totals, elapsed / len(texts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline accuracy of the pre-router")
+    parser.add_argument("--apps", nargs="+", default=list(APPS), choices=list(APPS))
+    parser.add_argument("--folds", type=int, default=5)
+    args = parser.parse_args()
+    for app in args.apps:
+        run_app(app, args.folds)
+
+
+if __name__ == "__main__":
+    main()
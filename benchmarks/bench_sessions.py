@@ -0,0 +1,108 @@
+"""Write and resume latency of the session stores for 10, 1k and 10k-turn sessions.
+
+Each session is written turn by turn through `HistoryManager` (as the app
+loops do), then resumed with `HistoryManager.resume()` from a freshly opened
+store. The baseline is what a plain-list loop would need to persist: rewrite
+the whole transcript as one JSON file each turn, and load all of it on resume.
+
+    python benchmarks/bench_sessions.py [--turns 10 1000 10000] [--backends memory sqlite log]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from statistics import median, quantiles
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.history import HistoryManager  # noqa: E402
+from common.sessions import open_store  # noqa: E402
+
+REPLY = ("Here are three options that fit your budget, with departure times and prices. "
+         "The first is the cheapest but leaves early; the second balances price and comfort; "
+         "the third is a direct flight with a later arrival. ") * 3
+
+
+def turn_items(i: int, pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """What `result.to_input_list()` returns for one turn: the input plus the new items."""
+    new = [{"role": "assistant", "content": f"Turn {i}: {REPLY}"}]
+    if i % 4 == 0:
+        new.insert(0, {"type": "function_call", "call_id": f"c{i}", "name": "get_flights",
+                       "arguments": json.dumps({"origin": "NYC", "destination": "LON", "date": "2025-06-14"})})
+        new.insert(1, {"type": "function_call_output", "call_id": f"c{i}", "output": "[...3 flights...]"})
+    return pending + new
+
+
+def pct(values: List[float], p: int) -> float:
+    return quantiles(values, n=100)[p - 1] if len(values) > 1 else values[0]
+
+
+def bench(spec_for, backend: str, turns: int, budget: int) -> None:
+    store = open_store(spec_for(backend))
+    history = HistoryManager(token_budget=budget, store=store, session_id="bench")
+    writes = []
+    for i in range(turns):
+        pending = history.start_turn(f"Message {i}: find me flights to London next month")
+        result = turn_items(i, pending)
+        started = time.perf_counter()
+        history.finish_turn(result)
+        writes.append(time.perf_counter() - started)
+    if backend != "memory":
+        store.close()
+        store = open_store(spec_for(backend))
+    started = time.perf_counter()
+    resumed = HistoryManager.resume(store, "bench", token_budget=budget)
+    resume = time.perf_counter() - started
+    store.close()
+    print(f"  {backend:<7} {turns:>6} turns  write p50={pct(writes, 50) * 1e6:7.1f}us  "
+          f"p99={pct(writes, 99) * 1e6:7.1f}us  resume={resume * 1000:7.2f}ms  "
+          f"(loaded {len(resumed.turns)} turns + summary)")
+
+
+def baseline(directory: str, turns: int) -> None:
+    """Rewrite-everything persistence: cost of the last turn's save and of a full load."""
+    transcript: List[Dict[str, Any]] = []
+    for i in range(turns):
+        transcript = turn_items(i, transcript + [{"role": "user", "content": f"Message {i}"}])
+    path = os.path.join(directory, "transcript.json")
+    started = time.perf_counter()
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(transcript, fh)
+    write = time.perf_counter() - started
+    loads = []
+    for _ in range(3):
+        started = time.perf_counter()
+        with open(path, encoding="utf-8") as fh:
+            json.load(fh)
+        loads.append(time.perf_counter() - started)
+    print(f"  {'rewrite':<7} {turns:>6} turns  write (last turn)={write * 1e6:9.1f}us  "
+          f"resume={median(loads) * 1000:7.2f}ms  (loads all {turns} turns)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--backends", nargs="+", default=["memory", "sqlite", "log"],
+                        choices=["memory", "sqlite", "log"])
+    parser.add_argument("--budget", type=int, default=4000, help="History token budget")
+    args = parser.parse_args()
+
+    for turns in args.turns:
+        print(f"== {turns} turns")
+        directory = tempfile.mkdtemp(prefix="bench_sessions_")
+        try:
+            specs = {"memory": "memory", "sqlite": f"sqlite:{os.path.join(directory, 's.db')}",
+                     "log": f"log:{os.path.join(directory, 'logs')}"}
+            for backend in args.backends:
+                bench(specs.__getitem__, backend, turns, args.budget)
+            baseline(directory, turns)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
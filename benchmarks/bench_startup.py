@@ -0,0 +1,119 @@
+"""Cold-start time of each app: how long until its `main.py` is imported.
+
+Each measurement is a fresh interpreter, so nothing is cached in-process.
+Use --compare to measure another git revision the same way (e.g. the commit
+before the shared lazy provider) for a before/after table.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --compare HEAD~1 --importtime
+    python benchmarks/bench_startup.py --json startup.json   # keep results to diff later
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from statistics import median
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FOLDERS = ["career mentor agent", "ai travel agent", "Game Master Agent"]
+
+# Imports main.py by path; older revisions start the input() loop at import
+# time, which ends right away with EOFError on an empty stdin.
+IMPORT_SNIPPET = """
+import importlib.util, os, sys, time
+started = time.perf_counter()
+app_dir = sys.argv[1]
+sys.path.insert(0, app_dir)
+spec = importlib.util.spec_from_file_location("app_main", os.path.join(app_dir, "main.py"))
+module = importlib.util.module_from_spec(spec)
+try:
+    spec.loader.exec_module(module)
+except BaseException:
+    pass
+print(time.perf_counter() - started)
+"""
+
+
+def measure(app_dir: str, runs: int) -> Dict[str, float]:
+    env = {**os.environ, "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "bench")}
+    import_times: List[float] = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET, app_dir],
+            capture_output=True, text=True, stdin=subprocess.DEVNULL, env=env, cwd=app_dir,
+        )
+        import_times.append(float(out.stdout.strip().splitlines()[-1]))
+    return {"median": median(import_times), "min": min(import_times)}
+
+
+def importtime_top(app_dir: str, top: int) -> List[str]:
+    """Largest cumulative imports reported by `python -X importtime`."""
+    env = {**os.environ, "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "bench")}
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET, app_dir],
+        capture_output=True, text=True, stdin=subprocess.DEVNULL, env=env, cwd=app_dir,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented; keep only top-level ones
+        name = name[1:]
+        if not name.startswith(" "):
+            rows.append((int(cumulative_us), name))
+    rows.sort(reverse=True)
+    return [f"{us / 1000:8.1f}ms  {name}" for us, name in rows[:top]]
+
+
+def export_revision(ref: str, dest: str) -> None:
+    archive = os.path.join(dest, "rev.tar")
+    with open(archive, "wb") as fh:
+        subprocess.run(["git", "-C", REPO_ROOT, "archive", ref], stdout=fh, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(dest)
+
+
+def report(label: str, root: str, runs: int, importtime: bool, top: int) -> Dict[str, float]:
+    print(f"== {label}")
+    results = {}
+    for folder in APP_FOLDERS:
+        app_dir = os.path.join(root, folder)
+        stats = measure(app_dir, runs)
+        results[folder] = stats["median"]
+        print(f"  {folder:<22} median={stats['median'] * 1000:7.1f}ms  min={stats['min'] * 1000:7.1f}ms")
+        if importtime:
+            for row in importtime_top(app_dir, top):
+                print(f"      {row}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--compare", metavar="REF", help="Also measure this git revision")
+    parser.add_argument("--importtime", action="store_true", help="Show the slowest top-level imports")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH", help="Write median import times (seconds) to a JSON file")
+    args = parser.parse_args()
+
+    after = report("working tree", REPO_ROOT, args.runs, args.importtime, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "median_s": after}, fh, indent=2)
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_revision(args.compare, tmp)
+            before = report(args.compare, tmp, args.runs, args.importtime, args.top)
+        print("== change (working tree vs. %s)" % args.compare)
+        for folder in APP_FOLDERS:
+            delta = (after[folder] - before[folder]) * 1000
+            print(f"  {folder:<22} {delta:+7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
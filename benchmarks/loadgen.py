@@ -0,0 +1,121 @@
+"""Load generator for the session server (common/server.py).
+
+Opens many concurrent sessions, each sending a few turns over its own
+keep-alive connection, and reports p50/p99 turn latency and throughput.
+
+    python -m common.server --stub 0.2 --max-inflight 64 &
+    python benchmarks/loadgen.py --sessions 2000 --turns 3
+
+Or run server and load in one process against the stub model:
+
+    python benchmarks/loadgen.py --inprocess --stub 0.2 --sessions 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+APPS = ["career", "travel", "game"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def post(reader, writer, host: str, body: dict) -> dict:
+    data = json.dumps(body).encode("utf-8")
+    writer.write(
+        f"POST /turn HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data
+    )
+    await writer.drain()
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    payload = json.loads(await reader.readexactly(length))
+    if b" 200 " not in status:
+        raise RuntimeError(payload.get("error", status.decode()))
+    return payload
+
+
+async def run_session(i: int, args, latencies: List[float], errors: List[str]) -> None:
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    app = APPS[i % len(APPS)]
+    try:
+        for turn in range(args.turns):
+            started = time.perf_counter()
+            try:
+                await post(reader, writer, args.host, {
+                    "app": app, "session_id": f"load-{i}", "message": f"Turn {turn} from session {i}",
+                })
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(str(e))
+    finally:
+        writer.close()
+
+
+async def run_load(args) -> None:
+    server_task = None
+    if args.inprocess:
+        from common.server import SessionServer
+        from common.stub_model import StubModel
+        server = SessionServer(max_inflight=args.max_inflight, stub_model=StubModel(latency=args.stub))
+        server_task = asyncio.create_task(server.serve(args.host, args.port, args.unix))
+        await asyncio.sleep(0.2)
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    # Ramp up connections in small batches to avoid a SYN flood on localhost
+    tasks = []
+    for i in range(args.sessions):
+        tasks.append(asyncio.create_task(run_session(i, args, latencies, errors)))
+        if i % 200 == 199:
+            await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"sessions={args.sessions} turns/session={args.turns} completed={len(latencies)} errors={len(errors)}")
+    print(f"wall={elapsed:.2f}s throughput={len(latencies) / elapsed:.1f} turns/s")
+    print(f"latency p50={percentile(latencies, 50) * 1000:.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:.1f}ms max={latencies[-1] * 1000 if latencies else 0:.1f}ms")
+    if errors:
+        print(f"first error: {errors[0]}")
+
+    if server_task is not None:
+        server_task.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load generator for common/server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="Connect over a Unix socket")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--inprocess", action="store_true", help="Start a stub-model server in this process")
+    parser.add_argument("--stub", type=float, default=0.2, help="Stub latency for --inprocess")
+    parser.add_argument("--max-inflight", type=int, default=64, help="Model call cap for --inprocess")
+    asyncio.run(run_load(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
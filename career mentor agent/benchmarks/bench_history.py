@@ -0,0 +1,88 @@
+"""Per-turn history cost and prompt size: old string context vs. HistoryManager.
+
+The old loop rebuilt "User: ...\\nAgent: ..." text from its last 3 entries
+every turn and prepended it to the query. The new loop sends structured
+messages from `HistoryManager`, whose window is kept up to date as turns come
+and go and is bounded by a token budget. Each loop runs once untimed first.
+
+Run from the app folder:
+    python benchmarks/bench_history.py [--turns 200] [--budgets 600 1000 2000] [--summary-tokens 0]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(APP_DIR))
+
+from common.history import HistoryManager  # noqa: E402
+
+SESSION = os.path.join(os.path.dirname(APP_DIR), "benchmarks", "data", "sessions", "career.json")
+
+
+def load_exchanges():
+    with open(SESSION, encoding="utf-8") as fh:
+        turns = json.load(fh)["turns"]
+    return [(t["user"], t["responses"][-1][-1]["text"]) for t in turns]
+
+
+def report(name: str, seconds: List[float], sizes: List[int]) -> None:
+    n = len(seconds)
+    print(f"  {name:<22} {sum(seconds) / n * 1e6:7.1f}us/turn  prompt={sum(sizes) / n:7.0f}B/turn  "
+          f"max={max(sizes):6d}B")
+
+
+def old_loop(exchanges, turns: int, show: bool = True) -> None:
+    history = []
+    seconds, sizes = [], []
+    for i in range(turns):
+        user, reply = exchanges[i % len(exchanges)]
+        started = time.perf_counter()
+        history.append({"user": user, "agent": None})
+        context = "\n".join([f"User: {e['user']}\nAgent: {e['agent']}" for e in history])
+        full_query = f"{context}\n\nCurrent Query: {user}" if context else user
+        history[-1]["agent"] = reply
+        if len(history) > 3:
+            history.pop(0)
+        seconds.append(time.perf_counter() - started)
+        sizes.append(len(full_query.encode("utf-8")))
+    if show:
+        report("text, last 3", seconds, sizes)
+
+
+def new_loop(exchanges, turns: int, budget: int, summary_tokens: int, show: bool = True) -> None:
+    history = HistoryManager(token_budget=budget, summary_tokens=summary_tokens)
+    seconds, sizes = [], []
+    for i in range(turns):
+        user, reply = exchanges[i % len(exchanges)]
+        started = time.perf_counter()
+        items = history.start_turn(user)
+        history.finish_turn(items + [{"role": "assistant", "content": reply}])
+        seconds.append(time.perf_counter() - started)
+        sizes.append(history.stats[-1].bytes_sent)
+    if show:
+        report(f"items, {budget} tok, sum {summary_tokens}", seconds, sizes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[600, 1000, 2000])
+    parser.add_argument("--summary-tokens", type=int, nargs="+", default=[0, 300],
+                        help="Summary shares to compare (0 drops evicted turns)")
+    args = parser.parse_args()
+    exchanges = load_exchanges()
+    print(f"== {args.turns} turns")
+    old_loop(exchanges, args.turns, show=False)
+    old_loop(exchanges, args.turns)
+    for summary_tokens in args.summary_tokens:
+        for budget in args.budgets:
+            new_loop(exchanges, args.turns, budget, summary_tokens, show=False)
+            new_loop(exchanges, args.turns, budget, summary_tokens)
+
+
+if __name__ == "__main__":
+    main()
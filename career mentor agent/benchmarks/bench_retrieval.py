@@ -0,0 +1,129 @@
+"""Roadmap lookup latency and memory with a large knowledge base.
+
+Generates N synthetic roadmap and job-role documents (default 100k) from the
+vocabulary of knowledge.jsonl, builds the vector index, then opens it in a
+fresh interpreter, memory-mapped and fully loaded, and runs top-k queries:
+
+- build: seconds and index size on disk
+- open: milliseconds and memory right after opening
+- search: p50/p99 per query (k=5), all documents and one kind only
+- memory after the queries, split into private (anonymous) pages and
+  file-backed pages; memory-mapped vectors are file-backed, so worker
+  processes share one copy through the page cache
+
+Run from the app folder:  python benchmarks/bench_retrieval.py [--docs 100000]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from knowledge import DEFAULT_DIM, KnowledgeIndex, index_path  # noqa: E402
+
+QUERIES = ["Data Science", "Artificial Intelligence", "cyber security", "web development", "creative arts",
+           "recent graduate, Python, interested in AI", "finance and accounting", "mobile apps with Flutter",
+           "healthcare data", "writing and journalism"]
+
+MEASURE = '''
+import json, os, sys, time
+sys.path.insert(0, {app!r})
+
+def memory():
+    fields = {{}}
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0]) / 1024
+    return fields
+
+import numpy
+from knowledge import KnowledgeIndex
+before = memory()
+t0 = time.perf_counter()
+index = KnowledgeIndex.open({index_dir!r}, mmap=sys.argv[1] == "mmap")
+open_ms = (time.perf_counter() - t0) * 1000
+opened = memory()
+queries = json.loads(sys.argv[2])
+times = {{"all": [], "kind": []}}
+for _ in range(int(sys.argv[3])):
+    for q in queries:
+        t0 = time.perf_counter(); index.search(q, k=5); times["all"].append(time.perf_counter() - t0)
+        t0 = time.perf_counter(); index.search(q, k=5, kind="roadmap"); times["kind"].append(time.perf_counter() - t0)
+print(json.dumps({{"open_ms": open_ms, "before": before, "opened": opened, "after": memory(), "times": times}}))
+'''
+
+
+def generate(path: str, n: int, seed: int) -> None:
+    """Synthetic documents mixing titles, fields, tags and sentences of the curated base."""
+    with open(os.path.join(APP_DIR, "knowledge.jsonl"), encoding="utf-8") as fh:
+        base = [json.loads(line) for line in fh if line.strip()]
+    rng = random.Random(seed)
+    levels = ["Junior", "Senior", "Lead", "Associate", "Remote", "Part-time", "Freelance", ""]
+    tags = sorted({t for d in base for t in d["tags"]})
+    sentences = [s for d in base for s in d["text"].splitlines()]
+    with open(path, "w", encoding="utf-8") as fh:
+        for i in range(n):
+            doc = rng.choice(base)
+            fh.write(json.dumps({
+                "id": f"doc-{i}", "kind": doc["kind"],
+                "title": f"{rng.choice(levels)} {doc['title']}".strip(),
+                "field": rng.choice(base)["field"] if rng.random() < 0.1 else doc["field"],
+                "tags": rng.sample(tags, 3) + doc["tags"][:2],
+                "text": "\n".join(rng.sample(sentences, 3)),
+            }) + "\n")
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def run(index_dir: str, mode: str, rounds: int) -> Dict:
+    script = MEASURE.format(app=APP_DIR, index_dir=index_dir)
+    out = subprocess.run([sys.executable, "-c", script, mode, json.dumps(QUERIES), str(rounds)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--rounds", type=int, default=20, help="Times each query is repeated")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        source = os.path.join(folder, "knowledge.jsonl")
+        generate(source, args.docs, args.seed)
+        t0 = time.perf_counter()
+        index = KnowledgeIndex.build(source, index_path(source), dim=args.dim)
+        build_s = time.perf_counter() - t0
+        index_dir = index_path(source)
+        size = sum(os.path.getsize(os.path.join(index_dir, f)) for f in os.listdir(index_dir))
+        print(f"{len(index)} documents, {args.dim} dims: built in {build_s:.1f}s, index {size / 1e6:.1f}MB on disk "
+              f"(source {os.path.getsize(source) / 1e6:.1f}MB)")
+        del index
+        print(f"{'mode':<7} {'open ms':>8} {'p50 ms':>7} {'p99 ms':>7} {'kind p50':>9} {'kind p99':>9} "
+              f"{'RSS after open':>15} {'private MB':>11} {'file-backed MB':>15}")
+        for mode in ("mmap", "load"):
+            r = run(index_dir, mode, args.rounds)
+            t = r["times"]
+            opened = r["opened"]["VmRSS"] - r["before"]["VmRSS"]
+            private = r["after"]["RssAnon"] - r["before"]["RssAnon"]
+            shared = r["after"]["RssFile"] - r["before"]["RssFile"]
+            print(f"{mode:<7} {r['open_ms']:>8.2f} {percentile(t['all'], 0.5) * 1000:>7.2f} "
+                  f"{percentile(t['all'], 0.99) * 1000:>7.2f} {percentile(t['kind'], 0.5) * 1000:>9.2f} "
+                  f"{percentile(t['kind'], 0.99) * 1000:>9.2f} {opened:>13.1f}MB {private:>11.1f} {shared:>15.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,62 @@
+import os
+import sys
+from typing import List, Optional
+
+# Shared helpers live in the repo-level `common` package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import TTLCache, cached_tool
+from knowledge import KnowledgeIndex, Match, load_index
+
+# Curated roadmaps and job roles; CAREER_KNOWLEDGE points at another JSONL file
+KNOWLEDGE_PATH = os.getenv("CAREER_KNOWLEDGE") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge.jsonl")
+
+# In-process cache for tool results (lookups are a pure function of their inputs)
+tool_cache = TTLCache(maxsize=1024, ttl=None)
+
+_index: Optional[KnowledgeIndex] = None
+
+
+def knowledge_index() -> KnowledgeIndex:
+    """The knowledge base index, opened (or built) on the first lookup."""
+    global _index
+    if _index is None:
+        _index = load_index(KNOWLEDGE_PATH)
+    return _index
+
+
+def format_matches(heading: str, matches: List[Match]) -> str:
+    if not matches:
+        return f"{heading}: no curated entries found; answer from general knowledge."
+    lines = [f"{heading} (curated, closest first; adapt and summarize these for the user):"]
+    for i, match in enumerate(matches, 1):
+        doc = match.doc
+        lines.append(f"{i}. {doc['title']} - {doc.get('field', '')} (match {match.score:.2f})")
+        lines.extend(f"   {line}" for line in doc.get("text", "").splitlines())
+    return "\n".join(lines)
+
+
+# The career tools, wired to the agents in agents.toml
+@cached_tool(tool_cache)
+def get_career_roadmap(name: str, career_field: str) -> str:
+    """
+    Tool to look up curated skill roadmaps for a given career field.
+    Args:
+        name (str): The user's name.
+        career_field (str): The career field (e.g., 'Software Engineering').
+    Returns:
+        str: The closest curated roadmaps, with beginner, intermediate and advanced phases.
+    """
+    matches = knowledge_index().search(career_field, k=2, kind="roadmap")
+    return format_matches(f"Career roadmap for {name} in {career_field}", matches)
+
+
+@cached_tool(tool_cache)
+def find_job_roles(profile: str) -> str:
+    """
+    Tool to look up curated job roles matching a user's skills, goals or field.
+    Args:
+        profile (str): Skills, goals and background (e.g., 'recent graduate, Python, interested in AI').
+    Returns:
+        str: The closest curated job roles with description, responsibilities, skills and industries.
+    """
+    return format_matches(f"Job roles for: {profile}", knowledge_index().search(profile, k=5, kind="job_role"))
@@ -0,0 +1,283 @@
+"""Curated roadmaps and job roles, searched through a memory-mapped vector index.
+
+The knowledge base is a JSONL file, one document per line:
+
+    {"id": "roadmap-data-science", "kind": "roadmap", "title": "Data Scientist",
+     "field": "Data Science", "tags": ["python", "statistics"], "text": "Beginner: ..."}
+
+Each document is embedded once with a hashed TF-IDF vector (words, word
+pairs and character 4-grams hashed into `dim` signed buckets, no model
+download; title, field and tags weigh more than the body), L2-normalized and
+stored as rows of a float32 NumPy matrix next to the source in
+`__pycache__/<name>.index/`. Opening the index memory-maps that matrix, so a
+process only pages in what it touches; a query is one matrix-vector product
+and an `argpartition` for the top k, and only those k documents are read back
+from the JSONL by their byte offset. The index is rebuilt when the source
+file's size or mtime changes.
+
+    python knowledge.py build knowledge.jsonl
+    python knowledge.py search knowledge.jsonl "machine learning engineer"
+"""
+import json
+import math
+import os
+import shutil
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Shared helpers live in the repo-level `common` package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.router import tokenize
+
+# Bump when the index layout changes
+FORMAT = 1
+DEFAULT_DIM = 256
+KEY_FIELDS = ("title", "field", "tags")
+# Title, field and tags say what a document is about; the body only adds detail
+KEY_WEIGHT = 3.0
+SUBWORD_WEIGHT = 0.5
+
+
+def _key_text(doc: Dict[str, Any]) -> str:
+    parts = []
+    for name in KEY_FIELDS:
+        value = doc.get(name)
+        if isinstance(value, list):
+            value = " ".join(map(str, value))
+        if value:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+def subwords(text: str) -> List[str]:
+    """Character 4-grams of each word, so "cyber security" meets "cybersecurity"."""
+    grams = []
+    for word in tokenize(text):
+        if "_" in word or len(word) < 4:
+            continue
+        padded = f"#{word}#"
+        grams.extend(f"~{padded[i:i + 4]}" for i in range(len(padded) - 3))
+    return grams
+
+
+def hashed_terms(text: str, dim: int, weight: float = 1.0, rich: bool = True,
+                 into: Optional[Dict[int, float]] = None) -> Dict[int, float]:
+    """Bucket -> signed, sublinear term weight for one text (added to `into` if given).
+
+    `rich` adds word pairs and subwords and hashes every term into two
+    buckets; plain mode (for long bodies) hashes single words once, so a
+    document does not fill every bucket.
+    """
+    buckets: Dict[int, float] = {} if into is None else into
+    words = tokenize(text)
+    if not rich:
+        words = [w for w in words if "_" not in w]
+    terms = [(Counter(words), weight)]
+    if rich:
+        terms.append((Counter(subwords(text)), weight * SUBWORD_WEIGHT))
+    for counts, scale in terms:
+        for term, count in counts.items():
+            # Two independent buckets per term (CRC32 with another seed would be
+            # correlated), so one collision cannot pass for a match
+            digest = int.from_bytes(blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+            hashes = (digest & 0xFFFFFFFF, digest >> 32) if rich else (digest & 0xFFFFFFFF,)
+            for h in hashes:
+                value = scale * (1.0 + math.log(count)) * (1.0 if h & 0x80000000 else -1.0)
+                bucket = h % dim
+                buckets[bucket] = buckets.get(bucket, 0.0) + value
+    return buckets
+
+
+def doc_terms(doc: Dict[str, Any], dim: int) -> Dict[int, float]:
+    terms = hashed_terms(_key_text(doc), dim, KEY_WEIGHT)
+    return hashed_terms(str(doc.get("text", "")), dim, rich=False, into=terms)
+
+
+def query_terms(text: str, dim: int) -> Dict[int, float]:
+    return hashed_terms(text, dim)
+
+
+def _read_docs(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(byte offset, document) for each non-empty line."""
+    with open(path, "rb") as fh:
+        offset = fh.tell()
+        for line in iter(fh.readline, b""):
+            if line.strip():
+                yield offset, json.loads(line)
+            offset = fh.tell()
+
+
+def _source_stat(path: str) -> List[int]:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+@dataclass
+class Match:
+    score: float
+    doc: Dict[str, Any]
+
+
+class KnowledgeIndex:
+    """Top-k cosine search over a knowledge base JSONL file.
+
+    Use `build()` to embed a file into an index folder and `open()` (or
+    `load_index()`, which does both as needed) to search it.
+    """
+
+    def __init__(self, source: str, vectors: np.ndarray, idf: np.ndarray, offsets: np.ndarray,
+                 kinds: np.ndarray, kind_names: Sequence[str]) -> None:
+        self.source = source
+        self.vectors = vectors
+        self.idf = idf
+        self.offsets = offsets
+        self.kinds = kinds
+        self.kind_names = list(kind_names)
+        self.dim = vectors.shape[1]
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    # ---------- building ----------
+
+    @classmethod
+    def build(cls, source: str, index_dir: str, dim: int = DEFAULT_DIM) -> "KnowledgeIndex":
+        """Embed every document of `source` and write the index to `index_dir`."""
+        source = os.path.abspath(source)
+        stat = _source_stat(source)
+        offsets: List[int] = []
+        kind_of: List[str] = []
+        rows: List[Dict[int, float]] = []
+        doc_freq = np.zeros(dim, dtype=np.int64)
+        for offset, doc in _read_docs(source):
+            terms = doc_terms(doc, dim)
+            offsets.append(offset)
+            kind_of.append(str(doc.get("kind", "")))
+            rows.append(terms)
+            doc_freq[list(terms)] += 1
+        n = len(rows)
+        idf = (np.log((1 + n) / (1 + doc_freq)) + 1).astype(np.float32)
+        kind_names = sorted(set(kind_of))
+        codes = {name: i for i, name in enumerate(kind_names)}
+        vectors = np.zeros((n, dim), dtype=np.float32)
+        for i, terms in enumerate(rows):
+            cols = np.fromiter(terms.keys(), dtype=np.int64, count=len(terms))
+            vectors[i, cols] = np.fromiter(terms.values(), dtype=np.float32, count=len(terms)) * idf[cols]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        kinds = np.array([codes[k] for k in kind_of], dtype=np.int16)
+        offsets_arr = np.array(offsets, dtype=np.int64)
+
+        tmp = f"{index_dir}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(tmp, exist_ok=True)
+            np.save(os.path.join(tmp, "vectors.npy"), vectors)
+            np.save(os.path.join(tmp, "idf.npy"), idf)
+            np.save(os.path.join(tmp, "offsets.npy"), offsets_arr)
+            np.save(os.path.join(tmp, "kinds.npy"), kinds)
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+                json.dump({"format": FORMAT, "dim": dim, "count": n, "kinds": kind_names,
+                           "source": source, "source_stat": stat}, fh)
+            shutil.rmtree(index_dir, ignore_errors=True)
+            os.replace(tmp, index_dir)
+        except OSError:
+            # A read-only install still works; the index just lives in memory
+            shutil.rmtree(tmp, ignore_errors=True)
+        return cls(source, vectors, idf, offsets_arr, kinds, kind_names)
+
+    @classmethod
+    def open(cls, index_dir: str, mmap: bool = True) -> "KnowledgeIndex":
+        """Open a built index; the vectors are memory-mapped unless `mmap=False`."""
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("format") != FORMAT:
+            raise ValueError(f"{index_dir}: index format {meta.get('format')}, expected {FORMAT}")
+        mode = "r" if mmap else None
+        return cls(
+            meta["source"],
+            np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode=mode),
+            np.load(os.path.join(index_dir, "idf.npy")),
+            np.load(os.path.join(index_dir, "offsets.npy"), mmap_mode=mode),
+            np.load(os.path.join(index_dir, "kinds.npy"), mmap_mode=mode),
+            meta["kinds"],
+        )
+
+    # ---------- searching ----------
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        terms = query_terms(text, self.dim)
+        if terms:
+            cols = np.fromiter(terms.keys(), dtype=np.int64, count=len(terms))
+            vec[cols] = np.fromiter(terms.values(), dtype=np.float32, count=len(terms)) * self.idf[cols]
+            norm = np.linalg.norm(vec)
+            if norm:
+                vec /= norm
+        return vec
+
+    def search(self, query: str, k: int = 3, kind: Optional[str] = None) -> List[Match]:
+        """The `k` documents closest to `query` (optionally only of one kind), best first."""
+        if not len(self) or k <= 0:
+            return []
+        scores = self.vectors @ self.embed(query)
+        if kind is not None:
+            if kind not in self.kind_names:
+                return []
+            scores = np.where(self.kinds == self.kind_names.index(kind), scores, -np.inf)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[scores[top] > -np.inf]
+        return [Match(float(scores[i]), doc) for i, doc in zip(top, self.documents(top))]
+
+    def documents(self, rows: Iterable[int]) -> List[Dict[str, Any]]:
+        """Read documents back from the source file by row number."""
+        docs = []
+        with open(self.source, "rb") as fh:
+            for row in rows:
+                fh.seek(int(self.offsets[row]))
+                docs.append(json.loads(fh.readline()))
+        return docs
+
+
+def index_path(source: str, cache_dir: Optional[str] = None) -> str:
+    source = os.path.abspath(source)
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir or os.path.join(os.path.dirname(source), "__pycache__"), f"{name}.index")
+
+
+def load_index(source: str, cache_dir: Optional[str] = None, dim: int = DEFAULT_DIM) -> KnowledgeIndex:
+    """Open the index of `source`, building it first if it is missing or stale."""
+    source = os.path.abspath(source)
+    index_dir = index_path(source, cache_dir)
+    try:
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if (meta.get("format") == FORMAT and meta.get("dim") == dim and meta.get("source") == source
+                and meta.get("source_stat") == _source_stat(source)):
+            return KnowledgeIndex.open(index_dir)
+    except (OSError, ValueError, KeyError):
+        pass
+    return KnowledgeIndex.build(source, index_dir, dim=dim)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) < 2 or args[0] not in ("build", "search") or (args[0] == "search" and len(args) != 3):
+        print("usage: python knowledge.py build KNOWLEDGE.jsonl | search KNOWLEDGE.jsonl QUERY")
+        raise SystemExit(2)
+    if args[0] == "build":
+        index = KnowledgeIndex.build(args[1], index_path(args[1]))
+        print(f"Indexed {len(index)} documents ({index.dim} dims) -> {index_path(args[1])}")
+        return
+    for match in load_index(args[1]).search(args[2], k=5):
+        print(f"{match.score:.3f}  [{match.doc.get('kind')}] {match.doc.get('title')}")
+
+
+if __name__ == "__main__":
+    main()
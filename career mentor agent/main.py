@@ -1,96 +1,71 @@
 import os
+import sys
+import time
+import asyncio
 from dotenv import load_dotenv
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, RunContextWrapper, set_tracing_disabled
+from agents import Runner
+from openai import RateLimitError
+
+# Shared helpers live in the repo-level `common` package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.cache import ResponseCache
+from common.graph import load_graph
+from common.history import HistoryManager
+from common.provider import api_key_configured, lazy_model
+from common.ratelimit import scheduler_from_env
+from common.router import PreRouter, classifier_from_env
+from common.sessions import store_from_env
+from common.streaming import StreamStats, stream_turn
+from common.tracing import setup_tracing, timed_span, turn_trace
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Get Gemini API key from environment variables
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-if not gemini_api_key:
-    print("Error: GEMINI_API_KEY not found in .env file.")
-    exit(1)
-
-# Initialize OpenAI provider with Gemini API settings
-provider = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai",
-)
-
-# Configure the language model
-model = OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=provider)
-
-# Define the career roadmap tool
-@function_tool
-def get_career_roadmap(name: str, career_field: str) -> str:
-    """
-    Tool to generate a skill roadmap for a given career field.
-    Args:
-        name (str): The user's name.
-        career_field (str): The career field (e.g., 'Software Engineering').
-    Returns:
-        str: A formatted string with the career roadmap.
-    """
-    return f"Career roadmap for {name} in {career_field}: Start with foundational skills (e.g., Python, basic algorithms), progress to intermediate projects (e.g., small AI models), and specialize in advanced topics (e.g., deep learning, cloud deployment)."
-
-# Define CareerAgent
-career_agent = Agent(
-    name="CareerAgent",
-    instructions="""
-You are CareerAgent, an intelligent career guidance assistant. Suggest 3–5 career fields based on the user's interests, personality, educational background, and passions. Ask clarifying questions if needed, then provide short, insightful reasons for each recommendation. Focus on long-term success and personal satisfaction, tailoring responses to the user’s unique profile. Be practical, motivational, and forward-looking.
-""",
-    model=model,
-    tools=[get_career_roadmap]
-)
-
-# Define SkillAgent
-skill_agent = Agent(
-    name="SkillAgent",
-    instructions="""
-You are SkillAgent, a personalized skill-development strategist. Create clear, actionable skill-building roadmaps for users aiming to grow in a specific field. Divide the plan into beginner, intermediate, and advanced phases. Suggest tools, platforms, and learning resources for each phase. Recommend real-world projects and timelines based on the user’s knowledge level, time availability, and learning preferences.
-""",
-    model=model,
-    tools=[get_career_roadmap]
-)
-
-# Define JobAgent
-job_agent = Agent(
-    name="JobAgent",
-    instructions="""
-You are JobAgent, a smart job-matching advisor. Suggest 3–5 real-world job roles and entry-level positions that fit the user's current skills, goals, and educational background (e.g., recent graduate). For each role, provide:
-- **Title**: The job title.
-- **Description**: A brief overview of the role.
-- **Key Responsibilities**: Main tasks the role involves.
-- **Required Skills**: Essential skills or qualifications.
-- **Industries**: Common industries hiring for this role.
-Focus on relevant, realistic, and achievable roles, especially for users with little professional experience but strong practical skills or project work. For AI/ML roles, prioritize entry-level positions suitable for recent graduates.
-""",
-    model=model,
-    tools=[get_career_roadmap]
-)
-
-# Define TriageAgent
-triage_agent = Agent(
-    name="TriageAgent",
-    instructions="""
-You are TriageAgent, the central coordinator that routes user queries to the most appropriate specialized agent:
-
-1. **CareerAgent**: For users exploring career paths based on interests, personality, or background (e.g., "What career should I choose?").
-2. **SkillAgent**: For users seeking a skill-building roadmap in a specific field (e.g., "How do I become a data scientist?").
-3. **JobAgent**: For users asking about job roles or positions matching their skills or goals (e.g., "What jobs can I get in AI?").
-
-Analyze the user’s query and conversation history to identify intent. If the query explicitly mentions job roles, positions, or employment opportunities, route to JobAgent. If unclear, ask one short clarifying question. Be concise, practical, and user-focused with a motivational tone. Log which agent is selected for debugging.
-""",
-    model=model,
-    tools=[get_career_roadmap],
-    handoffs=[career_agent, skill_agent, job_agent],
+# The Gemini client is built lazily on the first model call and shared by
+# every agent through one pooled connection pool (see common/provider.py)
+model = lazy_model("gemini-2.0-flash")
+
+# Optional on-disk cache of whole answers, enabled by RESPONSE_CACHE_PATH
+response_cache_path = os.getenv("RESPONSE_CACHE_PATH")
+response_cache = ResponseCache(response_cache_path) if response_cache_path else None
+
+# Agents, instructions, tools and handoffs are declared in agents.toml. The
+# compiled tool schemas are cached in __pycache__, so later starts skip
+# re-deriving them (see common/graph.py)
+graph = load_graph(os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents.toml"), model=model)
+career_agent = graph.agents["CareerAgent"]
+skill_agent = graph.agents["SkillAgent"]
+job_agent = graph.agents["JobAgent"]
+triage_agent = graph.entry
+
+# Keyword rules for the local pre-router; clear-cut queries skip the TriageAgent call.
+# One phrase is enough; generic keywords need a second match
+ROUTING_RULES = {
+    "JobAgent": [r"\bjob roles?\b", r"\b(what|which) (jobs?|positions?)\b", r"\bjobs? (for|in|with|that)\b",
+                 r"\b(job|employment) (options|opportunities)\b", r"\bhiring\b", r"\binternships?\b",
+                 r"\bentry[- ]level\b", r"\bwho hires\b"],
+    "SkillAgent": [r"\bhow (do|can|should) i (become|learn|get (good|better))\b", r"\bwhat should i learn\b",
+                   r"\broadmap\b", r"\b(what|which) (skills|courses)\b", r"\b(improve|build|develop) (my )?skills\b",
+                   r"\blearning (resources|materials|path)\b", r"\bstudy plan\b"],
+    "CareerAgent": [r"\b(which|what) career\b", r"\bcareer (path|options?|choices?)\b", r"\bchoose a career\b",
+                    r"\bwhat should i (do|study|become)\b", r"\bsuits? my (personality|interests)\b"],
+}
+ROUTING_KEYWORDS = {
+    "JobAgent": [r"\bjobs?\b", r"\bpositions?\b", r"\bemployment\b"],
+    # "machine learning" and "deep learning" are fields, not a wish to learn
+    "SkillAgent": [r"\bskills?\b", r"(?<!machine )(?<!deep )\blearn(ing)?\b", r"\bcourses?\b"],
+}
+
+router = PreRouter(
+    agents={agent.name: agent for agent in (career_agent, skill_agent, job_agent)},
+    rules=ROUTING_RULES,
+    keywords=ROUTING_KEYWORDS,
+    classifier=classifier_from_env(),
 )
 
-# Disable tracing for cleaner output
-set_tracing_disabled(disabled=True)
-
-# Initialize conversation history
-conversation_history = []
+# Local span recording, enabled by TRACE_SPANS (a JSONL path or "memory");
+# otherwise SDK tracing stays disabled
+recorder = setup_tracing()
 
 def print_welcome_message():
     print("\n=== Career Guidance Assistant ===")
@@ -98,57 +73,107 @@ def print_welcome_message():
     print("Type your query below, or type 'exit' to quit.")
     print("================================\n")
 
-def format_history_for_context():
-    """Format conversation history for passing to the agent."""
-    if not conversation_history:
-        return ""
-    return "\n".join([f"User: {entry['user']}\nAgent: {entry['agent']}" for entry in conversation_history])
-
 def main():
+    if not api_key_configured():
+        print("Error: GEMINI_API_KEY not found in .env file.")
+        exit(1)
     print_welcome_message()
     
+    # Earlier exchanges are sent as structured messages: the most recent ones that
+    # fit the token budget. Older ones are dropped, as before, unless
+    # HISTORY_SUMMARY_TOKENS reserves part of the budget for a rolling summary
+    budget = int(os.getenv("HISTORY_TOKEN_BUDGET", "500"))
+    summary_tokens = int(os.getenv("HISTORY_SUMMARY_TOKENS", "0"))
+    # SESSION_STORE keeps the conversation across restarts; SESSION_ID picks which one to resume
+    store = store_from_env()
+    session_id = f"career:{os.getenv('SESSION_ID', 'default')}"
+    history_options = {"token_budget": budget, "summary_tokens": summary_tokens}
+    history = HistoryManager.resume(store, session_id, **history_options) if store else HistoryManager(**history_options)
+    
+    # STREAM_OUTPUT=1 prints tokens as they arrive instead of waiting for the full answer
+    streaming = bool(os.getenv("STREAM_OUTPUT"))
+    stream_stats = StreamStats()
+    # One event loop for the whole session so the HTTP client is reused between turns
+    loop_runner = asyncio.Runner() if streaming else None
+    
     while True:
         # Get user input
         query = input("Enter your query (or 'exit' to quit): ").strip()
         
         if query.lower() == 'exit':
             print("Goodbye! Best of luck on your career journey!")
+            if loop_runner:
+                loop_runner.close()
             break
         
         if not query:
             print("Please enter a valid query.")
             continue
         
-        # Append user query to history
-        conversation_history.append({"user": query, "agent": None})
-        
-        # Prepare context with history (limit to last 3 for focus)
-        context = format_history_for_context()
-        full_query = f"{context}\n\nCurrent Query: {query}" if context else query
-        
-        try:
-            # Run the query through TriageAgent
-            result = Runner.run_sync(
-                starting_agent=triage_agent,
-                input=full_query,
-            )
-            
-            # Get the final output
-            response = result.final_output or "Sorry, I couldn't generate a response. Let me provide some default AI/ML job roles for a recent graduate:\n" + fallback_ai_ml_jobs()
-            
-            # Update the latest history entry with the agent's response
-            conversation_history[-1]["agent"] = response
+        # One trace per turn: history handling, model calls, tools and handoffs
+        with turn_trace("career"):
+            # Prepare the input: recent exchanges within the token budget, then the query
+            with timed_span("history.start_turn") as span:
+                conversation = history.start_turn(query)
+                span["bytes"] = history.stats[-1].bytes_sent
             
-            # Print the response
-            print("\nAssistant:", response, "\n")
-            
-            # Keep history manageable (last 3 interactions)
-            if len(conversation_history) > 3:
-                conversation_history.pop(0)
+            try:
+                streamed = False
+                # Reuse a cached answer for an identical (normalized) query
+                cached = response_cache.get(triage_agent, conversation) if response_cache else None
+                if cached is not None:
+                    response = cached
+                else:
+                    # Start at the specialist directly when the intent is clear
+                    start_agent, decision = router.pick(query, triage_agent)
+                    started = time.perf_counter()
+                    if streaming:
+                        # Stream the answer, showing handoffs inline
+                        print()
+                        result, _ = loop_runner.run(stream_turn(start_agent, conversation, stats=stream_stats))
+                        streamed = True
+                    else:
+                        # Run the query through TriageAgent (or the pre-routed specialist)
+                        result = Runner.run_sync(
+                            starting_agent=start_agent,
+                            input=conversation,
+                        )
+                    router.timed(decision, started)
+                    
+                    if response_cache and result.final_output:
+                        response_cache.put(triage_agent, conversation, result.final_output)
+                    
+                    # Get the final output
+                    response = result.final_output or "Sorry, I couldn't generate a response. Let me provide some default AI/ML job roles for a recent graduate:\n" + fallback_ai_ml_jobs()
+                
+                # Keep only the query and the final answer as context for later turns
+                with timed_span("history.finish_turn"):
+                    history.finish_turn(conversation + [{"role": "assistant", "content": response}])
+                
+                # Print the response (already printed token by token when streaming)
+                if streamed:
+                    print()
+                    if os.getenv("SHOW_STREAM_STATS"):
+                        print(stream_stats.report(), "\n")
+                else:
+                    print("\nAssistant:", response, "\n")
+                if os.getenv("SHOW_HISTORY_STATS"):
+                    print(history.report(), "\n")
+                if os.getenv("SHOW_ROUTER_STATS"):
+                    print(router.stats.report(), "\n")
+                if os.getenv("SHOW_TRACE_SUMMARY") and recorder is not None:
+                    print(recorder.summary(), "\n")
+                if os.getenv("SHOW_RATE_LIMIT_STATS"):
+                    print(scheduler_from_env().report(), "\n")
                 
-        except Exception as e:
-            print(f"\nError processing query: {str(e)}")
-            print("Please try again or check your API key and connection.\n")
+            except RateLimitError:
+                # Only reached once the rate limiter's own retries are used up
+                history.cancel_turn()
+                print("\nThe model is still rate limited after several retries. Please wait a moment and ask again.\n")
+            except Exception as e:
+                history.cancel_turn()
+                print(f"\nError processing query: {str(e)}")
+                print("Please try again or check your API key and connection.\n")
 
 
 if __name__ == "__main__":
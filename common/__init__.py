@@ -0,0 +1 @@
+"""Helpers shared by the agent apps in this repository."""
@@ -0,0 +1,80 @@
+"""Load the agent apps by folder so they can be hosted side by side.
+
+Each app lives in its own folder with a `main.py`, so they cannot be imported
+as normal packages (and all three are called `main`). `load_app()` imports
+one under a unique module name and returns its entry agent.
+"""
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class AppSpec(NamedTuple):
+    folder: str
+    agent_attr: str
+    # Class in main.py instantiated as each session's run context, if any
+    context_attr: Optional[str] = None
+    # ContextVar that nested `Runner.run` calls (tools that run an agent
+    # themselves) read their RunConfig from, if any: an attribute of main.py,
+    # or "module.attr" for one of the app's own modules
+    run_config_attr: Optional[str] = None
+
+
+APPS: Dict[str, AppSpec] = {
+    "career": AppSpec("career mentor agent", "triage_agent"),
+    "travel": AppSpec("ai travel agent", "main_agent", run_config_attr="planner.explore_run_config"),
+    "game": AppSpec("Game Master Agent", "main_Agent", "GameState"),
+}
+
+_loaded: Dict[str, ModuleType] = {}
+
+
+def load_module(name: str) -> ModuleType:
+    """Import an app's `main.py` once, as `<name>_app`."""
+    if name in _loaded:
+        return _loaded[name]
+    spec = APPS[name]
+    app_dir = os.path.join(REPO_ROOT, spec.folder)
+    # App-local modules (e.g. the travel app's inventory.py) must be importable
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    module_spec = importlib.util.spec_from_file_location(f"{name}_app", os.path.join(app_dir, "main.py"))
+    module = importlib.util.module_from_spec(module_spec)
+    sys.modules[module_spec.name] = module
+    module_spec.loader.exec_module(module)
+    _loaded[name] = module
+    return module
+
+
+def load_app(name: str):
+    """Return the entry agent of an app: "career", "travel" or "game"."""
+    if name not in APPS:
+        raise KeyError(f"Unknown app {name!r}; expected one of {sorted(APPS)}")
+    return getattr(load_module(name), APPS[name].agent_attr)
+
+
+def new_context(name: str) -> Any:
+    """A fresh run context for one session of an app (None if it uses none)."""
+    attr = APPS[name].context_attr
+    return getattr(load_module(name), attr)() if attr else None
+
+
+def use_run_config(name: str, config: Any) -> Optional[Callable[[], None]]:
+    """Make nested agent runs inside the app's tools use `config` in the current task.
+
+    Call it in the task that runs the turn; the setting does not leak into
+    other sessions' tasks. Returns a function that undoes it (None if the app
+    has no nested runs).
+    """
+    attr = APPS[name].run_config_attr
+    if not attr:
+        return None
+    module = load_module(name)
+    module_name, _, attr = attr.rpartition(".")
+    var = getattr(importlib.import_module(module_name) if module_name else module, attr)
+    token = var.set(config)
+    return lambda: var.reset(token)
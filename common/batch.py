@@ -0,0 +1,385 @@
+"""Batch mode: run a JSONL file of queries through one app's agent graph.
+
+For regression runs and for pre-warming the response cache without the
+interactive loop. Each input line is a query, run as the first turn of a
+fresh session:
+
+    {"id": "q1", "query": "What jobs can I get in AI?"}
+
+Queries are read lazily and handed to a fixed pool of workers, so memory
+stays flat however long the file is. Results are appended to the output
+JSONL as they finish, in completion order:
+
+    {"line": 0, "id": "q1", "query": "...", "output": "...", "agent": "JobAgent",
+     "attempts": 1, "ms": 812.4}
+
+Failed queries get an "error" field instead of "output". Retrying is split
+between two layers so they never multiply: each model call's transient
+errors (rate limits, timeouts, connection and 5xx errors) are retried by
+`RateLimitedModel` (common/ratelimit.py) under the shared scheduler's AIMD
+back-off, and the batch runner only retries a whole query whose attempt ran
+past `--timeout`, with exponential backoff and jitter. Any other error fails
+the query.
+
+Progress is checkpointed to `<output>.ckpt`: the input line below which every
+query is done. `--resume` skips those lines, plus any later ones already in
+the output, so a crashed or interrupted run continues where it stopped
+without repeating or duplicating queries.
+
+    python -m common.batch --app career --input queries.jsonl --output results.jsonl --concurrency 16
+    python -m common.batch --app career --input queries.jsonl --output results.jsonl --resume
+    python -m common.batch --app travel --input q.jsonl --output r.jsonl --cache responses.db  # pre-warm
+    python -m common.batch --app career --input q.jsonl --output r.jsonl --stub 0.05          # no API key
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from agents import Model, RunConfig, Runner
+
+from common.apps import APPS, load_app, new_context, use_run_config
+from common.cache import ResponseCache
+from common.ratelimit import BATCH, backoff_delay, request_priority
+
+# Sentinel telling a worker to stop
+_DONE = None
+
+
+def read_queries(path: str, start: int = 0) -> Iterator[Tuple[int, Optional[Dict[str, Any]], str]]:
+    """Yield `(line, record, error)` for each non-blank input line from `start` on.
+
+    `record` is None (and `error` set) when the line isn't a usable query.
+    """
+    with open(path, encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh):
+            if line_no < start or not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if isinstance(record, str):
+                record = {"query": record}
+            if not isinstance(record, dict) or not isinstance(record.get("query"), str):
+                yield line_no, None, 'Expected a string or an object with a "query" string'
+                continue
+            yield line_no, record, ""
+
+
+class Reservoir:
+    """Fixed-size uniform sample of a stream, for percentiles in constant memory."""
+
+    def __init__(self, size: int = 10000) -> None:
+        self.size = size
+        self.seen = 0
+        self.values: List[float] = []
+
+    def add(self, value: float) -> None:
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            i = random.randrange(self.seen)
+            if i < self.size:
+                self.values[i] = value
+
+    def percentile(self, q: float) -> float:
+        if not self.values:
+            return 0.0
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class BatchStats:
+    ok: int = 0
+    failed: int = 0
+    cached: int = 0
+    retries: int = 0
+    skipped: int = 0  # past the checkpoint but already in the output
+    resumed_from: int = 0  # input line the run started at
+    started: float = field(default_factory=time.perf_counter)
+    latencies: Reservoir = field(default_factory=Reservoir)
+
+    @property
+    def done(self) -> int:
+        return self.ok + self.failed
+
+    def progress(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        return (f"{self.done} done ({self.failed} failed, {self.retries} retries) "
+                f"{self.done / elapsed if elapsed else 0.0:.1f} q/s")
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        lat = self.latencies
+        # ru_maxrss is in KiB on Linux
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return "\n".join([
+            f"Queries: {self.done} run ({self.ok} ok, {self.failed} failed, {self.cached} from cache)"
+            + (f", resumed at input line {self.resumed_from} with {self.skipped} later queries already done"
+               if self.resumed_from or self.skipped else ""),
+            f"Retries: {self.retries}",
+            f"Wall time: {elapsed:.1f}s  throughput: {self.done / elapsed if elapsed else 0.0:.2f} queries/s",
+            f"Latency: p50={lat.percentile(0.5):.0f}ms  p95={lat.percentile(0.95):.0f}ms  "
+            f"p99={lat.percentile(0.99):.0f}ms",
+            f"Peak RSS: {rss:.1f}MB",
+        ])
+
+
+class Checkpoint:
+    """Tracks which input lines are finished and persists the low-water mark.
+
+    `next_line` only advances over a contiguous run of finished lines, so
+    every line below it is in the output. Lines finished above it are kept in
+    a set, which stays about as small as the number of queries in flight.
+    """
+
+    def __init__(self, path: str, next_line: int = 0, finished: Optional[Set[int]] = None) -> None:
+        self.path = path
+        self.next_line = next_line
+        self.finished: Set[int] = set(finished or ())
+        self._advance()
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, encoding="utf-8") as fh:
+            return cls(path, json.load(fh).get("next_line", 0))
+
+    def _advance(self) -> None:
+        while self.next_line in self.finished:
+            self.finished.remove(self.next_line)
+            self.next_line += 1
+
+    def mark(self, line: int) -> None:
+        self.finished.add(line)
+        self._advance()
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"next_line": self.next_line, "updated": time.time()}, fh)
+        os.replace(tmp, self.path)
+
+
+def _repair_output(path: str) -> Set[int]:
+    """Drop a half-written last line and return the input lines already in `path`."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as fh:
+        data_end = fh.seek(0, os.SEEK_END)
+        if data_end:
+            fh.seek(max(0, data_end - 1))
+            if fh.read(1) != b"\n":
+                # Crashed mid-write: cut back to the last complete line
+                pos = data_end
+                while pos > 0:
+                    step = min(64 * 1024, pos)
+                    pos -= step
+                    fh.seek(pos)
+                    cut = fh.read(step).rfind(b"\n")
+                    if cut >= 0:
+                        fh.truncate(pos + cut + 1)
+                        break
+                else:
+                    fh.truncate(0)
+    done: Set[int] = set()
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                done.add(json.loads(line)["line"])
+    return done
+
+
+class BatchRunner:
+    """Runs queries from a JSONL file through an app's entry agent with bounded concurrency.
+
+    Args:
+        app: "career", "travel" or "game".
+        concurrency: Queries in flight at once.
+        retries: Extra attempts for a query whose attempt timed out (model call
+            errors are retried by `RateLimitedModel`, not here).
+        timeout: Seconds allowed per attempt (None for no limit).
+        model: Optional model override for every agent (e.g. `StubModel`).
+        cache: Optional `ResponseCache`; hits skip the model, misses are stored.
+    """
+
+    def __init__(self, app: str, concurrency: int = 8, retries: int = 4, timeout: Optional[float] = 120.0,
+                 backoff_base: float = 1.0, backoff_cap: float = 30.0, model: Optional[Model] = None,
+                 cache: Optional[ResponseCache] = None, checkpoint_interval: float = 1.0) -> None:
+        self.app = app
+        self.agent = load_app(app)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.run_config = RunConfig(model=model) if model is not None else None
+        self.cache = cache
+        self.checkpoint_interval = checkpoint_interval
+        self.stats = BatchStats()
+
+    async def run_query(self, query: str) -> Dict[str, Any]:
+        """One query as the first turn of a fresh session, retrying attempts that time out."""
+        # Same input as a new session's first turn, so cache entries are shared with the app loops
+        items = [{"role": "user", "content": query}]
+        if self.cache is not None:
+            hit = self.cache.get(self.agent, items)
+            if hit is not None:
+                self.stats.cached += 1
+                return {"output": hit, "agent": None, "attempts": 0, "cached": True}
+        # Nested agent runs inside the app's tools use the same model as the query
+        undo_run_config = use_run_config(self.app, self.run_config)
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    async with asyncio.timeout(self.timeout) as deadline:
+                        result = await Runner.run(self.agent, items, context=new_context(self.app),
+                                                  run_config=self.run_config)
+                except TimeoutError as e:
+                    # Only our own deadline is retried; model call timeouts were already retried
+                    if not deadline.expired() or attempt > self.retries:
+                        raise
+                    self.stats.retries += 1
+                    await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap, e))
+                    continue
+                break
+        finally:
+            if undo_run_config is not None:
+                undo_run_config()
+        output = str(result.final_output)
+        if self.cache is not None and result.final_output:
+            self.cache.put(self.agent, items, output)
+        return {"output": output, "agent": result.last_agent.name, "attempts": attempt}
+
+    async def run(self, input_path: str, output_path: str, resume: bool = False,
+                  progress: float = 0.0) -> BatchStats:
+        # Model calls from this run queue behind interactive turns in the shared rate limiter
+        request_priority.set(BATCH)
+        checkpoint = Checkpoint.load(output_path + ".ckpt") if resume else Checkpoint(output_path + ".ckpt")
+        already = {n for n in _repair_output(output_path) if n >= checkpoint.next_line} if resume else set()
+        out = open(output_path, "a" if resume else "w", encoding="utf-8")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        last_save = time.monotonic()
+
+        def save_checkpoint() -> None:
+            out.flush()
+            os.fsync(out.fileno())
+            checkpoint.save()
+
+        def finish(line: int, record: Dict[str, Any]) -> None:
+            nonlocal last_save
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            checkpoint.mark(line)
+            if time.monotonic() - last_save >= self.checkpoint_interval:
+                save_checkpoint()
+                last_save = time.monotonic()
+
+        async def worker() -> None:
+            while True:
+                job = await queue.get()
+                if job is _DONE:
+                    return
+                line, record, error = job
+                base = {"line": line, "id": record.get("id", line) if record else line}
+                if record is None:
+                    self.stats.failed += 1
+                    finish(line, {**base, "error": error})
+                    continue
+                base["query"] = record["query"]
+                started = time.perf_counter()
+                try:
+                    result = await self.run_query(record["query"])
+                except Exception as e:
+                    self.stats.failed += 1
+                    finish(line, {**base, "error": f"{type(e).__name__}: {e}",
+                                  "ms": round((time.perf_counter() - started) * 1000, 1)})
+                    continue
+                ms = (time.perf_counter() - started) * 1000
+                self.stats.ok += 1
+                self.stats.latencies.add(ms)
+                finish(line, {**base, **result, "ms": round(ms, 1)})
+
+        async def report_progress() -> None:
+            while True:
+                await asyncio.sleep(progress)
+                print(self.stats.progress(), file=sys.stderr)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        reporter = asyncio.create_task(report_progress()) if progress > 0 else None
+        try:
+            self.stats.resumed_from = checkpoint.next_line
+            last_line = checkpoint.next_line
+            for job in read_queries(input_path, checkpoint.next_line):
+                line = job[0]
+                # Blank lines skipped by the reader count as finished
+                for n in range(last_line, line):
+                    checkpoint.mark(n)
+                last_line = line + 1
+                if line in already:
+                    self.stats.skipped += 1
+                    checkpoint.mark(line)
+                    continue
+                # Blocks while the workers are busy, so only a few lines are read ahead
+                await queue.put(job)
+            for _ in workers:
+                await queue.put(_DONE)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            if reporter is not None:
+                reporter.cancel()
+            save_checkpoint()
+            out.close()
+        return self.stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of queries through an agent app.")
+    parser.add_argument("--app", required=True, choices=list(APPS))
+    parser.add_argument("--input", required=True, help='JSONL file: {"id": ..., "query": "..."} per line')
+    parser.add_argument("--output", required=True, help="JSONL results file, appended as queries finish")
+    parser.add_argument("--concurrency", type=int, default=8, help="Queries in flight at once")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per query after a --timeout")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds per attempt (0 for no limit)")
+    parser.add_argument("--backoff", type=float, default=1.0, help="Base retry delay in seconds")
+    parser.add_argument("--resume", action="store_true", help="Continue from <output>.ckpt")
+    parser.add_argument("--cache", metavar="PATH", help="Response cache to read and pre-warm")
+    parser.add_argument("--progress", type=float, default=10.0, help="Seconds between progress lines (0: off)")
+    parser.add_argument("--stub", type=float, metavar="SECONDS",
+                        help="Use the local stub model with this latency instead of Gemini")
+    args = parser.parse_args()
+
+    model = None
+    if args.stub is not None:
+        from common.stub_model import StubModel
+        model = StubModel(latency=args.stub)
+    cache = ResponseCache(args.cache) if args.cache else None
+    runner = BatchRunner(args.app, concurrency=args.concurrency, retries=args.retries,
+                         timeout=args.timeout or None, backoff_base=args.backoff, model=model, cache=cache)
+    try:
+        asyncio.run(runner.run(args.input, args.output, resume=args.resume, progress=args.progress))
+    except KeyboardInterrupt:
+        print("Interrupted; rerun with --resume to continue.", file=sys.stderr)
+    finally:
+        if cache is not None:
+            cache.close()
+    print(runner.stats.report())
+
+
+if __name__ == "__main__":
+    main()
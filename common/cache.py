@@ -0,0 +1,251 @@
+"""Two-tier cache for deterministic tool calls and repeated prompts.
+
+Tier 1, `TTLCache`: in-process LRU with a TTL, used by `cached_tool` to
+memoise tool results keyed on the validated argument payload.
+
+Tier 2, `ResponseCache`: optional on-disk (SQLite) store of whole final
+outputs, keyed on (agent name, instructions hash, normalized input).
+
+    tool_cache = TTLCache(maxsize=1024, ttl=300)
+
+    @function_tool
+    @cached_tool(tool_cache)
+    def get_career_roadmap(name: str, career_field: str) -> str: ...
+
+Both tiers keep hit / miss / eviction counters and can be invalidated
+explicitly.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return default
+        expires, value = entry
+        if expires and expires < time.monotonic():
+            del self._data[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl if ttl else 0.0, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None, *, prefix: Optional[str] = None) -> int:
+        """Drop one key, every tuple key whose first element is `prefix`, or everything."""
+        if key is not None:
+            removed = 1 if self._data.pop(key, None) is not None else 0
+        elif prefix is not None:
+            stale = [k for k in self._data if isinstance(k, tuple) and k and k[0] == prefix]
+            for k in stale:
+                del self._data[k]
+            removed = len(stale)
+        else:
+            removed = len(self._data)
+            self._data.clear()
+        self.stats.invalidations += removed
+        return removed
+
+
+def _payload(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_payload(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _payload(v) for k, v in value.items()}
+    return value
+
+
+def tool_key(name: str, args: Dict[str, Any]) -> Tuple[str, str]:
+    """Cache key for one tool call: the tool name plus its canonical JSON arguments."""
+    return name, json.dumps(_payload(args), sort_keys=True, default=str)
+
+
+def cached_tool(cache: TTLCache, ttl: Optional[float] = None) -> Callable[[Callable], Callable]:
+    """Memoise a deterministic tool function (sync or async) in `cache`.
+
+    Apply it under `@function_tool` so the SDK still sees the original
+    signature and docstring. Exceptions are never cached. Call
+    `cache.invalidate(prefix=func.__name__)` to drop one tool's results.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        # Context arguments are per-run and not part of the tool's input
+        skip = {name for name, p in signature.parameters.items()
+                if "RunContextWrapper" in str(p.annotation) or "ToolContext" in str(p.annotation)}
+
+        def key_for(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tool_key(func.__name__, {k: v for k, v in bound.arguments.items() if k not in skip})
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = key_for(args, kwargs)
+                value = cache.get(key, _MISSING)
+                if value is _MISSING:
+                    value = await func(*args, **kwargs)
+                    cache.set(key, value, ttl)
+                return value
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_for(args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value, ttl)
+            return value
+        return wrapper
+
+    return decorator
+
+
+def normalize_input(input: Any) -> str:
+    """Canonical text of a run input: case, whitespace and trailing punctuation folded."""
+    if not isinstance(input, str):
+        input = json.dumps(input, sort_keys=True, default=str)
+    text = re.sub(r"\s+", " ", input.strip().lower())
+    return text.rstrip(" ?!.")
+
+
+def instructions_hash(agent: Any) -> str:
+    instructions = getattr(agent, "instructions", "")
+    text = instructions if isinstance(instructions, str) else repr(instructions)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def graph_hash(agent: Any) -> str:
+    """Hash of the instructions of `agent` and every agent it can hand off to.
+
+    A turn that starts at the entry agent may be answered by any of them (or
+    start at one directly through the pre-router), so all count for its key.
+    """
+    parts, seen, stack = [], set(), [agent]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        parts.append(f"{getattr(current, 'name', '')}:{instructions_hash(current)}")
+        stack.extend(h for h in getattr(current, "handoffs", None) or () if hasattr(h, "instructions"))
+    return hashlib.sha256("\x00".join(sorted(parts)).encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """On-disk cache of final agent outputs, shared across processes.
+
+    Entries are keyed on the agent's name, a hash of its instructions and
+    those of every agent it hands off to, and the normalized input, so editing
+    any agent's instructions invalidates the entries it may have answered.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 24 * 3600) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, agent TEXT NOT NULL, output TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(agent: Any, input: Any) -> str:
+        raw = f"{agent.name}\x00{graph_hash(agent)}\x00{normalize_input(input)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, agent: Any, input: Any) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT output, created FROM responses WHERE key = ?", (self.key(agent, input),)
+        ).fetchone()
+        if row is None:
+            self.stats.misses += 1
+            return None
+        output, created = row
+        if self.ttl and created + self.ttl < time.time():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (self.key(agent, input),))
+            self._db.commit()
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return output
+
+    def put(self, agent: Any, input: Any, output: Any) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, agent, output, created) VALUES (?, ?, ?, ?)",
+            (self.key(agent, input), agent.name, str(output), time.time()),
+        )
+        self._db.commit()
+
+    def invalidate(self, agent_name: Optional[str] = None) -> int:
+        """Drop every entry, or only those produced by `agent_name`."""
+        if agent_name is None:
+            cur = self._db.execute("DELETE FROM responses")
+        else:
+            cur = self._db.execute("DELETE FROM responses WHERE agent = ?", (agent_name,))
+        self._db.commit()
+        self.stats.invalidations += cur.rowcount
+        return cur.rowcount
+
+    def close(self) -> None:
+        self._db.close()
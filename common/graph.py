@@ -0,0 +1,341 @@
+"""Declarative agent graphs, compiled once into a cached artifact.
+
+An app describes its agents, instructions, tools and handoffs in a TOML
+file instead of wiring them by hand in `main.py`:
+
+    entry = "TriageAgent"
+
+    [tools.get_career_roadmap]
+    function = "career_tools:get_career_roadmap"   # module:attribute, importable from the file's folder
+
+    [agents.TriageAgent]
+    instructions = "..."
+    tools = ["get_career_roadmap"]
+    handoffs = ["CareerAgent", "SkillAgent", "JobAgent"]
+
+The first load compiles the graph: it imports each tool function and lets
+`function_tool` derive its JSON schema, then writes the schemas, the
+instructions and their hashes to `__pycache__/<name>.graph.json`. Later
+starts read only that artifact. Each tool is a stand-in with the cached
+schema; the real tool (Pydantic argument validation, failure handling) is
+built on its first call, so a worker never re-introspects tools it does not
+use. The artifact records the size and mtime of the graph file and of every
+module the tool schemas came from; if any of them changed (and their content
+did too), the graph is compiled again.
+
+    python -m common.graph compile "career mentor agent/agents.toml"
+"""
+import hashlib
+import importlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, get_args, get_type_hints
+
+import agents
+import pydantic
+from agents import Agent, FunctionTool, function_tool
+
+# Bump when the artifact layout changes
+FORMAT = 1
+
+TOOL_OPTIONS = {"function", "name", "description", "failure_error_function", "strict"}
+AGENT_OPTIONS = {"instructions", "handoff_description", "tools", "handoffs"}
+
+
+def _library_versions() -> Dict[str, str]:
+    return {"python": "%d.%d" % sys.version_info[:2], "format": str(FORMAT),
+            "openai-agents": getattr(agents, "__version__", "unknown"), "pydantic": pydantic.VERSION}
+
+
+def _import_attr(ref: str, base_dir: str) -> Any:
+    """"module:attr" (or "module:attr.inner"), with `base_dir` importable."""
+    module_name, sep, attr = ref.partition(":")
+    if not sep or not module_name or not attr:
+        raise ValueError(f"Expected 'module:attribute', got {ref!r}")
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
+    obj: Any = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _is_local(path: Optional[str]) -> bool:
+    """Project source, as opposed to the standard library or installed packages."""
+    if not path or not path.endswith(".py"):
+        return False
+    return "site-packages" not in path and not path.startswith(sys.base_prefix) and not path.startswith(sys.prefix)
+
+
+def _type_sources(tp: Any, seen: Set[int], files: Set[str]) -> None:
+    """Source files of the classes in a type annotation, following Pydantic and TypedDict fields."""
+    if id(tp) in seen:
+        return
+    seen.add(id(tp))
+    for arg in get_args(tp):
+        _type_sources(arg, seen, files)
+    module = sys.modules.get(getattr(tp, "__module__", ""), None)
+    if module is None or not isinstance(tp, type):
+        return
+    path = getattr(module, "__file__", None)
+    if _is_local(path):
+        files.add(os.path.abspath(path))
+    hints: Dict[str, Any] = {}
+    try:
+        hints = get_type_hints(tp)
+    except Exception:
+        hints = getattr(tp, "__annotations__", {}) or {}
+    for hint in hints.values():
+        _type_sources(hint, seen, files)
+
+
+def _tool_sources(func: Callable) -> Set[str]:
+    files: Set[str] = set()
+    target = getattr(func, "__wrapped__", func)
+    module = sys.modules.get(getattr(target, "__module__", ""), None)
+    if module is not None and _is_local(getattr(module, "__file__", None)):
+        files.add(os.path.abspath(module.__file__))
+    try:
+        hints = get_type_hints(target)
+    except Exception:
+        hints = {}
+    seen: Set[int] = set()
+    for hint in hints.values():
+        _type_sources(hint, seen, files)
+    return files
+
+
+def _stat(path: str) -> List[Any]:
+    st = os.stat(path)
+    return [path, st.st_mtime_ns, st.st_size]
+
+
+def _digest(paths: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(path.encode("utf-8") + b"\x00")
+        with open(path, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+def _build_tool(spec: Dict[str, Any], base_dir: str) -> FunctionTool:
+    func = _import_attr(spec["function"], base_dir)
+    options: Dict[str, Any] = {"name_override": spec["name"], "strict_mode": spec["strict"]}
+    if spec.get("description_override"):
+        options["description_override"] = spec["description_override"]
+    if spec.get("failure_error_function"):
+        options["failure_error_function"] = _import_attr(spec["failure_error_function"], base_dir)
+    return function_tool(func, **options)
+
+
+def _lazy_tool(spec: Dict[str, Any], base_dir: str) -> FunctionTool:
+    """A tool with the cached schema; the real one is built on the first call."""
+    built: List[FunctionTool] = []
+
+    async def on_invoke_tool(ctx: Any, input: str) -> Any:
+        if not built:
+            built.append(_build_tool(spec, base_dir))
+        return await built[0].on_invoke_tool(ctx, input)
+
+    tool = FunctionTool(name=spec["name"], description=spec["description"],
+                        params_json_schema=spec["params_json_schema"], on_invoke_tool=on_invoke_tool,
+                        strict_json_schema=False)
+    # The cached schema is already strict; set the flag afterwards so the
+    # constructor does not deep-copy and convert it again
+    tool.strict_json_schema = spec["strict"]
+    return tool
+
+
+def _parse(path: str) -> Dict[str, Any]:
+    # Only compiling reads the TOML; warm starts read the JSON artifact
+    import tomllib
+
+    with open(path, "rb") as fh:
+        data = tomllib.load(fh)
+    agents, tools = data.get("agents", {}), data.get("tools", {})
+    if not agents:
+        raise ValueError(f"{path}: no [agents.<name>] tables")
+    entry = data.get("entry", next(iter(agents)))
+    if entry not in agents:
+        raise ValueError(f"{path}: entry agent {entry!r} is not defined")
+    for name, tool in tools.items():
+        unknown = set(tool) - TOOL_OPTIONS
+        if unknown or "function" not in tool:
+            raise ValueError(f"{path}: tool {name!r} needs 'function' and accepts {sorted(TOOL_OPTIONS)}; "
+                             f"got {sorted(tool)}")
+    for name, agent in agents.items():
+        unknown = set(agent) - AGENT_OPTIONS
+        if unknown:
+            raise ValueError(f"{path}: agent {name!r} has unknown keys {sorted(unknown)}")
+        if not isinstance(agent.get("instructions", ""), str):
+            raise ValueError(f"{path}: agent {name!r} instructions must be a string")
+        for tool in agent.get("tools", []):
+            if tool not in tools:
+                raise ValueError(f"{path}: agent {name!r} uses undefined tool {tool!r}")
+        for target in agent.get("handoffs", []):
+            if target not in agents:
+                raise ValueError(f"{path}: agent {name!r} hands off to undefined agent {target!r}")
+    return {"entry": entry, "agents": agents, "tools": tools}
+
+
+def compile_graph(path: str) -> Tuple[Dict[str, Any], Dict[str, FunctionTool]]:
+    """Parse and introspect a graph file: the artifact, and the real tools built on the way."""
+    from common.cache import instructions_hash
+
+    path = os.path.abspath(path)
+    base_dir = os.path.dirname(path)
+    graph = _parse(path)
+    sources = {path}
+    tools: Dict[str, Dict[str, Any]] = {}
+    built: Dict[str, FunctionTool] = {}
+    for key, options in graph["tools"].items():
+        spec = {"function": options["function"], "name": options.get("name", key),
+                "description_override": options.get("description"),
+                "failure_error_function": options.get("failure_error_function"),
+                "strict": options.get("strict", True)}
+        tool = _build_tool(spec, base_dir)
+        spec.update(description=tool.description, params_json_schema=tool.params_json_schema)
+        tools[key], built[key] = spec, tool
+        sources |= _tool_sources(_import_attr(options["function"], base_dir))
+    agents = {}
+    for name, options in graph["agents"].items():
+        instructions = options.get("instructions", "")
+        agents[name] = {
+            "instructions": instructions,
+            "instructions_hash": instructions_hash(SimpleNamespace(instructions=instructions)),
+            "handoff_description": options.get("handoff_description"),
+            "tools": list(options.get("tools", [])),
+            "handoffs": list(options.get("handoffs", [])),
+        }
+    artifact = {
+        "versions": _library_versions(),
+        "sources": [_stat(p) for p in sorted(sources)],
+        "digest": _digest(sources),
+        "entry": graph["entry"],
+        "tools": tools,
+        "agents": agents,
+    }
+    return artifact, built
+
+
+def artifact_path(path: str, cache_dir: Optional[str] = None) -> str:
+    path = os.path.abspath(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir or os.path.join(os.path.dirname(path), "__pycache__"), f"{name}.graph.json")
+
+
+def _fresh(artifact: Dict[str, Any]) -> Optional[bool]:
+    """True if every source is unchanged, False if one changed, None if only their stats did."""
+    if artifact.get("versions") != _library_versions():
+        return False
+    try:
+        if all(_stat(p) == [p, mtime, size] for p, mtime, size in artifact["sources"]):
+            return True
+        # Touched (e.g. a checkout) but maybe not edited: compare contents
+        return None if _digest(p for p, _, _ in artifact["sources"]) == artifact["digest"] else False
+    except OSError:
+        return False
+
+
+def _write(path: str, artifact: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(artifact, fh)
+        os.replace(tmp, path)
+    except OSError:
+        # A read-only install still works; it just compiles on every start
+        pass
+
+
+@dataclass
+class AgentGraph:
+    """Agents built from a graph file, by name."""
+
+    entry: Agent
+    agents: Dict[str, Agent]
+    tools: Dict[str, FunctionTool]
+    instruction_hashes: Dict[str, str]
+    compiled: bool = False  # False when loaded from the cached artifact
+    artifact_path: str = ""
+    sources: List[str] = field(default_factory=list)
+
+
+def load_graph(path: str, model: Any = None, cache_dir: Optional[str] = None,
+               agent_options: Optional[Dict[str, Any]] = None) -> AgentGraph:
+    """Build a graph's agents, from the cached artifact when it is still valid.
+
+    Args:
+        path: The graph's TOML file.
+        model: Model (or model name) given to every agent.
+        cache_dir: Where the artifact lives (default: `__pycache__` next to the file).
+        agent_options: Extra `Agent(...)` keyword arguments for every agent.
+    """
+    path = os.path.abspath(path)
+    base_dir = os.path.dirname(path)
+    cached_at = artifact_path(path, cache_dir)
+    artifact: Optional[Dict[str, Any]] = None
+    built: Dict[str, FunctionTool] = {}
+    try:
+        with open(cached_at, encoding="utf-8") as fh:
+            artifact = json.load(fh)
+        fresh = _fresh(artifact)
+        if fresh is None:
+            artifact["sources"] = [_stat(p) for p, _, _ in artifact["sources"]]
+            _write(cached_at, artifact)
+        elif not fresh:
+            artifact = None
+    except (OSError, ValueError, KeyError, TypeError):
+        artifact = None
+    compiled = artifact is None
+    if compiled:
+        artifact, built = compile_graph(path)
+        _write(cached_at, artifact)
+
+    tools = {key: built.get(key) or _lazy_tool(spec, base_dir) for key, spec in artifact["tools"].items()}
+    options = {"model": model, **(agent_options or {})} if model is not None else dict(agent_options or {})
+    agents = {
+        name: Agent(name=name, instructions=spec["instructions"], handoff_description=spec["handoff_description"],
+                    tools=[tools[t] for t in spec["tools"]], **options)
+        for name, spec in artifact["agents"].items()
+    }
+    # Handoffs may point at agents defined later (or at each other)
+    for name, spec in artifact["agents"].items():
+        agents[name].handoffs = [agents[target] for target in spec["handoffs"]]
+    return AgentGraph(
+        entry=agents[artifact["entry"]],
+        agents=agents,
+        tools=tools,
+        instruction_hashes={name: spec["instructions_hash"] for name, spec in artifact["agents"].items()},
+        compiled=compiled,
+        artifact_path=cached_at,
+        sources=[p for p, _, _ in artifact["sources"]],
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) != 2 or args[0] not in ("compile", "show"):
+        print("usage: python -m common.graph compile|show GRAPH.toml")
+        raise SystemExit(2)
+    if args[0] == "compile":
+        artifact, _ = compile_graph(args[1])
+        _write(artifact_path(args[1]), artifact)
+        print(f"Compiled {len(artifact['agents'])} agents and {len(artifact['tools'])} tools "
+              f"-> {artifact_path(args[1])}")
+        return
+    graph = load_graph(args[1])
+    print(f"{'compiled' if graph.compiled else 'cached'}: {graph.artifact_path}")
+    for name, agent in graph.agents.items():
+        marker = "*" if agent is graph.entry else " "
+        print(f"{marker} {name:<24} {graph.instruction_hashes[name]}  tools={[t.name for t in agent.tools]}  "
+              f"handoffs={[a.name for a in agent.handoffs]}")
+
+
+if __name__ == "__main__":
+    main()
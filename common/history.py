@@ -0,0 +1,244 @@
+"""Bounded, token-aware conversation history for the Runner loops.
+
+Instead of resending the whole transcript on every turn, `HistoryManager`
+keeps a sliding window of recent turns that fits a token budget and folds
+older turns into a rolling summary. The summary is only extended when a turn
+falls out of the window, so it is never recomputed from scratch.
+
+    history = HistoryManager(token_budget=4000)
+    items = history.start_turn(user_input)
+    result = await Runner.run(agent, items)
+    history.finish_turn(result.to_input_list())
+
+With a `SessionStore` (common/sessions.py) each finished turn is appended to
+the store and the summary is saved when it changes, so
+`HistoryManager.resume(store, session_id)` rebuilds the session from the
+summary plus the unsummarized turns only.
+"""
+import json
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from common.sessions import SessionStore
+
+# Rough chars-per-token ratio; good enough for budgeting, no tokenizer needed
+CHARS_PER_TOKEN = 4
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def item_text(item: Any) -> str:
+    """Plain text of a message item, ignoring tool calls and other items."""
+    if not isinstance(item, dict):
+        return ""
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+# Length of '{"role": "", "content": ""}', the JSON around a plain text message
+_MESSAGE_OVERHEAD = 27
+# Characters json.dumps escapes with one extra byte; other control characters take the slow path
+_ESCAPED = ('"', "\\", "\n", "\r", "\t")
+_OTHER_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def item_bytes(item: Any) -> int:
+    """Size of an item as UTF-8 JSON."""
+    # Plain text messages are most of any history: count them without serializing
+    if type(item) is dict and len(item) == 2:
+        role, content = item.get("role"), item.get("content")
+        if isinstance(role, str) and isinstance(content, str) and not _OTHER_CONTROL.search(content):
+            escapes = sum(content.count(ch) for ch in _ESCAPED)
+            return _MESSAGE_OVERHEAD + len(role.encode("utf-8")) + len(content.encode("utf-8")) + escapes
+    return len(json.dumps(item, default=str, ensure_ascii=False).encode("utf-8"))
+
+
+def estimate_tokens(item: Any) -> int:
+    """Approximate token count of one input item."""
+    return max(1, item_bytes(item) // CHARS_PER_TOKEN)
+
+
+def default_summarizer(previous: str, turn: List[Dict[str, Any]], max_chars: int) -> str:
+    """Fold one evicted turn into the running summary without a model call.
+
+    Keeps the user's message and the last assistant reply (tool calls are
+    dropped), trimmed, and keeps only the newest `max_chars` of the summary.
+    """
+    user = next((item_text(i) for i in turn if isinstance(i, dict) and i.get("role") == "user"), "")
+    reply = next((item_text(i) for i in reversed(turn) if isinstance(i, dict) and i.get("role") == "assistant"), "")
+    line = f"- User: {user[:200]}"
+    if reply:
+        line += f" | Assistant: {reply[:300]}"
+    summary = f"{previous}\n{line}" if previous else line
+    if len(summary) > max_chars:
+        summary = summary[-max_chars:]
+        summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+    return summary
+
+
+@dataclass
+class Turn:
+    items: List[Dict[str, Any]]
+    tokens: int
+    nbytes: int
+
+    @classmethod
+    def from_items(cls, items: List[Dict[str, Any]]) -> "Turn":
+        sizes = [item_bytes(i) for i in items]
+        return cls(items=items, tokens=sum(max(1, b // CHARS_PER_TOKEN) for b in sizes), nbytes=sum(sizes))
+
+
+@dataclass
+class TurnStats:
+    turn: int
+    items_sent: int
+    bytes_sent: int
+    tokens_sent: int
+    window_turns: int
+    summarized_turns: int
+
+
+@dataclass
+class HistoryManager:
+    """Sliding window of recent turns plus a cached rolling summary.
+
+    Args:
+        token_budget: Max estimated tokens sent per turn (window + summary + new input).
+        summary_tokens: Share of the budget reserved for the rolling summary; 0 drops
+            evicted turns instead of summarizing them.
+        min_turns: Recent turns always kept, even if they exceed the budget.
+        summarizer: `(previous_summary, evicted_turn_items, max_chars) -> str`.
+        store: Optional `SessionStore` that every finished turn is appended to.
+        session_id: Key of this conversation in `store`.
+        stats_window: Recent turns kept in `stats`; `turns_started`, `bytes_sent` and
+            `tokens_sent` total the whole session, so long sessions don't grow memory.
+    """
+
+    token_budget: int = 4000
+    summary_tokens: int = 500
+    min_turns: int = 1
+    summarizer: Callable[[str, List[Dict[str, Any]], int], str] = default_summarizer
+    turns: Deque[Turn] = field(default_factory=deque)
+    summary: str = ""
+    summarized_turns: int = 0
+    stats: Deque[TurnStats] = field(default_factory=deque)
+    store: Optional[SessionStore] = field(default=None, repr=False)
+    session_id: str = ""
+    stats_window: int = 100
+    turns_started: int = 0
+    bytes_sent: int = 0
+    tokens_sent: int = 0
+    _pending: Optional[List[Dict[str, Any]]] = field(default=None, repr=False)
+    _summary_item: Optional[Dict[str, Any]] = field(default=None, repr=False)
+    # Window items, tokens and bytes kept up to date as turns enter and leave,
+    # so a turn never re-walks or re-measures the window
+    _prefix: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    _tokens: int = field(default=0, repr=False)
+    _bytes: int = field(default=0, repr=False)
+    _summary_bytes: int = field(default=0, repr=False)
+
+    def __post_init__(self) -> None:
+        self.stats = deque(self.stats, maxlen=self.stats_window)
+
+    def _push(self, turn: Turn) -> None:
+        self.turns.append(turn)
+        self._prefix.extend(turn.items)
+        self._tokens += turn.tokens
+        self._bytes += turn.nbytes
+
+    def _pop(self) -> Turn:
+        oldest = self.turns.popleft()
+        del self._prefix[:len(oldest.items)]
+        self._tokens -= oldest.tokens
+        self._bytes -= oldest.nbytes
+        return oldest
+
+    @classmethod
+    def resume(cls, store: SessionStore, session_id: str, **kwargs: Any) -> "HistoryManager":
+        """Rebuild a stored session: the saved summary plus the turns it doesn't cover."""
+        history = cls(store=store, session_id=session_id, **kwargs)
+        saved = store.load_state(session_id, "history", {})
+        history.summary = saved.get("summary", "")
+        history.summarized_turns = saved.get("summarized_turns", 0)
+        for items in store.load_turns(session_id, history.summarized_turns):
+            history._push(Turn.from_items(items))
+        return history
+
+    def _slide(self, incoming_tokens: int) -> None:
+        """Evict the oldest turns into the summary until everything fits."""
+        budget = self.token_budget - incoming_tokens - (self.summary_tokens if self.summary else 0)
+        moved = False
+        while len(self.turns) > self.min_turns and self._tokens > budget:
+            oldest = self._pop()
+            if self.summary_tokens > 0:
+                self.summary = self.summarizer(self.summary, oldest.items, self.summary_tokens * CHARS_PER_TOKEN)
+            self.summarized_turns += 1
+            moved = True
+            # The summary now takes its share of the budget
+            budget = self.token_budget - incoming_tokens - self.summary_tokens
+        if not self.summary:
+            # Nothing summarized (or summary_tokens=0): send no summary message at all
+            self._summary_item, self._summary_bytes = None, 0
+        elif moved or self._summary_item is None:
+            self._summary_item = {"role": "system", "content": SUMMARY_PREFIX + self.summary}
+            self._summary_bytes = item_bytes(self._summary_item)
+        if moved and self.store is not None:
+            self.store.save_state(self.session_id, "history",
+                                  {"summary": self.summary, "summarized_turns": self.summarized_turns})
+
+    def start_turn(self, user_input: str) -> List[Dict[str, Any]]:
+        """Return the input list to pass to `Runner.run` for this turn."""
+        new_item = {"role": "user", "content": user_input}
+        new_bytes = item_bytes(new_item)
+        self._slide(max(1, new_bytes // CHARS_PER_TOKEN))
+
+        # The window prefix is maintained incrementally; only the copy is per turn
+        items = [self._summary_item] if self._summary_item is not None else []
+        items += self._prefix
+        items.append(new_item)
+        self._pending = items
+
+        sent_bytes = new_bytes + self._bytes + self._summary_bytes
+        self.turns_started += 1
+        self.bytes_sent += sent_bytes
+        self.tokens_sent += sent_bytes // CHARS_PER_TOKEN
+        self.stats.append(TurnStats(
+            turn=self.turns_started,
+            items_sent=len(items),
+            bytes_sent=sent_bytes,
+            tokens_sent=sent_bytes // CHARS_PER_TOKEN,
+            window_turns=len(self.turns),
+            summarized_turns=self.summarized_turns,
+        ))
+        return items
+
+    def finish_turn(self, full_input_list: List[Dict[str, Any]]) -> None:
+        """Record the turn from `result.to_input_list()`.
+
+        Only the items added this turn (the user message onward) are kept;
+        the summary and window items that were sent are already stored.
+        """
+        if self._pending is None:
+            raise RuntimeError("finish_turn() called without start_turn()")
+        new_items = list(full_input_list[len(self._pending) - 1:])
+        self._pending = None
+        self._push(Turn.from_items(new_items))
+        if self.store is not None:
+            self.store.append_turn(self.session_id, new_items)
+
+    def cancel_turn(self) -> None:
+        """Drop the pending turn, e.g. after the run raised an error."""
+        self._pending = None
+
+    def report(self) -> str:
+        """One-line summary of what the last turn sent."""
+        if not self.stats:
+            return "history: no turns yet"
+        s = self.stats[-1]
+        return (f"history: turn={s.turn} items={s.items_sent} bytes={s.bytes_sent} "
+                f"~tokens={s.tokens_sent} window={s.window_turns} summarized={s.summarized_turns}")
@@ -0,0 +1,324 @@
+"""Run CPU-bound tools and pipeline stages off the event loop.
+
+All sessions share one asyncio loop, so a stage that computes for 50 ms
+stalls every other session for 50 ms. A function declared with `@cpu_bound`
+runs in a thread or process pool instead and is awaited:
+
+    @function_tool
+    @cpu_bound(pool="process")
+    def parse_fares(payload: bytes) -> str: ...
+
+    options = await offload(search.cheapest, start, end, n, pool="thread")
+
+- "thread": nothing is copied, and the loop still gets the GIL every switch
+  interval, so it suits NumPy (which releases the GIL) and short Python work.
+  Calls into one long C routine that holds the GIL (e.g. Pydantic validation)
+  still stall the loop.
+- "process": real parallelism for pure-Python and Pydantic work. Arguments
+  and results are pickled, except large top-level bytes, str and NumPy
+  arrays, which go through shared memory instead. Functions must be module
+  level and take plain arguments, not the run context.
+
+Settings: OFFLOAD_PROCESSES (default: CPU count), OFFLOAD_THREADS (default 4),
+OFFLOAD_SHM_BYTES (smallest payload sent through shared memory, default
+1 MiB). OFFLOAD=off runs everything inline, as before.
+"""
+import asyncio
+import functools
+import importlib
+import importlib.util
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+POOLS = ("process", "thread", "inline")
+
+# Functions declared with @cpu_bound, by (file, qualname), so a worker can find
+# them even when the module attribute is a wrapper (or a FunctionTool)
+_REGISTRY: Dict[Tuple[str, str], Callable] = {}
+
+
+class _Target(NamedTuple):
+    module: str
+    filename: str
+    qualname: str
+
+
+class _Shared(NamedTuple):
+    """A payload left in a shared memory block; only its name crosses the pipe."""
+
+    name: str
+    kind: str  # "bytes", "str" or "ndarray"
+    size: int
+    dtype: str = ""
+    shape: Tuple[int, ...] = ()
+
+
+def _register(fn: Callable) -> _Target:
+    target = _Target(fn.__module__, fn.__code__.co_filename, fn.__qualname__)
+    _REGISTRY[(target.filename, target.qualname)] = fn
+    return target
+
+
+def _resolve(target: _Target) -> Callable:
+    key = (target.filename, target.qualname)
+    if key not in _REGISTRY:
+        # A spawned worker: import the defining module so its decorators run.
+        # App modules loaded by file (common.apps) are loaded the same way here.
+        try:
+            importlib.import_module(target.module)
+        except ImportError:
+            spec = importlib.util.spec_from_file_location(target.module, target.filename)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[target.module] = module
+            spec.loader.exec_module(module)
+    return _REGISTRY[key]
+
+
+def _export(value: Any, threshold: int, blocks: List[SharedMemory]) -> Any:
+    """`value`, or a `_Shared` reference if it is a large bytes, str or array."""
+    dtype, shape = "", ()
+    if isinstance(value, str):
+        if len(value) < threshold:
+            return value
+        data, kind = value.encode("utf-8"), "str"
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data, kind = memoryview(value).cast("B"), "bytes"
+    elif type(value).__module__ == "numpy" and hasattr(value, "dtype") and not value.dtype.hasobject:
+        import numpy as np
+
+        value = np.ascontiguousarray(value)
+        data, kind, dtype, shape = memoryview(value).cast("B"), "ndarray", value.dtype.str, value.shape
+    else:
+        return value
+    if len(data) < threshold:
+        return value
+    shm = SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    blocks.append(shm)
+    return _Shared(shm.name, kind, len(data), dtype, shape)
+
+
+def _import(ref: _Shared, blocks: List[SharedMemory], copy: bool) -> Any:
+    """The payload behind `ref`; arrays are views into the block unless `copy`."""
+    shm = SharedMemory(name=ref.name)
+    blocks.append(shm)
+    if ref.kind == "bytes":
+        return bytes(shm.buf[:ref.size])
+    if ref.kind == "str":
+        return bytes(shm.buf[:ref.size]).decode("utf-8")
+    import numpy as np
+
+    array = np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=shm.buf)
+    return array.copy() if copy else array
+
+
+def _close(blocks: List[SharedMemory], unlink: bool) -> None:
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # The function kept a view of its input; the mapping goes when that does
+            pass
+        if unlink:
+            shm.unlink()
+
+
+def _finish(sent: List[SharedMemory], received: Dict[str, Any], future: Any) -> None:
+    """Done-callback of a process call: unlink its blocks whether or not anyone still awaits it.
+
+    Input blocks are unlinked only now, once the worker is done with them. A
+    shared result is copied into `received` (or the error reading it) and
+    its block unlinked; a cancelled caller just never picks the copy up.
+    """
+    _close(sent, unlink=True)
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if not isinstance(result, _Shared):
+        return
+    blocks: List[SharedMemory] = []
+    try:
+        received[result.name] = _import(result, blocks, copy=True)
+    except Exception as e:
+        received[result.name] = e
+    finally:
+        _close(blocks, unlink=True)
+
+
+def _invoke(fn: Any, args: tuple, kwargs: Dict[str, Any], threshold: int) -> Any:
+    """Worker side of a process call: map shared inputs, call, share a large result."""
+    fn = _resolve(fn) if isinstance(fn, _Target) else fn
+    attached: List[SharedMemory] = []
+    try:
+        args = tuple(_import(a, attached, copy=False) if isinstance(a, _Shared) else a for a in args)
+        kwargs = {k: _import(v, attached, copy=False) if isinstance(v, _Shared) else v for k, v in kwargs.items()}
+        result = fn(*args, **kwargs)
+        del args, kwargs
+        created: List[SharedMemory] = []
+        shared = _export(result, threshold, created)
+        # The caller's done-callback unlinks result blocks once it has read them
+        _close(created, unlink=False)
+        return shared
+    finally:
+        _close(attached, unlink=False)
+
+
+@dataclass
+class OffloadStats:
+    """Calls and time per pool, and bytes moved through shared memory."""
+
+    calls: Counter = field(default_factory=Counter)
+    seconds: Counter = field(default_factory=Counter)
+    shm_bytes: int = 0
+
+    def record(self, pool: str, seconds: float) -> None:
+        self.calls[pool] += 1
+        self.seconds[pool] += seconds
+
+    def report(self) -> str:
+        parts = [f"{pool} {n} calls (avg {self.seconds[pool] / n * 1000:.1f}ms)" for pool, n in self.calls.items()]
+        return f"offload: {', '.join(parts) or 'no calls'}; {self.shm_bytes / 1e6:.1f}MB via shared memory"
+
+
+class Offloader:
+    """Thread and process pools for CPU-bound work, created on first use.
+
+    Args:
+        processes: Process pool size.
+        threads: Thread pool size.
+        shm_threshold: Smallest bytes/str/array payload (in bytes) sent to a
+            process through shared memory instead of the pipe.
+        enabled: False runs every call inline on the loop.
+    """
+
+    def __init__(self, processes: Optional[int] = None, threads: int = 4, shm_threshold: int = 1 << 20,
+                 enabled: bool = True) -> None:
+        self.processes = processes or os.cpu_count() or 1
+        self.threads = threads
+        self.shm_threshold = shm_threshold
+        self.enabled = enabled
+        self.stats = OffloadStats()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+
+    def _processes(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.processes)
+        return self._process_pool
+
+    def _threads(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="offload")
+        return self._thread_pool
+
+    async def run(self, fn: Callable, *args: Any, pool: str = "process", **kwargs: Any) -> Any:
+        """Call `fn(*args, **kwargs)` in `pool` ("process", "thread" or "inline") and await the result."""
+        if pool not in POOLS:
+            raise ValueError(f"Unknown pool {pool!r}; expected one of {POOLS}")
+        if not self.enabled:
+            pool = "inline"
+        started = time.perf_counter()
+        try:
+            if pool == "inline":
+                return fn(*args, **kwargs)
+            loop = asyncio.get_running_loop()
+            if pool == "thread":
+                return await loop.run_in_executor(self._threads(), functools.partial(fn, *args, **kwargs))
+            return await self._run_in_process(loop, fn, args, kwargs)
+        finally:
+            self.stats.record(pool, time.perf_counter() - started)
+
+    async def _run_in_process(self, loop: asyncio.AbstractEventLoop, fn: Callable, args: tuple,
+                              kwargs: Dict[str, Any]) -> Any:
+        code = getattr(fn, "__code__", None)
+        target: Any = fn
+        if code is not None and _REGISTRY.get((code.co_filename, fn.__qualname__)) is fn:
+            target = _Target(fn.__module__, code.co_filename, fn.__qualname__)
+        sent: List[SharedMemory] = []
+        try:
+            args = tuple(_export(a, self.shm_threshold, sent) for a in args)
+            kwargs = {k: _export(v, self.shm_threshold, sent) for k, v in kwargs.items()}
+            future = self._processes().submit(_invoke, target, args, kwargs, self.shm_threshold)
+        except BaseException as e:
+            _close(sent, unlink=True)
+            if isinstance(e, BrokenProcessPool):
+                self._process_pool = None
+            raise
+        self.stats.shm_bytes += sum(shm.size for shm in sent)
+        received: Dict[str, Any] = {}
+        # Runs when the worker finishes, even if this caller was cancelled meanwhile
+        future.add_done_callback(functools.partial(_finish, sent, received))
+        try:
+            result = await asyncio.wrap_future(future, loop=loop)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool next time
+            self._process_pool = None
+            raise
+        if isinstance(result, _Shared):
+            self.stats.shm_bytes += result.size
+            value = received.pop(result.name)
+            if isinstance(value, BaseException):
+                raise value
+            return value
+        return result
+
+    def close(self) -> None:
+        for executor in (self._process_pool, self._thread_pool):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        self._process_pool = self._thread_pool = None
+
+
+def offloader_from_env() -> Offloader:
+    """An `Offloader` configured by OFFLOAD, OFFLOAD_PROCESSES, OFFLOAD_THREADS and OFFLOAD_SHM_BYTES."""
+    return Offloader(
+        processes=int(os.getenv("OFFLOAD_PROCESSES", "0")) or None,
+        threads=int(os.getenv("OFFLOAD_THREADS", "4")),
+        shm_threshold=int(os.getenv("OFFLOAD_SHM_BYTES", str(1 << 20))),
+        enabled=os.getenv("OFFLOAD", "on").lower() not in ("off", "0", "false", "no"),
+    )
+
+
+_default: Optional[Offloader] = None
+
+
+def get_offloader() -> Offloader:
+    """The process-wide `Offloader`, built from the environment on first use."""
+    global _default
+    if _default is None:
+        _default = offloader_from_env()
+    return _default
+
+
+async def offload(fn: Callable, *args: Any, pool: str = "process", **kwargs: Any) -> Any:
+    """`get_offloader().run(...)`: call `fn` in a pool and await the result."""
+    return await get_offloader().run(fn, *args, pool=pool, **kwargs)
+
+
+def cpu_bound(fn: Optional[Callable] = None, *, pool: str = "process") -> Callable:
+    """Declare a sync function CPU-bound: calling it returns an awaitable run in `pool`.
+
+    The wrapper keeps the signature and docstring, so `@function_tool` can
+    sit on top of it.
+    """
+    if pool not in POOLS:
+        raise ValueError(f"Unknown pool {pool!r}; expected one of {POOLS}")
+
+    def decorate(func: Callable) -> Callable:
+        _register(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await get_offloader().run(func, *args, pool=pool, **kwargs)
+
+        wrapper.pool = pool
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
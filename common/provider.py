@@ -0,0 +1,118 @@
+"""Shared, lazily-built Gemini client and model for all agent apps.
+
+Every app used to build its own `AsyncOpenAI` client at import time. Here the
+client is created on the first model call and reused by every agent and
+session in the process, over one pooled HTTP connection pool.
+
+    model = lazy_model("gemini-2.0-flash")
+    agent = Agent(name="...", instructions="...", model=model)
+
+Pool settings come from the environment:
+
+    GEMINI_MAX_CONNECTIONS    (default 100)
+    GEMINI_MAX_KEEPALIVE      (default 20)
+    GEMINI_KEEPALIVE_EXPIRY   seconds (default 30)
+    GEMINI_BASE_URL           endpoint override, e.g. a local stub server
+
+Models are wrapped in the process-wide rate limiter (common/ratelimit.py,
+GEMINI_RPS / GEMINI_TPM), which also owns retries, so the client's own
+retries are turned off.
+"""
+import os
+from typing import Any, Dict, Optional
+
+from agents import Model
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+_client = None
+_models: Dict[str, Model] = {}
+
+
+def api_key_configured() -> bool:
+    return bool(os.getenv("GEMINI_API_KEY"))
+
+
+def get_client():
+    """Return the process-wide `AsyncOpenAI` client, building it on first use."""
+    global _client
+    if _client is None:
+        # Heavy imports are deferred until a model call actually needs them
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("Error: GEMINI_API_KEY not found in .env file.")
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("GEMINI_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("GEMINI_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "30")),
+        )
+        _client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=os.getenv("GEMINI_BASE_URL", GEMINI_BASE_URL),
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+            # Retries are left to the rate limiter, which also sees the 429s
+            max_retries=0,
+        )
+    return _client
+
+
+def get_model(name: str = DEFAULT_MODEL) -> Model:
+    """Return the rate-limited chat-completions model for `name`, sharing the pooled client."""
+    model = _models.get(name)
+    if model is None:
+        from agents import OpenAIChatCompletionsModel
+
+        from common.ratelimit import RateLimitedModel, scheduler_from_env
+
+        model = RateLimitedModel(OpenAIChatCompletionsModel(model=name, openai_client=get_client()),
+                                 scheduler_from_env())
+        _models[name] = model
+    return model
+
+
+class LazyModel(Model):
+    """Placeholder model that resolves to `get_model(name)` on the first call.
+
+    Lets agents be declared at import time without building a client, so
+    importing an app (for tests, tooling or `--help`) stays cheap.
+    """
+
+    def __init__(self, name: str = DEFAULT_MODEL) -> None:
+        self.name = name
+        self._inner: Optional[Model] = None
+
+    @property
+    def inner(self) -> Model:
+        if self._inner is None:
+            self._inner = get_model(self.name)
+        return self._inner
+
+    async def get_response(self, *args: Any, **kwargs: Any):
+        return await self.inner.get_response(*args, **kwargs)
+
+    def stream_response(self, *args: Any, **kwargs: Any):
+        return self.inner.stream_response(*args, **kwargs)
+
+    def get_retry_advice(self, request: Any):
+        return self.inner.get_retry_advice(request) if self._inner is not None else None
+
+    def __repr__(self) -> str:
+        state = "ready" if self._inner is not None else "lazy"
+        return f"LazyModel({self.name!r}, {state})"
+
+
+def lazy_model(name: str = DEFAULT_MODEL) -> LazyModel:
+    return LazyModel(name)
+
+
+async def aclose() -> None:
+    """Close the shared connection pool (call once on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _models.clear()
@@ -0,0 +1,356 @@
+"""Client-side rate limiting for the shared Gemini client.
+
+Every model call in the process goes through one `RequestScheduler` before it
+reaches the provider:
+
+- Two token buckets: requests per second and tokens per minute. A call
+  reserves its estimated prompt + output tokens up front; the estimate is
+  corrected from the reported usage when the response arrives.
+- AIMD on the request rate: a 429 cuts it by 30% and pauses new calls for the
+  Retry-After time. Only 429s for calls granted after the last cut count, so
+  one burst of 429s cuts the rate once. Each success adds back a little,
+  about `increase` rps per second at full rate.
+- Priorities: waiting calls are served lowest `request_priority` first, so
+  interactive turns (`INTERACTIVE`, the default) go ahead of batch turns
+  (`BATCH`, set by common/batch.py).
+
+`RateLimitedModel` wraps a model with the scheduler. It retries rate limits
+and other transient errors itself, so a 429 delays a turn instead of failing
+it. Identical `get_response` calls already in flight (same instructions,
+input, settings and tools) share one upstream call. Streamed calls are limited
+and retried up to their first event, but not coalesced.
+
+Limits come from the environment (see `scheduler_from_env()`):
+
+    GEMINI_RPS   requests per second (default 10)
+    GEMINI_TPM   tokens per minute (default 1000000)
+"""
+import asyncio
+import contextvars
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from agents import Model
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+INTERACTIVE = 0
+BATCH = 10
+
+# Priority of model calls made from the current task (lower is served first)
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+# Rough chars-per-token ratio, as in common/history.py
+CHARS_PER_TOKEN = 4
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Errors worth retrying: rate limits, timeouts, dropped connections and 5xx."""
+    if isinstance(exc, (RateLimitError, APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+def retry_after(exc: Optional[BaseException]) -> Optional[float]:
+    """The Retry-After delay a provider error asked for, in seconds."""
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, exc: Optional[BaseException] = None) -> float:
+    """Seconds to wait before retry `attempt` (1-based): full-jitter exponential backoff."""
+    asked = retry_after(exc)
+    if asked is not None:
+        return min(cap, asked)
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class TokenBucket:
+    """`rate` units per second, bursting up to `capacity`. The level may go
+    negative when a reservation turns out too small; later calls then wait."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if missing > 0 else 0.0
+
+
+@dataclass
+class SchedulerStats:
+    calls: int = 0
+    upstream_calls: int = 0
+    coalesced: int = 0
+    throttled: int = 0  # 429 responses
+    retries: int = 0
+    failed: int = 0
+    waited: float = 0.0  # total seconds spent queued
+
+    def report(self, rate: float) -> str:
+        mean_wait = self.waited / self.calls * 1000 if self.calls else 0.0
+        return (f"Rate limiter: {self.calls} calls, {self.upstream_calls} upstream, {self.coalesced} coalesced, "
+                f"{self.throttled} throttled (429), {self.retries} retries, {self.failed} failed, "
+                f"mean queue wait {mean_wait:.0f}ms, current limit {rate:.2f} rps")
+
+
+class RequestScheduler:
+    """Grants model calls under RPS and TPM budgets, in priority order.
+
+    Args:
+        rps: Starting and maximum requests per second.
+        tpm: Tokens per minute.
+        min_rps: Floor for the adaptive request rate.
+        decrease: Factor applied to the request rate on a 429.
+        increase: Requests per second regained per second of successful traffic.
+    """
+
+    def __init__(self, rps: float = 10.0, tpm: float = 1_000_000, min_rps: float = 0.1,
+                 decrease: float = 0.7, increase: float = 2.0) -> None:
+        self.max_rps = rps
+        self.min_rps = min_rps
+        self.decrease = decrease
+        self.increase = increase
+        self.requests = TokenBucket(rps, max(1.0, rps))
+        self.tokens = TokenBucket(tpm / 60.0, tpm)
+        self.stats = SchedulerStats()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        # Waiting calls: [priority, seq, future]; the head polls the buckets, the rest sleep
+        self._waiters: List[List[Any]] = []
+        self._seq = itertools.count()
+
+    @property
+    def rps(self) -> float:
+        return self.requests.rate
+
+    def _try_take(self, tokens: float) -> float:
+        """Take one request and `tokens` if both are available; else seconds to wait."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        if wait == 0.0:
+            self.requests.level -= 1
+            self.tokens.level -= tokens
+        return wait
+
+    def _set_rate(self, rate: float) -> None:
+        self.requests.rate = rate
+        # Bursts of up to one second's worth of requests at the current rate
+        self.requests.capacity = max(1.0, rate)
+        self.requests.level = min(self.requests.level, self.requests.capacity)
+
+    def _wake_head(self) -> None:
+        if self._waiters and not self._waiters[0][2].done():
+            self._waiters[0][2].set_result(None)
+
+    async def acquire(self, tokens: float, priority: Optional[int] = None) -> float:
+        """Wait for a request slot and `tokens` of the per-minute budget; returns the grant time."""
+        priority = request_priority.get() if priority is None else priority
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        entry = [priority, next(self._seq), loop.create_future()]
+        heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                if self._waiters[0] is entry:
+                    wait = self._try_take(tokens)
+                    if wait == 0.0:
+                        heapq.heappop(self._waiters)
+                        self._wake_head()
+                        break
+                    # Sleep until the budget allows it; a 429 or a cancelled waiter wakes us to re-check
+                    entry[2] = loop.create_future()
+                    try:
+                        await asyncio.wait_for(entry[2], wait)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    if entry[2].done():
+                        entry[2] = loop.create_future()
+                    await entry[2]
+        except BaseException:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._wake_head()
+            raise
+        finally:
+            self.stats.waited += time.monotonic() - started
+        return time.monotonic()
+
+    def settle(self, reserved: float, used: Optional[int]) -> None:
+        """Correct the token reservation once the actual usage is known."""
+        if used:
+            self.tokens.level -= used - reserved
+
+    def on_success(self) -> None:
+        rate = self.requests.rate
+        # Additive increase, spread over the calls in a second
+        if rate < self.max_rps:
+            self._set_rate(min(self.max_rps, rate + self.increase / max(rate, 1.0)))
+
+    def on_throttle(self, delay: Optional[float] = None, granted_at: Optional[float] = None) -> None:
+        """Back off after a 429: cut the request rate and pause new calls briefly.
+
+        `granted_at` is when the throttled call was let through; calls granted
+        before the last cut were sent at the old rate and don't cut it again.
+        """
+        now = time.monotonic()
+        self.stats.throttled += 1
+        if granted_at is None or granted_at >= self._last_decrease:
+            self._set_rate(max(self.min_rps, self.requests.rate * self.decrease))
+            self._last_decrease = now
+        self.requests.level = min(self.requests.level, 0.0)
+        self._paused_until = max(self._paused_until, now + (delay if delay is not None else 1.0 / self.requests.rate))
+        # Let the head re-check after the pause
+        self._wake_head()
+
+    def report(self) -> str:
+        return self.stats.report(self.rps)
+
+
+def call_key(system_instructions: Optional[str], input: Any, model_settings: Any, tools: Any,
+             output_schema: Any, handoffs: Any, extra: Dict[str, Any]) -> str:
+    """Identity of a model call, for coalescing identical in-flight requests."""
+    settings = model_settings.to_json_dict() if hasattr(model_settings, "to_json_dict") else model_settings
+    raw = json.dumps([
+        system_instructions,
+        input,
+        settings,
+        [getattr(t, "name", str(t)) for t in tools or ()],
+        output_schema.name() if output_schema is not None else None,
+        [getattr(h, "tool_name", str(h)) for h in handoffs or ()],
+        extra,
+    ], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(system_instructions: Optional[str], input: Any, output_tokens: int) -> int:
+    chars = len(system_instructions or "")
+    chars += len(input) if isinstance(input, str) else len(json.dumps(input, default=str))
+    return chars // CHARS_PER_TOKEN + output_tokens
+
+
+class RateLimitedModel(Model):
+    """Wraps a model so every call is scheduled, retried on transient errors and coalesced.
+
+    Args:
+        inner: The model making the actual calls.
+        scheduler: Shared `RequestScheduler`.
+        max_retries: Retries per call for 429s and other transient errors.
+        output_tokens: Output tokens reserved per call before the real usage is known.
+    """
+
+    def __init__(self, inner: Model, scheduler: RequestScheduler, max_retries: int = 5,
+                 output_tokens: int = 512, backoff_base: float = 0.5, backoff_cap: float = 30.0) -> None:
+        self.inner = inner
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+        self.output_tokens = output_tokens
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    async def _failed(self, exc: BaseException, attempt: int, granted_at: float) -> None:
+        """Record a failed attempt; re-raise unless it should be retried."""
+        stats = self.scheduler.stats
+        if isinstance(exc, RateLimitError):
+            self.scheduler.on_throttle(retry_after(exc), granted_at)
+        if attempt > self.max_retries or not is_transient(exc):
+            stats.failed += 1
+            raise exc
+        stats.retries += 1
+        if not isinstance(exc, RateLimitError):
+            # 429s wait in the scheduler's pause instead
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap, exc))
+
+    async def _call(self, args: tuple, kwargs: dict, priority: int) -> Any:
+        reserved = estimate_tokens(args[0], args[1], self.output_tokens)
+        attempt = 0
+        while True:
+            attempt += 1
+            granted_at = await self.scheduler.acquire(reserved, priority)
+            self.scheduler.stats.upstream_calls += 1
+            try:
+                response = await self.inner.get_response(*args, **kwargs)
+            except Exception as e:
+                await self._failed(e, attempt, granted_at)
+                continue
+            self.scheduler.on_success()
+            self.scheduler.settle(reserved, getattr(response.usage, "total_tokens", None))
+            return response
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                           handoffs, tracing, *args, **kwargs):
+        self.scheduler.stats.calls += 1
+        call = (system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, *args)
+        key = call_key(system_instructions, input, model_settings, tools, output_schema, handoffs, kwargs)
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.scheduler.stats.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._call(call, kwargs, request_priority.get()))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._inflight.pop(key, None)
+                                   if self._inflight.get(key) is t else None)
+        # Shielded, so one caller giving up doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema,
+                              handoffs, tracing, *args, **kwargs):
+        self.scheduler.stats.calls += 1
+        reserved = estimate_tokens(system_instructions, input, self.output_tokens)
+        attempt = 0
+        while True:
+            attempt += 1
+            granted_at = await self.scheduler.acquire(reserved)
+            self.scheduler.stats.upstream_calls += 1
+            started = False
+            try:
+                async for event in self.inner.stream_response(system_instructions, input, model_settings, tools,
+                                                              output_schema, handoffs, tracing, *args, **kwargs):
+                    started = True
+                    yield event
+            except Exception as e:
+                # Once events have been passed on, the call can't be replayed
+                if started:
+                    self.scheduler.stats.failed += 1
+                    raise
+                await self._failed(e, attempt, granted_at)
+                continue
+            self.scheduler.on_success()
+            return
+
+
+_scheduler: Optional[RequestScheduler] = None
+
+
+def scheduler_from_env() -> RequestScheduler:
+    """The process-wide scheduler, configured by GEMINI_RPS and GEMINI_TPM."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RequestScheduler(rps=float(os.getenv("GEMINI_RPS", "10")),
+                                      tpm=float(os.getenv("GEMINI_TPM", "1000000")))
+    return _scheduler
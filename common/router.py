@@ -0,0 +1,252 @@
+"""Local intent pre-router that can skip the triage LLM call.
+
+Each app's entry agent (TriageAgent, the travel designer, the game master)
+spends a model call just deciding which specialist to hand off to. The
+`PreRouter` decides locally first:
+
+1. a keyword/regex rule table per specialist, and
+2. optionally a small TF-IDF + softmax-regression classifier trained offline
+   (`python -m common.router train labeled.jsonl model.json`).
+
+If either is confident the turn starts directly at the specialist; otherwise
+it falls back to the LLM triage agent. `RouterStats` tracks the skipped-call
+rate and the latency saved.
+"""
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+@dataclass
+class RouteDecision:
+    target: Optional[str]
+    confidence: float
+    source: str  # "rules", "classifier" or "fallback"
+
+
+class RuleRouter:
+    """Scores each target by how many of its patterns match the query.
+
+    `rules` are specific phrases; `keywords` are generic words that only
+    hint at a target. A keyword counts half as much as a phrase, so one
+    phrase or two keywords are confident, but a lone keyword is not.
+    """
+
+    def __init__(self, rules: Mapping[str, Sequence[str]],
+                 keywords: Optional[Mapping[str, Sequence[str]]] = None) -> None:
+        self.rules = {target: [(re.compile(p, re.I), 2) for p in patterns] for target, patterns in rules.items()}
+        for target, patterns in (keywords or {}).items():
+            self.rules.setdefault(target, []).extend((re.compile(p, re.I), 1) for p in patterns)
+
+    def classify(self, text: str) -> Tuple[Optional[str], float]:
+        scores = {t: sum(w for p, w in pats if p.search(text)) for t, pats in self.rules.items()}
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        if not ranked or ranked[0][1] == 0:
+            return None, 0.0
+        (top, s1), s2 = ranked[0], (ranked[1][1] if len(ranked) > 1 else 0)
+        if s2 == 0:
+            # Unambiguous: a lone keyword scores 0.75, a phrase or two keywords 0.85, and so on
+            return top, min(0.99, 0.65 + 0.1 * s1)
+        return top, 0.9 * s1 / (s1 + s2)
+
+
+def tokenize(text: str) -> List[str]:
+    words = TOKEN_RE.findall(text.lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfClassifier:
+    """Tiny TF-IDF + multinomial logistic regression, pure Python.
+
+    Meant for short routing queries and a few hundred training examples, so
+    training takes well under a second and the model is a small JSON file.
+    """
+
+    def __init__(self) -> None:
+        self.labels: List[str] = []
+        self.idf: Dict[str, float] = {}
+        self.weights: Dict[str, List[float]] = {}
+        self.bias: List[float] = []
+
+    def _features(self, text: str) -> Dict[str, float]:
+        counts = Counter(t for t in tokenize(text) if t in self.idf)
+        feats = {t: (1 + math.log(c)) * self.idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+        return {t: v / norm for t, v in feats.items()}
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 30,
+            lr: float = 0.5, l2: float = 1e-4, seed: int = 0) -> "TfidfClassifier":
+        self.labels = sorted(set(labels))
+        index = {label: i for i, label in enumerate(self.labels)}
+        doc_freq = Counter(t for text in texts for t in set(tokenize(text)))
+        n = len(texts)
+        self.idf = {t: math.log((1 + n) / (1 + df)) + 1 for t, df in doc_freq.items()}
+        self.weights = {t: [0.0] * len(self.labels) for t in self.idf}
+        self.bias = [0.0] * len(self.labels)
+
+        data = [(self._features(x), index[y]) for x, y in zip(texts, labels)]
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(data)
+            for feats, y in data:
+                probs = self._softmax(feats)
+                for k in range(len(self.labels)):
+                    grad = probs[k] - (1.0 if k == y else 0.0)
+                    self.bias[k] -= lr * grad
+                    for t, v in feats.items():
+                        w = self.weights[t]
+                        w[k] -= lr * (grad * v + l2 * w[k])
+        return self
+
+    def _softmax(self, feats: Dict[str, float]) -> List[float]:
+        logits = list(self.bias)
+        for t, v in feats.items():
+            for k, w in enumerate(self.weights[t]):
+                logits[k] += w * v
+        top = max(logits)
+        exps = [math.exp(z - top) for z in logits]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        feats = self._features(text)
+        if not feats:
+            return None, 0.0
+        probs = self._softmax(feats)
+        k = max(range(len(probs)), key=probs.__getitem__)
+        return self.labels[k], probs[k]
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"labels": self.labels, "idf": self.idf, "weights": self.weights, "bias": self.bias}, fh)
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfClassifier":
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        clf = cls()
+        clf.labels, clf.idf, clf.weights, clf.bias = data["labels"], data["idf"], data["weights"], data["bias"]
+        return clf
+
+
+@dataclass
+class RouterStats:
+    """Skipped triage calls and the turn latency saved by them."""
+
+    fast_path: int = 0
+    fallback: int = 0
+    by_source: Counter = field(default_factory=Counter)
+    fast_seconds: float = 0.0
+    fallback_seconds: float = 0.0
+
+    def record(self, decision: RouteDecision, seconds: float) -> None:
+        self.by_source[decision.source] += 1
+        if decision.source == "fallback":
+            self.fallback += 1
+            self.fallback_seconds += seconds
+        else:
+            self.fast_path += 1
+            self.fast_seconds += seconds
+
+    @property
+    def skipped_rate(self) -> float:
+        total = self.fast_path + self.fallback
+        return self.fast_path / total if total else 0.0
+
+    @property
+    def saved_seconds(self) -> Optional[float]:
+        """Estimated time saved: fast turns x (mean fallback turn - mean fast turn)."""
+        if not self.fast_path or not self.fallback:
+            return None
+        per_turn = self.fallback_seconds / self.fallback - self.fast_seconds / self.fast_path
+        return self.fast_path * per_turn
+
+    def report(self) -> str:
+        saved = self.saved_seconds
+        return (f"router: skipped triage on {self.fast_path}/{self.fast_path + self.fallback} turns "
+                f"({self.skipped_rate:.0%}), est. saved "
+                f"{'-' if saved is None else f'{saved:.1f}s'} ({dict(self.by_source)})")
+
+
+class PreRouter:
+    """Picks the starting agent for a turn, skipping triage when confident.
+
+    Args:
+        agents: Specialist agents the router may start at, keyed by name.
+        rules: Regex patterns per specialist name; one match is enough for the fast path.
+        keywords: Generic regex patterns per specialist name; a lone match is not.
+        classifier: Optional trained `TfidfClassifier`.
+        threshold: Minimum rule confidence for the fast path.
+        classifier_threshold: Minimum classifier probability for the fast path.
+    """
+
+    def __init__(self, agents: Mapping[str, object], rules: Mapping[str, Sequence[str]],
+                 classifier: Optional[TfidfClassifier] = None, threshold: float = 0.8,
+                 classifier_threshold: float = 0.85,
+                 keywords: Optional[Mapping[str, Sequence[str]]] = None) -> None:
+        self.agents = dict(agents)
+        self.rules = RuleRouter(rules, keywords)
+        self.classifier = classifier
+        self.threshold = threshold
+        self.classifier_threshold = classifier_threshold
+        self.stats = RouterStats()
+
+    def decide(self, text: str) -> RouteDecision:
+        target, confidence = self.rules.classify(text)
+        if target in self.agents and confidence >= self.threshold:
+            return RouteDecision(target, confidence, "rules")
+        if self.classifier is not None:
+            label, prob = self.classifier.predict(text)
+            if label in self.agents and prob >= self.classifier_threshold:
+                return RouteDecision(label, prob, "classifier")
+        return RouteDecision(None, confidence, "fallback")
+
+    def pick(self, text: str, default):
+        """Return `(agent, decision)`: the specialist, or `default` (the triage agent)."""
+        decision = self.decide(text)
+        return self.agents.get(decision.target, default), decision
+
+    def timed(self, decision: RouteDecision, started: float) -> None:
+        """Record how long a routed turn took (pass `time.perf_counter()` from before the run)."""
+        self.stats.record(decision, time.perf_counter() - started)
+
+
+def classifier_from_env(var: str = "ROUTER_MODEL_PATH") -> Optional[TfidfClassifier]:
+    """Load the optional trained classifier named by an environment variable."""
+    path = os.getenv(var)
+    return TfidfClassifier.load(path) if path else None
+
+
+def load_labeled(path: str) -> Tuple[List[str], List[str]]:
+    """Read `{"query": ..., "label": ...}` lines."""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                row = json.loads(line)
+                texts.append(row["query"])
+                labels.append(row["label"])
+    return texts, labels
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) != 3 or args[0] != "train":
+        print("usage: python -m common.router train LABELED.jsonl MODEL.json")
+        raise SystemExit(2)
+    texts, labels = load_labeled(args[1])
+    TfidfClassifier().fit(texts, labels).save(args[2])
+    print(f"Trained on {len(texts)} queries, labels={sorted(set(labels))} -> {args[2]}")
+
+
+if __name__ == "__main__":
+    main()
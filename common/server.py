@@ -0,0 +1,311 @@
+"""Asyncio session server hosting the career, travel and game agents.
+
+One process serves many concurrent users. Each session keeps its own bounded
+history and runs one turn at a time; model calls from all sessions share a
+cap on in-flight requests, and waiting calls are granted round-robin across
+sessions so one busy session cannot starve the others.
+
+Run from the repo root:
+
+    python -m common.server --port 8080              # real Gemini model
+    python -m common.server --port 8080 --stub 0.2   # local stub, 200 ms per call
+    python -m common.server --store sqlite:sessions.db  # sessions survive restarts and
+                                                        # resume on any worker
+
+API (JSON over HTTP/1.1, keep-alive supported):
+
+    POST /turn   {"app": "career", "session_id": "u1", "message": "..."}
+    GET  /stats
+    GET  /health
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from agents import Model, RunConfig, Runner
+
+from common.apps import APPS, load_app, load_module, new_context, use_run_config
+from common.history import HistoryManager
+from common.sessions import SessionStore, open_store
+
+# Which session the current model call belongs to (set per turn)
+current_session: contextvars.ContextVar[str] = contextvars.ContextVar("current_session", default="")
+
+
+class FairLimiter:
+    """Caps concurrent holders; waiters are served round-robin by key."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    async def acquire(self, key: str) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed to us just before cancellation; pass it on
+                self.release()
+            else:
+                queue = self._waiters.get(key)
+                if queue is not None and fut in queue:
+                    queue.remove(fut)
+                    if not queue:
+                        del self._waiters[key]
+            raise
+
+    def release(self) -> None:
+        # Hand the slot straight to the next session in round-robin order
+        while self._waiters:
+            key, queue = next(iter(self._waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+
+class LimitedModel(Model):
+    """Wraps a model so every call goes through a shared `FairLimiter`."""
+
+    def __init__(self, inner: Model, limiter: FairLimiter) -> None:
+        self.inner = inner
+        self.limiter = limiter
+
+    async def get_response(self, *args, **kwargs):
+        await self.limiter.acquire(current_session.get())
+        try:
+            return await self.inner.get_response(*args, **kwargs)
+        finally:
+            self.limiter.release()
+
+    async def stream_response(self, *args, **kwargs):
+        await self.limiter.acquire(current_session.get())
+        try:
+            async for event in self.inner.stream_response(*args, **kwargs):
+                yield event
+        finally:
+            self.limiter.release()
+
+
+@dataclass
+class Session:
+    app: str
+    history: HistoryManager
+    context: Any = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+    turns: int = 0
+
+
+class SessionServer:
+    """Holds per-session state and runs turns against the hosted agents."""
+
+    def __init__(self, max_inflight: int = 32, stub_model: Optional[Model] = None,
+                 token_budget: int = 4000, idle_ttl: float = 1800.0,
+                 store: Optional[SessionStore] = None) -> None:
+        self.limiter = FairLimiter(max_inflight)
+        self.token_budget = token_budget
+        self.store = store
+        self.idle_ttl = idle_ttl
+        self.sessions: Dict[Tuple[str, str], Session] = {}
+        self.agents: Dict[str, Any] = {}
+        self.run_configs: Dict[str, RunConfig] = {}
+        for name in APPS:
+            self.agents[name] = load_app(name)
+            inner = stub_model if stub_model is not None else load_module(name).model
+            self.run_configs[name] = RunConfig(model=LimitedModel(inner, self.limiter))
+        self.completed_turns = 0
+        self.failed_turns = 0
+
+    def _session(self, app: str, session_id: str) -> Session:
+        key = (app, session_id)
+        session = self.sessions.get(key)
+        if session is None:
+            context = new_context(app)
+            if self.store is None:
+                history = HistoryManager(token_budget=self.token_budget)
+            else:
+                # Resume from the store: summary plus unsummarized turns only
+                stored_id = f"{app}:{session_id}"
+                history = HistoryManager.resume(self.store, stored_id, token_budget=self.token_budget)
+                saved = self.store.load_state(stored_id, "context")
+                if saved is not None and hasattr(context, "from_dict"):
+                    context = type(context).from_dict(saved)
+            session = Session(app=app, history=history, context=context)
+            self.sessions[key] = session
+        return session
+
+    async def run_turn(self, app: str, session_id: str, message: str) -> Dict[str, Any]:
+        if app not in self.agents:
+            raise KeyError(f"Unknown app {app!r}")
+        session = self._session(app, session_id)
+        # Turns within one session are strictly ordered
+        async with session.lock:
+            started = time.perf_counter()
+            token = current_session.set(f"{app}:{session_id}")
+            # Nested runs (the travel planner's Explore Agent) go through the same limited model
+            undo_run_config = use_run_config(app, self.run_configs[app])
+            try:
+                items = session.history.start_turn(message)
+                try:
+                    result = await Runner.run(self.agents[app], items, context=session.context,
+                                             run_config=self.run_configs[app])
+                except Exception:
+                    session.history.cancel_turn()
+                    self.failed_turns += 1
+                    raise
+                session.history.finish_turn(result.to_input_list())
+                if self.store is not None and hasattr(session.context, "to_dict"):
+                    self.store.save_state(f"{app}:{session_id}", "context", session.context.to_dict())
+            finally:
+                if undo_run_config is not None:
+                    undo_run_config()
+                current_session.reset(token)
+            session.turns += 1
+            session.last_used = time.monotonic()
+            self.completed_turns += 1
+            return {
+                "output": str(result.final_output),
+                "agent": result.last_agent.name,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+
+    def evict_idle(self) -> int:
+        cutoff = time.monotonic() - self.idle_ttl
+        stale = [k for k, s in self.sessions.items() if s.last_used < cutoff and not s.lock.locked()]
+        for key in stale:
+            del self.sessions[key]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "completed_turns": self.completed_turns,
+            "failed_turns": self.failed_turns,
+            "inflight_model_calls": self.limiter.active,
+            "waiting_model_calls": self.limiter.waiting,
+        }
+
+    # ---------- HTTP ----------
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, path, body)
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[str, Any]:
+        if method == "GET" and path == "/health":
+            return "200 OK", {"ok": True}
+        if method == "GET" and path == "/stats":
+            return "200 OK", self.stats()
+        if method == "POST" and path == "/turn":
+            try:
+                req = json.loads(body or b"{}")
+                app, session_id, message = req["app"], str(req["session_id"]), req["message"]
+            except (ValueError, KeyError) as e:
+                return "400 Bad Request", {"error": f"Invalid request: {e}"}
+            try:
+                return "200 OK", await self.run_turn(app, session_id, message)
+            except KeyError as e:
+                return "404 Not Found", {"error": str(e)}
+            except Exception as e:
+                return "502 Bad Gateway", {"error": f"Agent run failed: {e}"}
+        return "404 Not Found", {"error": f"No route for {method} {path}"}
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(min(60.0, self.idle_ttl))
+            self.evict_idle()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080, unix_path: Optional[str] = None) -> None:
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path, backlog=4096)
+            where = unix_path
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+            where = f"http://{host}:{port}"
+        sweeper = asyncio.create_task(self._sweep())
+        print(f"Serving {', '.join(APPS)} on {where}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent session server for the agent apps.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-inflight", type=int, default=32, help="Max concurrent model calls")
+    parser.add_argument("--token-budget", type=int, default=4000, help="History token budget per session")
+    parser.add_argument("--store", metavar="SPEC",
+                        help="Persist sessions: memory, sqlite:PATH or log:DIRECTORY")
+    parser.add_argument("--stub", type=float, metavar="SECONDS",
+                        help="Use the local stub model with this latency instead of Gemini")
+    args = parser.parse_args()
+
+    stub = None
+    if args.stub is not None:
+        from common.stub_model import StubModel
+        stub = StubModel(latency=args.stub)
+    store = open_store(args.store) if args.store else None
+    server = SessionServer(max_inflight=args.max_inflight, stub_model=stub, token_budget=args.token_budget,
+                           store=store)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
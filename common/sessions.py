@@ -0,0 +1,300 @@
+"""Persistent conversation sessions that resume in O(recent turns).
+
+A `SessionStore` keeps each session as an ordered list of turns (each turn
+is the list of input items it added) plus a few small state values, such as
+the rolling history summary or the game state. Turns are appended one at a
+time, so a turn costs one row or line however long the session is. Reads ask
+only for the turns after a given index, so resuming loads the recent window
+and never the whole transcript.
+
+Backends:
+
+- `MemorySessionStore`: process-local dicts, for tests and single workers.
+- `SQLiteSessionStore`: one WAL-mode database file; any worker process can
+  resume any session.
+- `LogSessionStore`: a directory with one append-only JSONL file per session,
+  read backwards from the end on resume; appends lock the file, so any
+  worker can resume any session (locking needs `fcntl`, i.e. not Windows).
+
+Pick one with `SESSION_STORE=memory`, `sqlite:sessions.db` or
+`log:sessions/` (see `store_from_env()`). A session should have one writer
+at a time; the session server serializes turns per session.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not locked, so keep one writer per session
+    fcntl = None
+
+Items = List[Dict[str, Any]]
+
+
+class SessionStore(Protocol):
+    def append_turn(self, session_id: str, items: Items) -> int:
+        """Store one turn's items; returns its index (0-based)."""
+        ...
+
+    def load_turns(self, session_id: str, start: int = 0) -> List[Items]:
+        """Turns with index >= `start`, oldest first."""
+        ...
+
+    def turn_count(self, session_id: str) -> int:
+        ...
+
+    def save_state(self, session_id: str, key: str, value: Any) -> None:
+        ...
+
+    def load_state(self, session_id: str, key: str, default: Any = None) -> Any:
+        ...
+
+    def delete(self, session_id: str) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class MemorySessionStore:
+    """Sessions held in process memory (lost on exit)."""
+
+    def __init__(self) -> None:
+        self._turns: Dict[str, List[Items]] = {}
+        self._state: Dict[str, Dict[str, Any]] = {}
+
+    def append_turn(self, session_id: str, items: Items) -> int:
+        turns = self._turns.setdefault(session_id, [])
+        turns.append(list(items))
+        return len(turns) - 1
+
+    def load_turns(self, session_id: str, start: int = 0) -> List[Items]:
+        return [list(t) for t in self._turns.get(session_id, [])[max(0, start):]]
+
+    def turn_count(self, session_id: str) -> int:
+        return len(self._turns.get(session_id, ()))
+
+    def save_state(self, session_id: str, key: str, value: Any) -> None:
+        # Round-trip through JSON so callers get the same copy semantics as the disk stores
+        self._state.setdefault(session_id, {})[key] = json.dumps(value)
+
+    def load_state(self, session_id: str, key: str, default: Any = None) -> Any:
+        raw = self._state.get(session_id, {}).get(key)
+        return default if raw is None else json.loads(raw)
+
+    def delete(self, session_id: str) -> None:
+        self._turns.pop(session_id, None)
+        self._state.pop(session_id, None)
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSessionStore:
+    """Turns as rows keyed by (session, turn index) in one SQLite file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS turns (session_id TEXT NOT NULL, turn INTEGER NOT NULL, "
+            "items TEXT NOT NULL, PRIMARY KEY (session_id, turn)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS session_state (session_id TEXT NOT NULL, key TEXT NOT NULL, "
+            "value TEXT NOT NULL, PRIMARY KEY (session_id, key)) WITHOUT ROWID"
+        )
+
+    def append_turn(self, session_id: str, items: Items) -> int:
+        payload = json.dumps(items, default=str)
+        with self._lock:
+            # The next index comes from the primary key, so this works across processes
+            row = self._db.execute(
+                "INSERT INTO turns (session_id, turn, items) "
+                "SELECT ?, COALESCE(MAX(turn) + 1, 0), ? FROM turns WHERE session_id = ? RETURNING turn",
+                (session_id, payload, session_id),
+            ).fetchone()
+        return row[0]
+
+    def load_turns(self, session_id: str, start: int = 0) -> List[Items]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT items FROM turns WHERE session_id = ? AND turn >= ? ORDER BY turn",
+                (session_id, max(0, start)),
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def turn_count(self, session_id: str) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT MAX(turn) FROM turns WHERE session_id = ?", (session_id,)).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def save_state(self, session_id: str, key: str, value: Any) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO session_state (session_id, key, value) VALUES (?, ?, ?)",
+                             (session_id, key, json.dumps(value, default=str)))
+
+    def load_state(self, session_id: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM session_state WHERE session_id = ? AND key = ?",
+                                   (session_id, key)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            self._db.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _reverse_lines(path: str, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield the lines of a file from last to first, reading blocks from the end."""
+    with open(path, "rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        pos = fh.tell()
+        tail = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            fh.seek(pos)
+            lines = (fh.read(step) + tail).split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if tail:
+            yield tail
+
+
+def _ends_torn(fh: Any) -> bool:
+    """Whether an open log's last line lacks its newline (a crash mid-write)."""
+    size = fh.seek(0, os.SEEK_END)
+    if size == 0:
+        return False
+    fh.seek(size - 1)
+    return fh.read(1) != b"\n"
+
+
+def _complete_lines(path: str) -> Iterator[bytes]:
+    """`_reverse_lines` without a torn last line."""
+    with open(path, "rb") as fh:
+        torn = _ends_torn(fh)
+    lines = _reverse_lines(path)
+    if torn:
+        next(lines, None)
+    yield from lines
+
+
+def _cut_torn_tail(fh: Any, block_size: int = 64 * 1024) -> None:
+    """Truncate an open log back to its last complete line."""
+    if not _ends_torn(fh):
+        return
+    pos = fh.seek(0, os.SEEK_END)
+    while pos > 0:
+        step = min(block_size, pos)
+        pos -= step
+        fh.seek(pos)
+        cut = fh.read(step).rfind(b"\n")
+        if cut >= 0:
+            fh.truncate(pos + cut + 1)
+            return
+    fh.truncate(0)
+
+
+class LogSessionStore:
+    """One append-only JSONL file per session: `{"turn": n, "items": [...]}` per line.
+
+    Appends take an exclusive lock on the file and number the turn from its
+    last line, so workers sharing the directory never reuse a turn number. A
+    torn last line left by a crash is ignored on read and cut on the next append.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str, suffix: str = ".jsonl") -> str:
+        return os.path.join(self.directory, quote(session_id, safe="") + suffix)
+
+    def turn_count(self, session_id: str) -> int:
+        path = self._path(session_id)
+        last = next(_complete_lines(path), None) if os.path.exists(path) else None
+        return 0 if last is None else json.loads(last)["turn"] + 1
+
+    def append_turn(self, session_id: str, items: Items) -> int:
+        with open(self._path(session_id), "a+b") as fh:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            _cut_torn_tail(fh)
+            turn = self.turn_count(session_id)
+            fh.write((json.dumps({"turn": turn, "items": items}, default=str) + "\n").encode("utf-8"))
+        return turn
+
+    def load_turns(self, session_id: str, start: int = 0) -> List[Items]:
+        path = self._path(session_id)
+        if not os.path.exists(path):
+            return []
+        turns: List[Items] = []
+        for line in _complete_lines(path):
+            record = json.loads(line)
+            if record["turn"] < start:
+                break
+            turns.append(record["items"])
+        turns.reverse()
+        return turns
+
+    def save_state(self, session_id: str, key: str, value: Any) -> None:
+        state = self._read_state(session_id)
+        state[key] = value
+        path = self._path(session_id, ".state.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(state, fh, default=str)
+        os.replace(tmp, path)
+
+    def _read_state(self, session_id: str) -> Dict[str, Any]:
+        path = self._path(session_id, ".state.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def load_state(self, session_id: str, key: str, default: Any = None) -> Any:
+        return self._read_state(session_id).get(key, default)
+
+    def delete(self, session_id: str) -> None:
+        for suffix in (".jsonl", ".state.json"):
+            path = self._path(session_id, suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self) -> None:
+        pass
+
+
+def open_store(spec: str) -> SessionStore:
+    """`memory`, `sqlite:PATH` or `log:DIRECTORY`."""
+    kind, _, target = spec.partition(":")
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite" and target:
+        return SQLiteSessionStore(target)
+    if kind == "log" and target:
+        return LogSessionStore(target)
+    raise ValueError(f"Unknown session store {spec!r}; use memory, sqlite:PATH or log:DIRECTORY")
+
+
+def store_from_env(var: str = "SESSION_STORE") -> Optional[SessionStore]:
+    """The store named by an environment variable, or None to keep history in memory only."""
+    spec = os.getenv(var)
+    return open_store(spec) if spec else None
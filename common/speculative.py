@@ -0,0 +1,214 @@
+"""Speculative handoffs: start the likely sub-agent while the controller decides.
+
+A controller agent that only routes (the Game Master's Main Controller)
+makes every turn pay for two model calls in a row: the controller's, then
+the sub-agent's. `SpeculativeRunner` guesses the sub-agent from the recent
+handoff history and runs it in parallel with the controller:
+
+- the guess is right: the controller stops at its handoff and the
+  speculative result is committed, so the turn costs about
+  max(controller, sub-agent) instead of their sum;
+- the guess is wrong, or the controller answers itself: the speculative run
+  is cancelled and the turn continues as it would have without speculation.
+
+The speculative run works on `context.fork()`, and its changes are kept
+only through `context.adopt(fork)`, which refuses if the controller changed
+the live context meanwhile (then the chosen agent is simply run again).
+Without a forkable context every turn runs normally. The sub-agent receives
+the turn's input directly, as on the pre-router's fast path, rather than the
+controller's handoff transcript.
+
+`SpeculationStats` tracks, per predicted agent, hits, misses, conflicts
+(right agent, but the fork could not be adopted), the model calls wasted on
+discarded runs and the latency saved.
+"""
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from agents import Agent, RunHooks, Runner
+
+
+@dataclass
+class Prediction:
+    target: Optional[str]
+    confidence: float
+
+
+class HandoffPredictor:
+    """Predicts the next sub-agent from which agents answered the last turns.
+
+    Uses the transitions seen after the last answering agent (e.g. combat
+    tends to follow combat), or overall frequency while there are too few.
+
+    Args:
+        targets: Agent names that may be predicted.
+        threshold: Minimum share of matching past turns to speculate.
+        min_history: Turns of history needed before predicting at all.
+    """
+
+    def __init__(self, targets: Sequence[str], threshold: float = 0.6, min_history: int = 3) -> None:
+        self.targets = set(targets)
+        self.threshold = threshold
+        self.min_history = min_history
+
+    def predict(self, history: Sequence[str]) -> Prediction:
+        history = list(history)
+        if len(history) < self.min_history:
+            return Prediction(None, 0.0)
+        last = history[-1]
+        counts = Counter(b for a, b in zip(history, history[1:]) if a == last)
+        if sum(counts.values()) < 2:
+            counts = Counter(history)
+        target, n = counts.most_common(1)[0]
+        confidence = n / sum(counts.values())
+        if target not in self.targets or confidence < self.threshold:
+            return Prediction(None, confidence)
+        return Prediction(target, confidence)
+
+
+@dataclass
+class AgentSpeculation:
+    hits: int = 0
+    misses: int = 0
+    conflicts: int = 0  # right agent, but the controller changed the context first
+    wasted_calls: int = 0
+    saved_seconds: float = 0.0
+
+
+@dataclass
+class SpeculationStats:
+    """Hit rate, wasted model calls and latency saved, per predicted agent."""
+
+    turns: int = 0
+    unpredicted: int = 0
+    agents: Dict[str, AgentSpeculation] = field(default_factory=dict)
+
+    def agent(self, name: str) -> AgentSpeculation:
+        return self.agents.setdefault(name, AgentSpeculation())
+
+    @property
+    def hits(self) -> int:
+        return sum(a.hits for a in self.agents.values())
+
+    @property
+    def conflicts(self) -> int:
+        return sum(a.conflicts for a in self.agents.values())
+
+    @property
+    def predicted(self) -> int:
+        return sum(a.hits + a.misses + a.conflicts for a in self.agents.values())
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.predicted if self.predicted else 0.0
+
+    @property
+    def wasted_calls(self) -> int:
+        return sum(a.wasted_calls for a in self.agents.values())
+
+    @property
+    def saved_seconds(self) -> float:
+        return sum(a.saved_seconds for a in self.agents.values())
+
+    def report(self) -> str:
+        per_agent = ", ".join(f"{name} {a.hits}/{a.hits + a.misses + a.conflicts} saved {a.saved_seconds:.1f}s "
+                              f"wasted {a.wasted_calls}" for name, a in sorted(self.agents.items()))
+        return (f"speculation: {self.predicted}/{self.turns} turns speculated, hit rate {self.hit_rate:.0%}, "
+                f"{self.conflicts} conflicts, wasted calls {self.wasted_calls}, saved {self.saved_seconds:.1f}s ({per_agent or 'none'})")
+
+
+class _HandoffTaken(Exception):
+    def __init__(self, agent: Agent) -> None:
+        super().__init__(agent.name)
+        self.agent = agent
+
+
+class _StopAtHandoff(RunHooks):
+    """Ends the controller's run as soon as it hands off."""
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        raise _HandoffTaken(to_agent)
+
+
+class _CountCalls(RunHooks):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self.calls += 1
+
+
+async def _cancel(task: "asyncio.Task[Any]") -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+class SpeculativeRunner:
+    """Runs a controller turn with the predicted sub-agent started alongside.
+
+    Args:
+        controller: The routing agent that would normally run first.
+        agents: The sub-agents the controller hands off to, keyed by name.
+        predictor: Defaults to a `HandoffPredictor` over `agents`.
+    """
+
+    def __init__(self, controller: Agent, agents: Mapping[str, Agent],
+                 predictor: Optional[HandoffPredictor] = None) -> None:
+        self.controller = controller
+        self.agents = dict(agents)
+        self.predictor = predictor or HandoffPredictor(list(self.agents))
+        self.stats = SpeculationStats()
+
+    async def _branch(self, agent: Agent, input: Any, context: Any, hooks: _CountCalls,
+                      kwargs: Dict[str, Any]) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        result = await Runner.run(agent, input, context=context, hooks=hooks, **kwargs)
+        return result, time.perf_counter() - started
+
+    async def run(self, input: Any, context: Any = None, history: Sequence[str] = (), **kwargs: Any):
+        """Like `Runner.run(controller, input, ...)`; `history` lists recent answering agents."""
+        self.stats.turns += 1
+        prediction = self.predictor.predict(history)
+        if prediction.target not in self.agents or not hasattr(context, "fork"):
+            self.stats.unpredicted += 1
+            return await Runner.run(self.controller, input, context=context, **kwargs)
+
+        stats = self.stats.agent(prediction.target)
+        forked = context.fork()
+        counter = _CountCalls()
+        branch = asyncio.create_task(
+            self._branch(self.agents[prediction.target], input, forked, counter, kwargs))
+        started = time.perf_counter()
+        try:
+            result = await Runner.run(self.controller, input, context=context, hooks=_StopAtHandoff(), **kwargs)
+        except _HandoffTaken as taken:
+            decided = time.perf_counter() - started
+            if taken.agent.name == prediction.target:
+                try:
+                    result, branch_seconds = await branch
+                except Exception:
+                    result = None
+                if result is not None and context.adopt(forked):
+                    stats.hits += 1
+                    stats.saved_seconds += decided + branch_seconds - (time.perf_counter() - started)
+                    return result
+                if result is not None:
+                    stats.conflicts += 1
+                else:
+                    stats.misses += 1
+            else:
+                await _cancel(branch)
+                stats.misses += 1
+            stats.wasted_calls += counter.calls
+            return await Runner.run(taken.agent, input, context=context, **kwargs)
+        except BaseException:
+            await _cancel(branch)
+            raise
+        # The controller answered without handing off
+        await _cancel(branch)
+        stats.misses += 1
+        stats.wasted_calls += counter.calls
+        return result
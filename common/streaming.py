@@ -0,0 +1,115 @@
+"""Streamed turns for the CLI loops, with time-to-first-token tracking.
+
+`stream_turn()` runs an agent with `Runner.run_streamed`, prints text deltas
+as they arrive and shows handoffs / tool calls inline. The returned result
+is the usual run result, so `result.to_input_list()` and
+`result.final_output` work exactly as after `Runner.run`.
+
+    result, timing = await stream_turn(main_agent, history_items, stats=stream_stats)
+"""
+import sys
+import time
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Any, List, Optional, TextIO, Tuple
+
+from agents import Runner
+
+
+@dataclass
+class TurnTiming:
+    total: float
+    first_token: Optional[float]
+    first_event: Optional[float]
+    agents: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StreamStats:
+    """Time-to-first-token vs. total turn time across a session."""
+
+    turns: List[TurnTiming] = field(default_factory=list)
+
+    def add(self, timing: TurnTiming) -> None:
+        self.turns.append(timing)
+
+    def report(self) -> str:
+        if not self.turns:
+            return "stream: no turns yet"
+        last = self.turns[-1]
+        ttfts = [t.first_token for t in self.turns if t.first_token is not None]
+        line = f"stream: ttft={_ms(last.first_token)} total={_ms(last.total)}"
+        if ttfts:
+            line += (f" | session median ttft={_ms(median(ttfts))}"
+                     f" total={_ms(median(t.total for t in self.turns))} over {len(self.turns)} turns")
+        return line
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+
+async def stream_turn(
+    agent: Any,
+    input: Any,
+    *,
+    out: TextIO = sys.stdout,
+    prefix: str = "Assistant: ",
+    show_events: bool = True,
+    stats: Optional[StreamStats] = None,
+    **run_kwargs: Any,
+) -> Tuple[Any, TurnTiming]:
+    """Run one streamed turn, printing tokens and handoff/tool events as they happen."""
+    started = time.perf_counter()
+    first_token: Optional[float] = None
+    first_event: Optional[float] = None
+    agents = [agent.name]
+    at_line_start = True
+
+    def note(text: str) -> None:
+        nonlocal at_line_start
+        if not at_line_start:
+            out.write("\n")
+        out.write(f"  [{text}]\n")
+        at_line_start = True
+
+    result = Runner.run_streamed(agent, input, **run_kwargs)
+    async for event in result.stream_events():
+        now = time.perf_counter() - started
+        if event.type == "raw_response_event":
+            if getattr(event.data, "type", None) != "response.output_text.delta":
+                continue
+            if first_token is None:
+                first_token = now
+            if at_line_start:
+                out.write(prefix)
+                at_line_start = False
+            out.write(event.data.delta)
+            out.flush()
+            continue
+
+        if first_event is None:
+            first_event = now
+        if event.type == "agent_updated_stream_event":
+            if event.new_agent.name != agents[-1]:
+                agents.append(event.new_agent.name)
+                if show_events:
+                    note(f"handoff -> {event.new_agent.name}")
+        elif event.type == "run_item_stream_event" and show_events:
+            if event.name == "tool_called":
+                note(f"tool {getattr(event.item.raw_item, 'name', '?')}(...)")
+            elif event.name == "tool_output":
+                note("tool done")
+
+    if not at_line_start:
+        out.write("\n")
+    elif result.final_output and first_token is None:
+        # Nothing was streamed (e.g. structured output); print the final answer
+        out.write(f"{prefix}{result.final_output}\n")
+    out.flush()
+
+    timing = TurnTiming(total=time.perf_counter() - started, first_token=first_token,
+                        first_event=first_event, agents=agents)
+    if stats is not None:
+        stats.add(timing)
+    return result, timing
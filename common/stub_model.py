@@ -0,0 +1,221 @@
+"""Local stand-in for the Gemini model, for load tests and offline runs.
+
+`StubModel` never touches the network: it sleeps for a configurable latency
+and answers with a canned assistant message, streamed word by word when the
+run is streamed. Pass it through `RunConfig(model=StubModel())` to override
+every agent's model.
+
+It can also replay recorded responses, including tool calls and handoffs.
+A recorded response is a list of steps:
+
+    {"text": "..."}                                   assistant message
+    {"tool": "get_flights", "args": {"input": {...}}}  function tool call
+    {"handoff": "Booking Agent"}                       handoff to that agent
+
+Queue responses with `StubModel.queue()`; each model call pops one and falls
+back to the canned reply once the queue is empty. `RecordingModel` wraps a
+real model and captures its responses in the same format.
+"""
+import asyncio
+import json
+import random
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Union
+
+from agents import Model, ModelResponse, Usage, generation_span
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+Reply = Union[str, Callable[[Any], str]]
+Step = Dict[str, Any]
+
+
+def input_chars(input: Any) -> int:
+    if isinstance(input, str):
+        return len(input)
+    return len(json.dumps(input, default=str))
+
+
+def last_user_text(input: Any) -> str:
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if isinstance(item, dict) and item.get("role") == "user" and isinstance(item.get("content"), str):
+            return item["content"]
+    return ""
+
+
+def assistant_message(text: str, item_id: str = "stub-msg") -> ResponseOutputMessage:
+    return ResponseOutputMessage(
+        id=item_id,
+        type="message",
+        role="assistant",
+        status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+def tool_call(name: str, args: Dict[str, Any], call_id: str) -> ResponseFunctionToolCall:
+    return ResponseFunctionToolCall(id=call_id, call_id=call_id, type="function_call", name=name,
+                                    arguments=json.dumps(args), status="completed")
+
+
+def steps_to_output(steps: Iterable[Step], handoffs: Iterable[Any], call_prefix: str) -> List[Any]:
+    """Build model output items from recorded steps."""
+    handoff_tools = {h.agent_name: h.tool_name for h in handoffs}
+    output: List[Any] = []
+    for i, step in enumerate(steps):
+        if "text" in step:
+            output.append(assistant_message(step["text"], f"{call_prefix}-msg{i}"))
+        elif "tool" in step:
+            output.append(tool_call(step["tool"], step.get("args", {}), f"{call_prefix}-{i}"))
+        elif "handoff" in step:
+            if step["handoff"] not in handoff_tools:
+                raise ValueError(f"Recorded handoff to {step['handoff']!r}, but the current agent can only "
+                                 f"hand off to {sorted(handoff_tools)}")
+            output.append(tool_call(handoff_tools[step["handoff"]], {}, f"{call_prefix}-{i}"))
+        else:
+            raise ValueError(f"Unknown recorded step: {step!r}")
+    return output
+
+
+def output_to_steps(output: Iterable[Any], handoffs: Iterable[Any]) -> List[Step]:
+    """Inverse of `steps_to_output`, used to record a real model's responses."""
+    handoff_agents = {h.tool_name: h.agent_name for h in handoffs}
+    steps: List[Step] = []
+    for item in output:
+        if isinstance(item, ResponseOutputMessage):
+            text = "".join(getattr(part, "text", "") for part in item.content)
+            steps.append({"text": text})
+        elif isinstance(item, ResponseFunctionToolCall):
+            if item.name in handoff_agents:
+                steps.append({"handoff": handoff_agents[item.name]})
+            else:
+                steps.append({"tool": item.name, "args": json.loads(item.arguments or "{}")})
+    return steps
+
+
+class StubModel(Model):
+    """Scriptable fake model with simulated latency.
+
+    Args:
+        latency: Seconds to sleep per call.
+        jitter: Extra uniform random latency in seconds.
+        reply: Fixed text, or a callable taking the model input and returning text.
+        token_interval: Delay between streamed chunks, in seconds.
+        script: Recorded responses to replay before falling back to `reply`.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, reply: Optional[Reply] = None,
+                 token_interval: float = 0.0, script: Optional[Iterable[List[Step]]] = None) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.reply = reply
+        self.token_interval = token_interval
+        self.script: Deque[List[Step]] = deque(script or ())
+        self.calls = 0
+        # Characters sent per call (instructions + input), to track prompt growth
+        self.prompt_chars: List[int] = []
+
+    def queue(self, responses: Iterable[List[Step]]) -> None:
+        """Append recorded responses to replay on the next calls."""
+        self.script.extend(responses)
+
+    def _text(self, input: Any) -> str:
+        if self.reply is None:
+            return f"(stub) You said: {last_user_text(input)}"
+        if callable(self.reply):
+            return self.reply(input)
+        return self.reply
+
+    async def _sleep(self) -> None:
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _output(self, input: Any, handoffs: Any) -> List[Any]:
+        if self.script:
+            return steps_to_output(self.script.popleft(), handoffs, f"stub-call-{self.calls}")
+        return [assistant_message(self._text(input))]
+
+    def _span(self, input: Any, tracing: Any):
+        # Same generation span the real chat-completions model emits (a no-op when tracing is off)
+        return generation_span(model="stub", input=input if tracing.include_data() else None,
+                               disabled=tracing.is_disabled())
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                           handoffs, tracing, *args, **kwargs) -> ModelResponse:
+        self.calls += 1
+        self.prompt_chars.append(input_chars(input) + len(system_instructions or ""))
+        with self._span(input, tracing) as span:
+            await self._sleep()
+            output = self._output(input, handoffs)
+            prompt_tokens = self.prompt_chars[-1] // 4
+            output_tokens = input_chars([item.model_dump() for item in output]) // 4
+            span.span_data.usage = {"input_tokens": prompt_tokens, "output_tokens": output_tokens}
+        usage = Usage(requests=1, input_tokens=prompt_tokens, output_tokens=output_tokens,
+                      total_tokens=prompt_tokens + output_tokens)
+        return ModelResponse(output=output, usage=usage, response_id=None)
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema,
+                              handoffs, tracing, *args, **kwargs) -> AsyncIterator[Any]:
+        self.calls += 1
+        self.prompt_chars.append(input_chars(input) + len(system_instructions or ""))
+        with self._span(input, tracing) as span:
+            await self._sleep()
+            output = self._output(input, handoffs)
+            span.span_data.usage = {"input_tokens": self.prompt_chars[-1] // 4,
+                                    "output_tokens": input_chars([item.model_dump() for item in output]) // 4}
+        seq = 0
+        for index, message in enumerate(output):
+            if not isinstance(message, ResponseOutputMessage):
+                continue
+            for i, word in enumerate(message.content[0].text.split(" ")):
+                if i and self.token_interval:
+                    await asyncio.sleep(self.token_interval)
+                yield ResponseTextDeltaEvent(
+                    type="response.output_text.delta", item_id=message.id, output_index=index,
+                    content_index=0, delta=word if i == 0 else " " + word, logprobs=[], sequence_number=seq,
+                )
+                seq += 1
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=seq,
+            response=Response(
+                id="stub-response", created_at=0, model="stub", object="response", output=output,
+                tool_choice="none", tools=[], top_p=None, parallel_tool_calls=False, status="completed",
+            ),
+        )
+
+
+class RecordingModel(Model):
+    """Wraps a real model and records each response as replayable steps.
+
+    `responses` holds one list of steps per model call, in call order, ready
+    to be saved and fed back through `StubModel.queue()`.
+    """
+
+    def __init__(self, inner: Model) -> None:
+        self.inner = inner
+        self.responses: List[List[Step]] = []
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema,
+                           handoffs, tracing, *args, **kwargs) -> ModelResponse:
+        response = await self.inner.get_response(system_instructions, input, model_settings, tools,
+                                                 output_schema, handoffs, tracing, *args, **kwargs)
+        self.responses.append(output_to_steps(response.output, handoffs))
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema,
+                              handoffs, tracing, *args, **kwargs) -> AsyncIterator[Any]:
+        async for event in self.inner.stream_response(system_instructions, input, model_settings, tools,
+                                                      output_schema, handoffs, tracing, *args, **kwargs):
+            if isinstance(event, ResponseCompletedEvent):
+                self.responses.append(output_to_steps(event.response.output, handoffs))
+            yield event
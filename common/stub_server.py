@@ -0,0 +1,166 @@
+"""Local OpenAI-compatible chat-completions server that misbehaves on purpose.
+
+Stands in for the Gemini endpoint when testing client-side rate limiting:
+every request waits `latency` (+ jitter), requests beyond a real per-second
+limit get a 429 with a Retry-After header, and a share of the rest get a
+random 429 too. Point the apps at it with GEMINI_BASE_URL:
+
+    python -m common.stub_server --port 8090 --rps 5 --error-rate 0.05 --latency 0.2
+    GEMINI_BASE_URL=http://127.0.0.1:8090/v1 GEMINI_API_KEY=stub python "career mentor agent/main.py"
+
+Endpoints: POST /v1/chat/completions (plain or `"stream": true`), GET /stats.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class StubServer:
+    """Chat-completions stub with latency, a server-side rate limit and injected 429s.
+
+    Args:
+        latency: Seconds per completion.
+        jitter: Extra uniform random latency in seconds.
+        rps: Requests per second accepted before answering 429 (0: no limit).
+        error_rate: Share of accepted requests answered with a 429 anyway.
+        retry_after: Retry-After seconds sent with injected 429s.
+    """
+
+    def __init__(self, latency: float = 0.1, jitter: float = 0.0, rps: float = 0.0, error_rate: float = 0.0,
+                 retry_after: float = 1.0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.rps = rps
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.counts = {"requests": 0, "ok": 0, "rate_limited": 0, "injected": 0}
+        self._level = max(1.0, rps)
+        self._updated = time.monotonic()
+
+    def _admit(self) -> Optional[float]:
+        """None if the request is within the server's rate, else seconds until it would be."""
+        if not self.rps:
+            return None
+        now = time.monotonic()
+        self._level = min(max(1.0, self.rps), self._level + (now - self._updated) * self.rps)
+        self._updated = now
+        if self._level >= 1.0:
+            self._level -= 1.0
+            return None
+        return (1.0 - self._level) / self.rps
+
+    @staticmethod
+    def _reply_text(request: Dict[str, Any]) -> str:
+        messages = request.get("messages") or []
+        last = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+        if not isinstance(last, str):
+            last = json.dumps(last)
+        return f"(stub server) You said: {last[:200]}"
+
+    async def complete(self, request: Dict[str, Any]) -> Tuple[int, Dict[str, str], Any]:
+        """Status, extra headers and body (a dict, or a list of SSE chunks when streaming)."""
+        self.counts["requests"] += 1
+        wait = self._admit()
+        if wait is not None:
+            self.counts["rate_limited"] += 1
+            return 429, {"Retry-After": f"{wait:.3f}"}, {"error": {"message": "Rate limit exceeded", "code": 429}}
+        if self.error_rate and random.random() < self.error_rate:
+            self.counts["injected"] += 1
+            return 429, {"Retry-After": f"{self.retry_after:.3f}"}, {"error": {"message": "Resource exhausted",
+                                                                                "code": 429}}
+        await asyncio.sleep(self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0))
+        self.counts["ok"] += 1
+        text = self._reply_text(request)
+        prompt_tokens = len(json.dumps(request.get("messages", []))) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4,
+                 "total_tokens": prompt_tokens + len(text) // 4}
+        model = request.get("model", "stub")
+        if request.get("stream"):
+            base = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+            return 200, {}, [
+                {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": text},
+                                      "finish_reason": None}]},
+                {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage},
+            ]
+        return 200, {}, {
+            "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    status, extra, payload = await self.complete(json.loads(body or b"{}"))
+                elif method == "GET" and path == "/stats":
+                    status, extra, payload = 200, {}, self.counts
+                else:
+                    status, extra, payload = 404, {}, {"error": {"message": f"No route for {method} {path}"}}
+
+                if isinstance(payload, list):
+                    data = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in payload) + "data: [DONE]\n\n"
+                    content_type = "text/event-stream"
+                else:
+                    data = json.dumps(payload)
+                    content_type = "application/json"
+                raw = data.encode("utf-8")
+                head = "".join(f"{k}: {v}\r\n" for k, v in extra.items())
+                reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests"}[status]
+                writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n{head}"
+                             f"Content-Length: {len(raw)}\r\n\r\n".encode("latin-1") + raw)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Start listening; port 0 picks a free one (see `server.sockets[0].getsockname()`)."""
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    stub = StubServer(latency=args.latency, jitter=args.jitter, rps=args.rps, error_rate=args.error_rate,
+                      retry_after=args.retry_after)
+    server = await stub.start(args.host, args.port)
+    print(f"Stub chat-completions server on http://{args.host}:{args.port}/v1")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local chat-completions stub that injects 429s and latency.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--rps", type=float, default=0.0, help="Requests per second before 429s (0: no limit)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 429 anyway")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds for injected 429s")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
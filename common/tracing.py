@@ -0,0 +1,222 @@
+"""Local per-turn tracing: where does a turn's time go?
+
+`SpanRecorder` is an Agents SDK `TracingProcessor`. It receives the spans
+the SDK already emits around `Runner.run` (agent runs, model calls, tool
+invocations, handoffs) plus any `custom_span`s the apps add, and keeps one
+small record per span:
+
+    {"trace": ..., "kind": "function", "name": "get_flights", "agent": "Booking Agent",
+     "ms": 1.9, "in_tokens": null, "out_tokens": null, "in_bytes": 88, "out_bytes": 412}
+
+Records go to an in-memory ring buffer and, optionally, a rotating JSONL
+file. Nothing leaves the machine. `setup_tracing()` reads `TRACE_SPANS`: unset
+keeps SDK tracing disabled (spans become no-ops, so the overhead is nil),
+`memory` records to the ring buffer only, anything else is a JSONL path.
+
+    python -m common.tracing summary spans.jsonl [more.jsonl ...]
+
+prints count, p50 and p99 per kind / agent / name.
+"""
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agents import custom_span, set_trace_processors, set_tracing_disabled, trace
+from agents.tracing import Span, Trace, TracingProcessor
+
+
+def _size(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, default=str))
+
+
+def _name(kind: str, data: Dict[str, Any]) -> str:
+    if kind == "generation":
+        return data.get("model") or "model"
+    if kind == "handoff":
+        return f"{data.get('from_agent')} -> {data.get('to_agent')}"
+    if kind == "task":
+        return (data.get("data") or {}).get("name") or kind
+    if kind == "turn":
+        return kind
+    return data.get("name") or kind or "span"
+
+
+class SpanRecorder(TracingProcessor):
+    """Keeps the last `ring_size` span records, and appends them to `path` if given.
+
+    Args:
+        path: JSONL file; rotated at `max_bytes` keeping `backups` old files.
+        ring_size: Records kept in memory for `summary()`.
+    """
+
+    def __init__(self, path: Optional[str] = None, ring_size: int = 10000,
+                 max_bytes: int = 10 * 1024 * 1024, backups: int = 3) -> None:
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        self._starts: Dict[str, float] = {}
+        # Open spans: id -> (parent id, agent name for agent spans), to attribute children to agents
+        self._open: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._log: Optional[logging.Logger] = None
+        if path:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._log = logging.getLogger(f"common.tracing.{id(self)}")
+            self._log.propagate = False
+            self._log.setLevel(logging.INFO)
+            self._log.addHandler(handler)
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+        if self._log is not None:
+            self._log.info(json.dumps(record, default=str))
+
+    def on_trace_start(self, trace: Trace) -> None:
+        self._starts[trace.trace_id] = time.perf_counter()
+
+    def on_trace_end(self, trace: Trace) -> None:
+        started = self._starts.pop(trace.trace_id, None)
+        if started is not None:
+            self._emit({"trace": trace.trace_id, "kind": "trace", "name": trace.name, "agent": None,
+                        "ms": (time.perf_counter() - started) * 1000})
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        self._starts[span.span_id] = time.perf_counter()
+        agent = span.span_data.name if span.span_data.type == "agent" else None
+        self._open[span.span_id] = (span.parent_id, agent)
+
+    def _agent_of(self, span_id: Optional[str]) -> Optional[str]:
+        while span_id is not None and span_id in self._open:
+            span_id, agent = self._open[span_id]
+            if agent is not None:
+                return agent
+        return None
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        started = self._starts.pop(span.span_id, None)
+        ms = (time.perf_counter() - started) * 1000 if started is not None else None
+        agent = self._agent_of(span.span_id)
+        self._open.pop(span.span_id, None)
+        data = span.span_data.export()
+        # The SDK exports some span types (task, turn) as "custom"; keep the real type
+        kind = span.span_data.type
+        usage = data.get("usage") or {}
+        record = {
+            "trace": span.trace_id,
+            "kind": kind,
+            "name": _name(kind, data),
+            "agent": agent,
+            "ms": ms,
+            "in_tokens": usage.get("input_tokens"),
+            "out_tokens": usage.get("output_tokens"),
+            "in_bytes": _size(data.get("input")),
+            "out_bytes": _size(data.get("output")),
+        }
+        if kind == "custom" and data.get("type") == "custom":
+            record.update({k: v for k, v in (data.get("data") or {}).items() if k not in record})
+        if span.error:
+            record["error"] = span.error.get("message")
+        self._emit(record)
+
+    def summary(self) -> str:
+        return summarize(self.records)
+
+    def shutdown(self) -> None:
+        self.force_flush()
+
+    def force_flush(self) -> None:
+        if self._log is not None:
+            for handler in self._log.handlers:
+                handler.flush()
+
+
+_recorder: Optional[SpanRecorder] = None
+
+
+def setup_tracing(var: str = "TRACE_SPANS") -> Optional[SpanRecorder]:
+    """Install the local recorder per `TRACE_SPANS`, or keep tracing disabled.
+
+    Replaces the SDK's default exporter, so spans are never uploaded. Safe to
+    call from every app; they share one recorder.
+    """
+    global _recorder
+    target = os.getenv(var)
+    if not target:
+        set_tracing_disabled(disabled=True)
+        return None
+    if _recorder is None:
+        _recorder = SpanRecorder(path=None if target == "memory" else target)
+        set_trace_processors([_recorder])
+    set_tracing_disabled(disabled=False)
+    return _recorder
+
+
+@contextmanager
+def turn_trace(app: str, session_id: Optional[str] = None) -> Iterator[None]:
+    """Group one turn's spans (history, model calls, tools, handoffs) into one trace."""
+    with trace(f"{app} turn", group_id=session_id):
+        yield
+
+
+@contextmanager
+def timed_span(name: str, **data: Any) -> Iterator[Dict[str, Any]]:
+    """A custom span for app code outside the SDK (e.g. history handling).
+
+    Yields a dict; values added to it (such as byte counts) land in the record.
+    """
+    with custom_span(name, data=data) as span:
+        yield span.span_data.data
+
+
+# ---------- summary ----------
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> str:
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for r in records:
+        if r.get("ms") is None:
+            continue
+        groups.setdefault((r["kind"], r.get("agent") or "-", r["name"]), []).append(r)
+    lines = [f"{'kind':<10} {'agent':<26} {'name':<32} {'count':>6} {'p50 ms':>9} {'p99 ms':>9} "
+             f"{'total ms':>10} {'tokens in/out':>14}"]
+    order = sorted(groups.items(), key=lambda kv: -sum(r["ms"] for r in kv[1]))
+    for (kind, agent, name), rows in order:
+        ms = [r["ms"] for r in rows]
+        tin = sum(r.get("in_tokens") or 0 for r in rows)
+        tout = sum(r.get("out_tokens") or 0 for r in rows)
+        tokens = f"{tin}/{tout}" if tin or tout else "-"
+        lines.append(f"{kind:<10} {agent[:26]:<26} {name[:32]:<32} {len(ms):>6} {_percentile(ms, 0.5):>9.1f} "
+                     f"{_percentile(ms, 0.99):>9.1f} {sum(ms):>10.1f} {tokens:>14}")
+    return "\n".join(lines)
+
+
+def read_records(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) < 2 or args[0] != "summary":
+        print("usage: python -m common.tracing summary SPANS.jsonl [SPANS.jsonl.1 ...]")
+        raise SystemExit(2)
+    print(summarize(read_records(args[1:])))
+
+
+if __name__ == "__main__":
+    main()
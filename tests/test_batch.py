@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("agents")
+
+from common.batch import BatchRunner, Checkpoint, _repair_output, read_queries  # noqa: E402
+from common.stub_model import StubModel  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_input(path, n):
+    """`n` queries with a few blank lines and one malformed line mixed in; returns the query line numbers."""
+    lines, expected = [], []
+    for i in range(n):
+        if i % 7 == 3:
+            lines.append("")
+        if i == 5:
+            lines.append("{not json")
+            expected.append(len(lines) - 1)
+        expected.append(len(lines))
+        lines.append(json.dumps({"id": f"q{i}", "query": f"question number {i}"}))
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return expected
+
+
+def read_output(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def batch_cmd(inp, out, concurrency, resume=False):
+    cmd = [sys.executable, "-m", "common.batch", "--app", "career", "--input", str(inp), "--output", str(out),
+           "--stub", "0.02", "--concurrency", str(concurrency), "--progress", "0"]
+    return cmd + (["--resume"] if resume else [])
+
+
+def test_checkpoint_advances_only_over_contiguous_lines(tmp_path):
+    ckpt = Checkpoint(str(tmp_path / "out.ckpt"))
+    for line in (1, 2, 4):
+        ckpt.mark(line)
+    assert ckpt.next_line == 0
+    ckpt.mark(0)
+    assert ckpt.next_line == 3 and ckpt.finished == {4}
+    ckpt.mark(3)
+    assert ckpt.next_line == 5 and not ckpt.finished
+    ckpt.save()
+    assert Checkpoint.load(ckpt.path).next_line == 5
+
+
+def test_repair_output_drops_torn_last_line(tmp_path):
+    out = tmp_path / "out.jsonl"
+    out.write_text('{"line": 0}\n{"line": 2}\n{"line": 3, "outp', encoding="utf-8")
+    assert _repair_output(str(out)) == {0, 2}
+    assert out.read_text(encoding="utf-8") == '{"line": 0}\n{"line": 2}\n'
+    out.write_text('{"line": 0, "outp', encoding="utf-8")
+    assert _repair_output(str(out)) == set()
+    assert out.read_text(encoding="utf-8") == ""
+
+
+def test_read_queries_skips_blank_lines(tmp_path):
+    inp = tmp_path / "in.jsonl"
+    expected = write_input(inp, 10)
+    jobs = list(read_queries(str(inp)))
+    assert [line for line, _, _ in jobs] == expected
+    assert [line for line, record, _ in jobs if record is None] == [expected[5]]
+    assert [line for line, _, _ in read_queries(str(inp), start=expected[4])] == expected[4:]
+
+
+class FlakyModel(StubModel):
+    """The first `failures` calls of every query hang (past the batch timeout) or raise `error`."""
+
+    def __init__(self, failures, error=None):
+        super().__init__(latency=0)
+        self.failures = failures
+        self.error = error
+        self.seen = {}
+
+    async def get_response(self, system_instructions, input, *args, **kwargs):
+        key = json.dumps(input, default=str)
+        self.seen[key] = self.seen.get(key, 0) + 1
+        if self.seen[key] <= self.failures:
+            if self.error is not None:
+                raise self.error
+            await asyncio.sleep(10)
+        return await super().get_response(system_instructions, input, *args, **kwargs)
+
+
+def run_one(tmp_path, runner):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    inp.write_text(json.dumps({"id": "q", "query": "hello"}) + "\n", encoding="utf-8")
+    stats = asyncio.run(runner.run(str(inp), str(out)))
+    [record] = read_output(out)
+    return stats, record
+
+
+@pytest.mark.parametrize("failures,retries,ok", [(2, 2, True), (3, 2, False)])
+def test_timed_out_attempts_are_retried(tmp_path, failures, retries, ok):
+    runner = BatchRunner("career", concurrency=1, retries=retries, timeout=0.05, backoff_base=0.001,
+                         model=FlakyModel(failures))
+    stats, record = run_one(tmp_path, runner)
+    assert stats.retries == retries
+    if ok:
+        assert record["attempts"] == failures + 1 and "error" not in record
+    else:
+        assert stats.failed == 1 and record["error"].startswith("TimeoutError")
+
+
+def test_model_errors_are_left_to_the_rate_limiter(tmp_path):
+    # Model calls retry their own transient errors (RateLimitedModel); the batch must not multiply them
+    model = FlakyModel(1, error=asyncio.TimeoutError("upstream timeout"))
+    runner = BatchRunner("career", concurrency=1, retries=3, backoff_base=0.001, model=model)
+    stats, record = run_one(tmp_path, runner)
+    assert stats.retries == 0 and stats.failed == 1 and list(model.seen.values()) == [1]
+    assert record["error"].startswith("TimeoutError")
+
+
+def test_nested_runs_use_the_batch_model(tmp_path):
+    pytest.importorskip("numpy")
+    model = StubModel(latency=0, script=[
+        [{"tool": "plan_trip", "args": {"origin": "Karachi", "destination": "Dubai", "depart_date": "2025-06-01",
+                                        "return_date": "2025-06-05", "budget": 200}}],
+        [{"text": "See the Burj Khalifa."}],  # the planner's nested Explore Agent
+        [{"text": "Here is your trip."}],
+    ])
+    stats, record = run_one(tmp_path, BatchRunner("travel", concurrency=1, model=model))
+    assert record["output"] == "Here is your trip." and model.calls == 3
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_resume_after_kill_answers_each_query_once(tmp_path, concurrency):
+    inp, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    expected = write_input(inp, 60)
+    proc = subprocess.Popen(batch_cmd(inp, out, concurrency), cwd=REPO_ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline and proc.poll() is None:
+        if out.exists() and len(read_output(out)) >= 15:
+            break
+        time.sleep(0.01)
+    assert proc.poll() is None, "the run finished before it could be killed"
+    os.kill(proc.pid, signal.SIGKILL)
+    proc.wait()
+    done_before = len(read_output(out))
+    assert done_before < len(expected)
+    # A crash in the middle of a write leaves a torn last line
+    with open(out, "a", encoding="utf-8") as fh:
+        fh.write('{"line": 999, "id": "torn", "outp')
+
+    subprocess.run(batch_cmd(inp, out, concurrency, resume=True), cwd=REPO_ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    records = read_output(out)
+    lines = [r["line"] for r in records]
+    assert sorted(lines) == expected and len(set(lines)) == len(lines)
+    if concurrency == 1:
+        assert lines == expected
+    for r in records:
+        if "error" not in r:
+            assert r["output"].endswith(r["query"])
+    with open(str(out) + ".ckpt", encoding="utf-8") as fh:
+        assert json.load(fh)["next_line"] == expected[-1] + 1
@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("agents")
+
+from agents import Agent  # noqa: E402
+
+from common.cache import ResponseCache  # noqa: E402
+
+
+def graph(skill_instructions):
+    skill = Agent(name="SkillAgent", instructions=skill_instructions)
+    job = Agent(name="JobAgent", instructions="Suggest job roles.")
+    triage = Agent(name="TriageAgent", instructions="Route the user.", handoffs=[skill, job])
+    # A specialist handing back to triage must not loop forever
+    job.handoffs = [triage]
+    return triage
+
+
+def test_specialist_instructions_invalidate_entry_agent_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"))
+    items = [{"role": "user", "content": "How do I learn Python?"}]
+    cache.put(graph("Give a roadmap."), items, "Start with the basics.")
+    assert cache.get(graph("Give a roadmap."), items) == "Start with the basics."
+    assert cache.get(graph("Give a roadmap in three phases."), items) is None
+    cache.close()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Game Master Agent"))
+
+from game_state import GameState  # noqa: E402
+
+
+def test_a_dead_player_cannot_be_healed():
+    state = GameState(seed=1)
+    state.add_item("Potion of Healing")
+    inventory = dict(state.inventory)
+    state.damage(state.max_hp)
+    assert state.status == "dead"
+    state.heal(10)
+    state.use_item("Potion of Healing")
+    assert state.hp == 0
+    assert state.inventory == inventory
@@ -0,0 +1,112 @@
+import pytest
+
+from common.history import SUMMARY_PREFIX, HistoryManager, item_bytes
+from common.sessions import LogSessionStore, MemorySessionStore, SQLiteSessionStore
+
+
+def play(history, n, start=0):
+    """Run `n` turns of a scripted conversation; returns the input of each turn."""
+    sent = []
+    for i in range(start, start + n):
+        items = history.start_turn(f"question {i} " + "x" * 40)
+        sent.append(items)
+        history.finish_turn(items + [{"role": "assistant", "content": f"answer {i} " + "y" * 80}])
+    return sent
+
+
+def test_window_stays_within_budget():
+    history = HistoryManager(token_budget=120, summary_tokens=0)
+    sent = play(history, 20)
+    for items, stats in zip(sent, history.stats):
+        assert stats.bytes_sent == sum(item_bytes(i) for i in items)
+    # Every later turn is cut down to the budget (or to min_turns)
+    assert all(s.tokens_sent <= 120 or s.window_turns == history.min_turns for s in history.stats)
+    assert history.summarized_turns > 0
+    assert len(history.turns) + history.summarized_turns == 20
+    # The oldest turns are the ones evicted
+    assert sent[-1][0]["content"].startswith(f"question {history.summarized_turns}")
+
+
+def test_stats_stay_bounded_over_long_sessions():
+    history = HistoryManager(token_budget=120, summary_tokens=0, stats_window=5)
+    sent = play(history, 50)
+    assert len(history.stats) == 5 and [s.turn for s in history.stats] == list(range(46, 51))
+    assert history.turns_started == 50
+    assert history.bytes_sent == sum(item_bytes(i) for items in sent for i in items)
+    assert history.report().startswith("history: turn=50 ")
+
+
+def test_min_turns_kept_over_budget():
+    history = HistoryManager(token_budget=10, summary_tokens=0, min_turns=2)
+    play(history, 5)
+    history.start_turn("next")
+    assert len(history.turns) == 2
+
+
+def test_no_summary_message_without_summary_tokens():
+    history = HistoryManager(token_budget=120, summary_tokens=0)
+    sent = play(history, 10)
+    assert history.summarized_turns > 0
+    assert history.summary == ""
+    assert all(items[0]["role"] != "system" for items in sent)
+
+
+def test_evicted_turns_fold_into_summary():
+    history = HistoryManager(token_budget=200, summary_tokens=50)
+    sent = play(history, 10)
+    first = sent[-1][0]
+    assert first["role"] == "system" and first["content"].startswith(SUMMARY_PREFIX)
+    assert len(history.summary) <= 50 * 4
+    # The newest evicted turn is always in the summary
+    assert f"question {history.summarized_turns - 1}" in history.summary
+
+
+def test_cancel_turn_leaves_window_unchanged():
+    history = HistoryManager(token_budget=1000)
+    play(history, 2)
+    before = list(history._prefix)
+    history.start_turn("this run fails")
+    history.cancel_turn()
+    assert history._prefix == before
+    with pytest.raises(RuntimeError):
+        history.finish_turn([])
+    # The next turn does not include the cancelled message
+    items = history.start_turn("retry")
+    assert [i["content"] for i in items if i["role"] == "user"][-1] == "retry"
+    assert all(i.get("content") != "this run fails" for i in items)
+
+
+def test_finish_turn_keeps_only_new_items():
+    history = HistoryManager(token_budget=1000)
+    items = history.start_turn("hi")
+    tool_call = {"type": "function_call", "name": "lookup", "arguments": "{}", "call_id": "c1"}
+    history.finish_turn(items + [tool_call, {"role": "assistant", "content": "hello"}])
+    assert history.turns[-1].items == [{"role": "user", "content": "hi"}, tool_call,
+                                       {"role": "assistant", "content": "hello"}]
+
+
+@pytest.fixture(params=["memory", "sqlite", "log"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        s = MemorySessionStore()
+    elif request.param == "sqlite":
+        s = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    else:
+        s = LogSessionStore(str(tmp_path / "sessions"))
+    yield s
+    s.close()
+
+
+@pytest.mark.parametrize("summary_tokens", [0, 50])
+def test_resume_matches_live_session(store, summary_tokens):
+    options = {"token_budget": 200, "summary_tokens": summary_tokens}
+    live = HistoryManager(store=store, session_id="s", **options)
+    play(live, 12)
+
+    resumed = HistoryManager.resume(store, "s", **options)
+    assert resumed.summary == live.summary
+    assert resumed.summarized_turns == live.summarized_turns
+    assert [t.items for t in resumed.turns] == [t.items for t in live.turns]
+    # Both continue the conversation identically
+    assert play(resumed, 3, start=12) == play(live, 3, start=12)
+    assert [s.bytes_sent for s in resumed.stats] == [s.bytes_sent for s in list(live.stats)[-3:]]
@@ -0,0 +1,24 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai travel agent"))
+
+from inventory import ColumnarInventory  # noqa: E402
+
+
+def original_suggest_hotels(hotels, budget):
+    """The body `suggest_hotels` had before inventory.py."""
+    filtered = [h for h in hotels if h["price"] <= budget]
+    return filtered or [min(hotels, key=lambda x: x["price"])]
+
+
+def test_find_hotels_matches_the_original_filter_and_order():
+    rng = random.Random(3)
+    hotels = {city: [{"name": f"{city} {i}", "rating": 4.0, "price": rng.choice([80, 120, 150, 200, 310]),
+                      "location": "Center"} for i in range(12)] for city in ("Paris", "Tokyo", "default")}
+    inventory = ColumnarInventory.from_mock({}, hotels)
+    for city in ("Paris", "Tokyo", "Lima"):
+        for budget in (50, 80, 130, 200, 1000):
+            expected = original_suggest_hotels(hotels.get(city, hotels["default"]), budget)
+            assert inventory.find_hotels(city, budget) == expected
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from common.offload import Offloader
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs POSIX shared memory in /dev/shm")
+
+
+def shared_blocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+def slow_blob(size, seconds):
+    time.sleep(seconds)
+    return b"x" * size
+
+
+def test_result_comes_back_through_shared_memory():
+    async def scenario():
+        offloader = Offloader(processes=1, shm_threshold=1024)
+        try:
+            return await offloader.run(slow_blob, 1 << 16, 0, pool="process"), offloader.stats.shm_bytes
+        finally:
+            offloader.close()
+
+    before = shared_blocks()
+    blob, shm_bytes = asyncio.run(scenario())
+    assert blob == b"x" * (1 << 16) and shm_bytes == 1 << 16
+    assert shared_blocks() <= before
+
+
+def test_cancelled_caller_does_not_leak_shared_blocks():
+    async def scenario():
+        offloader = Offloader(processes=1, shm_threshold=1024)
+        try:
+            # The result comes back through shared memory after the caller has gone
+            task = asyncio.ensure_future(offloader.run(slow_blob, 1 << 16, 0.3, pool="process"))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            # Waits for the running call, so its done-callback has run
+            offloader.close()
+
+    before = shared_blocks()
+    asyncio.run(scenario())
+    assert shared_blocks() <= before
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("agents")
+
+from agents import ModelResponse, ModelSettings, ModelTracing, Usage  # noqa: E402
+from openai import APIConnectionError, RateLimitError  # noqa: E402
+
+from common.ratelimit import BATCH, INTERACTIVE, RateLimitedModel, RequestScheduler  # noqa: E402
+
+REQUEST = object()
+
+
+class FakeResponse:
+    """Just enough of an HTTP response for the openai error types."""
+
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+        self.request = REQUEST
+
+
+def rate_limited() -> RateLimitError:
+    return RateLimitError("rate limited", response=FakeResponse(429, {"retry-after": "0"}), body=None)
+
+
+class FakeModel:
+    """Inner model: each call waits for `gate`, then raises the next scripted error or answers."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        await self.gate.wait()
+        if self.errors:
+            raise self.errors.pop(0)
+        return ModelResponse(output=[], usage=Usage(), response_id=None)
+
+
+def call(model, text):
+    return model.get_response(None, text, ModelSettings(), [], None, [], ModelTracing.DISABLED)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_one_burst_of_429s_cuts_the_rate_once():
+    async def scenario():
+        scheduler = RequestScheduler(rps=10, increase=0)
+        inner = FakeModel([rate_limited() for _ in range(3)])
+        inner.gate.clear()
+        model = RateLimitedModel(inner, scheduler, backoff_base=0.001)
+        # Three distinct calls granted before any 429 comes back
+        tasks = [asyncio.ensure_future(call(model, f"q{i}")) for i in range(3)]
+        await settle()
+        assert inner.calls == 3
+        inner.gate.set()
+        await asyncio.gather(*tasks)
+        assert scheduler.stats.throttled == 3 and scheduler.stats.retries == 3
+        assert scheduler.rps == pytest.approx(7.0)
+        # A 429 for a call granted after the cut cuts it again
+        scheduler.on_throttle(0, granted_at=scheduler._last_decrease + 1e-6)
+        assert scheduler.rps == pytest.approx(4.9)
+
+    asyncio.run(scenario())
+
+
+def test_batch_waiter_served_after_interactive_waiters():
+    async def scenario():
+        scheduler = RequestScheduler(rps=10)
+        scheduler.requests.level = 0.0
+        order = []
+
+        async def take(name, priority):
+            await scheduler.acquire(1, priority)
+            order.append(name)
+
+        # The batch call queues first but is still served last
+        tasks = [asyncio.ensure_future(take("batch", BATCH)),
+                 asyncio.ensure_future(take("first", INTERACTIVE)),
+                 asyncio.ensure_future(take("second", INTERACTIVE))]
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+        assert order == ["first", "second", "batch"]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_coalesced_call():
+    async def scenario():
+        scheduler = RequestScheduler(rps=10)
+        inner = FakeModel()
+        inner.gate.clear()
+        model = RateLimitedModel(inner, scheduler)
+        first = asyncio.ensure_future(call(model, "same"))
+        second = asyncio.ensure_future(call(model, "same"))
+        await settle()
+        assert scheduler.stats.coalesced == 1 and inner.calls == 1
+        first.cancel()
+        await settle()
+        inner.gate.set()
+        response = await asyncio.wait_for(second, 5)
+        assert isinstance(response, ModelResponse)
+        assert first.cancelled() and inner.calls == 1 and not model._inflight
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("max_retries", [0, 2])
+def test_retries_limit_is_honoured(max_retries):
+    async def scenario():
+        scheduler = RequestScheduler(rps=1000)
+        inner = FakeModel([APIConnectionError(request=REQUEST) for _ in range(max_retries + 1)])
+        model = RateLimitedModel(inner, scheduler, max_retries=max_retries, backoff_base=0.001)
+        with pytest.raises(APIConnectionError):
+            await call(model, "q")
+        assert inner.calls == max_retries + 1
+        assert scheduler.stats.retries == max_retries and scheduler.stats.failed == 1
+
+    asyncio.run(scenario())
+
+
+def test_non_transient_error_is_not_retried():
+    async def scenario():
+        scheduler = RequestScheduler(rps=1000)
+        inner = FakeModel([ValueError("bad request")])
+        model = RateLimitedModel(inner, scheduler, max_retries=3)
+        with pytest.raises(ValueError):
+            await call(model, "q")
+        assert inner.calls == 1 and scheduler.stats.retries == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_head_waiter_wakes_the_next():
+    async def scenario():
+        # The bucket is empty and refills slowly, so the head waiter sleeps on the budget
+        scheduler = RequestScheduler(rps=0.5)
+        scheduler.requests.level = 0.0
+        head = asyncio.ensure_future(scheduler.acquire(1, INTERACTIVE))
+        behind = asyncio.ensure_future(scheduler.acquire(1, BATCH))
+        await settle()
+        assert len(scheduler._waiters) == 2
+        # A request is available now, but only a head that re-checks the budget will take it
+        scheduler.requests.level = 1.0
+        head.cancel()
+        await asyncio.wait_for(behind, 1)
+        assert head.cancelled() and not scheduler._waiters
+
+    asyncio.run(scenario())
@@ -0,0 +1,35 @@
+import pytest
+
+from common.router import PreRouter, RuleRouter
+
+RULES = {"SkillAgent": [r"\broadmap\b"], "JobAgent": [r"\bjob roles?\b"]}
+KEYWORDS = {"SkillAgent": [r"\bskills?\b", r"\blearn(ing)?\b"], "JobAgent": [r"\bjobs?\b"]}
+
+
+@pytest.mark.parametrize("text,target", [
+    ("Give me a roadmap", "SkillAgent"),
+    ("Which skills should I be learning?", "SkillAgent"),
+    ("I love learning new things, what should I pick?", None),
+    ("What job roles need a roadmap?", None),
+    ("Hello there", None),
+])
+def test_one_phrase_or_two_keywords_take_the_fast_path(text, target):
+    router = PreRouter({"SkillAgent": object(), "JobAgent": object()}, RULES, keywords=KEYWORDS)
+    decision = router.decide(text)
+    assert decision.target == target
+    assert decision.source == ("rules" if target else "fallback")
+
+
+def test_lone_keyword_scores_below_the_threshold():
+    target, confidence = RuleRouter(RULES, KEYWORDS).classify("I want to learn")
+    assert target == "SkillAgent" and confidence < 0.8
+
+
+def test_app_rule_tables_leave_generic_queries_to_triage():
+    pytest.importorskip("agents")
+    from common.apps import load_module
+
+    for app, text in (("career", "I love learning new things, what should I pick?"),
+                      ("travel", "I'm reading a book about Japan"),
+                      ("game", "Tell me about the items in this world")):
+        assert load_module(app).router.decide(text).source == "fallback", (app, text)
@@ -0,0 +1,49 @@
+import multiprocessing
+import os
+
+import pytest
+
+from common.sessions import LogSessionStore
+
+
+def turn(n):
+    return [{"role": "user", "content": f"message {n}"}]
+
+
+def test_workers_sharing_a_log_never_reuse_a_turn_number(tmp_path):
+    first, second = LogSessionStore(str(tmp_path)), LogSessionStore(str(tmp_path))
+    numbers = [store.append_turn("s", turn(n)) for n, store in enumerate([first, second, first, second])]
+    assert numbers == [0, 1, 2, 3]
+    assert first.turn_count("s") == second.turn_count("s") == 4
+    assert second.load_turns("s", 2) == [turn(2), turn(3)]
+
+
+def _append_many(directory, worker, count):
+    store = LogSessionStore(directory)
+    for n in range(count):
+        store.append_turn("shared", turn(f"{worker}-{n}"))
+
+
+@pytest.mark.skipif(os.name != "posix", reason="appends are locked with fcntl")
+def test_concurrent_processes_append_distinct_turns(tmp_path):
+    procs = [multiprocessing.Process(target=_append_many, args=(str(tmp_path), w, 50)) for w in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    store = LogSessionStore(str(tmp_path))
+    assert store.turn_count("shared") == 150
+    turns = store.load_turns("shared")
+    assert len(turns) == 150 and len({t[0]["content"] for t in turns}) == 150
+
+
+def test_torn_last_line_is_skipped_and_cut_on_append(tmp_path):
+    store = LogSessionStore(str(tmp_path))
+    store.append_turn("s", turn(0))
+    store.append_turn("s", turn(1))
+    with open(store._path("s"), "ab") as fh:
+        fh.write(b'{"turn": 2, "items": [{"role": "us')
+    assert store.turn_count("s") == 2
+    assert store.load_turns("s") == [turn(0), turn(1)]
+    assert store.append_turn("s", turn(2)) == 2
+    assert LogSessionStore(str(tmp_path)).load_turns("s", 1) == [turn(1), turn(2)]
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("agents")
+
+from agents import Agent  # noqa: E402
+
+from common.speculative import HandoffPredictor, SpeculativeRunner  # noqa: E402
+from common.stub_model import StubModel  # noqa: E402
+
+
+class Context:
+    """Forkable context whose `adopt()` succeeds or refuses as told."""
+
+    def __init__(self, adoptable=True):
+        self.adoptable = adoptable
+
+    def fork(self):
+        return Context(self.adoptable)
+
+    def adopt(self, fork):
+        return self.adoptable
+
+
+def test_conflicts_are_counted_apart_from_misses():
+    async def scenario():
+        subs = {name: Agent(name=name, model=StubModel(latency=0.01, reply=f"({name})")) for name in ("A", "B")}
+        script = [[{"handoff": "A"}], [{"handoff": "A"}], [{"handoff": "B"}]]
+        controller = Agent(name="Controller", handoffs=list(subs.values()),
+                           model=StubModel(latency=0.01, script=script))
+        runner = SpeculativeRunner(controller, subs, HandoffPredictor(list(subs)))
+        answers = []
+        for context in (Context(), Context(adoptable=False), Context()):
+            result = await runner.run("go", context=context, history=["A", "A", "A"])
+            answers.append(result.final_output)
+        return runner.stats, answers
+
+    stats, answers = asyncio.run(scenario())
+    a = stats.agents["A"]
+    assert answers == ["(A)", "(A)", "(B)"]
+    assert (a.hits, a.conflicts, a.misses) == (1, 1, 1)
+    assert stats.predicted == 3 and stats.hit_rate == pytest.approx(1 / 3)
+    assert "A 1/3 " in stats.report() and "1 conflicts" in stats.report()